@@ -1,15 +1,145 @@
+import base64
+import hashlib
+import json
 import os
+import threading
 import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from pathlib import Path
-import folium
 import requests
 from foodie.util.github_util import GitHubUploader
+from foodie.util.cache import TTLCache, default_cache_dir
+from foodie.util.rate_limiter import get_rate_limiter
+from foodie.util.local_geocoder import LocalGeocoder
+from foodie.util.address import canonical_address
+from foodie.util.singleflight import SingleFlight
+from foodie.util.map_render import render_map
+from foodie.util.map_bundle import build_bundle
+from foodie.util.static_map import render_png
+from foodie.util.tile_cache import TileCache
+from foodie.util.marker_store import MarkerStore
+from foodie.util.publish_queue import PublishQueue
 from dotenv import load_dotenv
 
 
-def address_to_coordinates(address):
-    """Convert address to lat/lng using Nominatim (free OSM geocoding)"""
+# Geocode results rarely change, failures are retried sooner
+GEOCODE_TTL = int(os.getenv('FOODIE_GEOCODE_TTL', 30 * 24 * 3600))
+GEOCODE_NEGATIVE_TTL = int(os.getenv('FOODIE_GEOCODE_NEGATIVE_TTL', 24 * 3600))
+
+# 'nominatim' (remote only) or 'local' (offline extract first, Nominatim on a local miss)
+GEOCODER_BACKEND = os.getenv('FOODIE_GEOCODER', 'nominatim')
+
+# 'folium' (folium element tree), 'template' (precompiled Leaflet template, much faster for many pins)
+# or 'cluster' (flat coordinate array with client-side clustering for very large maps)
+MAP_RENDERER = os.getenv('FOODIE_MAP_RENDERER', 'folium')
+
+# Maps with at least this many pins switch to 'cluster' unless a renderer is passed explicitly
+CLUSTER_THRESHOLD = int(os.getenv('FOODIE_MAP_CLUSTER_THRESHOLD', 500))
+
+# 'html' (one self-contained page), 'bundle' (minified page referencing shared,
+# content-versioned assets that are published once per host) or 'live' (bundle whose pins
+# live in a separate data file, so update_map can republish just that file)
+MAP_OUTPUT = os.getenv('FOODIE_MAP_OUTPUT', 'html')
+
+# Bundles also publish .gz/.br variants, for hosts that serve precompressed files
+MAP_PRECOMPRESS = os.getenv('FOODIE_MAP_PRECOMPRESS', '0') == '1'
+
+# Byte budget of the on-disk map tile cache
+TILE_CACHE_BYTES = int(os.getenv('FOODIE_TILE_CACHE_BYTES', 256 * 2 ** 20))
+
+# How long a published map URL is reused for identical maps
+ARTIFACT_TTL = int(os.getenv('FOODIE_MAP_ARTIFACT_TTL', 7 * 24 * 3600))
+
+# Publish in the background and return the predicted URL at once (see map_status)
+MAP_BACKGROUND_PUBLISH = os.getenv('FOODIE_MAP_BACKGROUND_PUBLISH', '0') == '1'
+
+# Concurrent background uploads
+PUBLISH_WORKERS = int(os.getenv('FOODIE_MAP_PUBLISH_WORKERS', 4))
+
+_MISS = object()
+_geocode_cache = None
+_local_geocoder = None
+_geocode_flights = SingleFlight()
+_artifact_cache = None
+_tile_cache = None
+_marker_store = None
+_publish_queue = None
+_publish_flights = SingleFlight()
+_update_locks = {}
+_update_locks_guard = threading.Lock()
+
+
+def get_geocode_cache():
+    """Return the shared geocode cache (memory LRU + SQLite file in the foodie cache dir)"""
+    global _geocode_cache
+    if _geocode_cache is None:
+        _geocode_cache = TTLCache(
+            path=Path(default_cache_dir(), 'geocode.sqlite'),
+            namespace='geocode',
+            ttl=GEOCODE_TTL,
+            max_entries=4096
+        )
+    return _geocode_cache
+
+
+def get_local_geocoder():
+    """Return the offline geocoder built at FOODIE_LOCAL_GEOCODER_DB, or None if there is none"""
+    global _local_geocoder
+    if _local_geocoder is None:
+        db_path = os.getenv('FOODIE_LOCAL_GEOCODER_DB') or str(Path(default_cache_dir(), 'local_geocoder.sqlite'))
+        if not os.path.exists(db_path):
+            return None
+        _local_geocoder = LocalGeocoder(db_path)
+    return _local_geocoder
+
+
+def _local_lookup(address, backend):
+    if (backend or GEOCODER_BACKEND) != 'local':
+        return None
+    local_geocoder = get_local_geocoder()
+    if local_geocoder is None:
+        return None
+    return local_geocoder.lookup(address)
+
+
+def geocode_key(address):
+    """Cache key for an address: canonical form, so "123 Main St." and "123 Main Street, Suite 4" share one entry"""
+    return canonical_address(address)
+
+
+def address_to_coordinates(address, use_cache=True, backend=None):
+    """
+    Convert address to lat/lng using Nominatim (free OSM geocoding)
+
+    With the 'local' backend the offline extract is tried first and Nominatim
+    is only called on a local miss.
+
+    Args:
+        address (str): Address to geocode
+        use_cache (bool): Use the geocode cache. Default is True
+        backend (str, optional): 'nominatim' or 'local'. Defaults to FOODIE_GEOCODER
+
+    Returns:
+        tuple: (lat, lng), or (None, None) if the address could not be geocoded
+    """
+    local = _local_lookup(address, backend)
+    if local:
+        return local
+
+    key = geocode_key(address)
+    if use_cache:
+        cached = get_geocode_cache().get(key, _MISS)
+        if cached is not _MISS:
+            return tuple(cached) if cached else (None, None)
+
+    # Concurrent lookups of the same address share one Nominatim request
+    return _geocode_flights.do(key, _nominatim_lookup, address, key, use_cache)
+
+
+def _nominatim_lookup(address, key, use_cache):
     base_url = "https://nominatim.openstreetmap.org/search"
     params = {
         'q': address,
@@ -18,43 +148,312 @@ def address_to_coordinates(address):
     }
     headers = {'User-Agent': 'Foodie-App/1.0'}  # Required by Nominatim
 
+    # Nominatim allows 1 request per second, shared by every thread and process
+    get_rate_limiter('nominatim').acquire()
+
     response = requests.get(base_url, params=params, headers=headers)
     data = response.json()
 
-    # Add delay to comply with Nominatim's 1 request per second policy
-    time.sleep(1)
-
     if data:
-        return float(data[0]['lat']), float(data[0]['lon'])
+        lat, lng = float(data[0]['lat']), float(data[0]['lon'])
+        if use_cache:
+            get_geocode_cache().set(key, [lat, lng])
+        return lat, lng
+
+    if use_cache:
+        get_geocode_cache().set(key, None, ttl=GEOCODE_NEGATIVE_TTL)
     return None, None
 
 
-def create_static_map(addresses, zoom=12, width=800, height=600, file_name='temp_map.html', by='surge') -> dict:
+def geocode_batch(addresses, max_workers=2, use_cache=True, backend=None):
+    """
+    Geocode many addresses, yielding results as soon as each one resolves
+
+    Addresses are deduplicated by geocode_key, local and cache hits are yielded at once and
+    only the misses are scheduled on a small thread pool. Remote lookups still go
+    through the shared Nominatim rate limiter, so extra workers only overlap network
+    latency with the wait for the next token.
+
+    Args:
+        addresses (list or str): Addresses, or a single string separated by | (pipe string)
+        max_workers (int): Number of concurrent lookups for cache misses. Default is 2
+        use_cache (bool): Use the geocode cache. Default is True
+        backend (str, optional): 'nominatim' or 'local'. Defaults to FOODIE_GEOCODER
+
+    Yields:
+        tuple: (address, lat, lng). lat and lng are None if the address could not be geocoded
+    """
+    if isinstance(addresses, str):
+        addresses = addresses.split('|')
+
+    unique = OrderedDict()
+    for address in addresses:
+        address = address.strip().replace('\"', '')
+        if address:
+            unique.setdefault(geocode_key(address), address)
+
+    misses = []
+    cache = get_geocode_cache() if use_cache else None
+    for key, address in unique.items():
+        local = _local_lookup(address, backend)
+        if local:
+            yield address, local[0], local[1]
+            continue
+
+        cached = cache.get(key, _MISS) if cache else _MISS
+        if cached is _MISS:
+            misses.append(address)
+        elif cached:
+            yield address, cached[0], cached[1]
+        else:
+            yield address, None, None
+
+    if not misses:
+        return
+
+    executor = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(misses))))
+    try:
+        futures = {executor.submit(address_to_coordinates, address, use_cache, backend): address for address in misses}
+        for future in as_completed(futures):
+            address = futures[future]
+            try:
+                lat, lng = future.result()
+            except Exception as e:
+                print(f"Geocoding failed for {address}: {e}")
+                lat, lng = None, None
+            yield address, lat, lng
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def artifact_key(coordinates, zoom, width, height, by, renderer, output='html'):
+    """
+    Content hash of a map: normalized pins, zoom, size, hosting service, renderer and output mode
+
+    Pins are rounded to 6 decimals and sorted, so the same places in another order
+    share one key. Labels are part of the pin since they end up in the popups.
+    """
+    pins = sorted((round(lat, 6), round(lng, 6), label) for lat, lng, label in coordinates)
+    payload = json.dumps([pins, int(zoom), str(width), str(height), by, renderer, output], separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def get_artifact_cache():
+    """Return the cache of published map URLs by artifact_key (SQLite file in the foodie cache dir)"""
+    global _artifact_cache
+    if _artifact_cache is None:
+        _artifact_cache = TTLCache(
+            path=Path(default_cache_dir(), 'artifacts.sqlite'),
+            namespace='maps',
+            ttl=ARTIFACT_TTL,
+            max_entries=1024
+        )
+    return _artifact_cache
+
+
+def get_tile_cache():
+    """Return the shared map tile cache (SQLite file in the foodie cache dir, FOODIE_TILE_CACHE_BYTES budget)"""
+    global _tile_cache
+    if _tile_cache is None:
+        _tile_cache = TileCache(path=Path(default_cache_dir(), 'tiles.sqlite'), max_bytes=TILE_CACHE_BYTES)
+    return _tile_cache
+
+
+def get_marker_store():
+    """Return the store of live map pins (SQLite file in the foodie cache dir)"""
+    global _marker_store
+    if _marker_store is None:
+        _marker_store = MarkerStore(Path(default_cache_dir(), 'maps.sqlite'))
+    return _marker_store
+
+
+def get_publish_queue():
+    """Return the background publishing queue (FOODIE_MAP_PUBLISH_WORKERS uploads at a time)"""
+    global _publish_queue
+    if _publish_queue is None:
+        _publish_queue = PublishQueue(max_workers=PUBLISH_WORKERS)
+    return _publish_queue
+
+
+def _split_addresses(addresses):
+    if isinstance(addresses, str):
+        addresses = addresses.split('|')
+    return [ele.strip().replace('\"', '') for ele in addresses if len(ele.strip()) > 10]
+
+
+def _text(text):
+    return {"content": [{"type": "text", "text": text}]}
+
+
+def _link(url):
+    markdown_link = f"[{'link'}]({url})"
+    return _text(f"[link]({markdown_link})")
+
+
+def _github_uploader():
+    load_dotenv(Path(Path(__file__).parents[1], '.env'))
+    github_token = os.getenv('FIZZ_GITHUB')
+    username = "fizzmore"  # Your GitHub username
+    repo_name = "foodie"  # Your repository name
+    return GitHubUploader(github_token, username, repo_name)
+
+
+def _github_base_path(file_name):
+    # Get date time without '-' and ':' for html path
+    now_str = str(datetime.now()).split('.')[0].replace(' ', '_')
+    now_str = now_str.replace('-', '').replace(':', '')
+
+    if file_name.endswith('.html'):
+        file_name = file_name.split('.html')[0]
+    # Maps queued within the same second must not share a path
+    return f'docs/{file_name}__{now_str}_{uuid.uuid4().hex[:6]}'
+
+
+def _publish_github_assets(uploader, assets):
+    # Assets are content-versioned: a path that was published once never changes
+    cache = get_artifact_cache()
+    for relative_path, content in assets.items():
+        repo_file_path = f'docs/{relative_path}'
+        key = f'asset|github|{repo_file_path}'
+        if cache.get(key):
+            continue
+        if not uploader.file_exists(repo_file_path)[0]:
+            res = uploader.upload_file(content, repo_file_path=repo_file_path)
+            if not res.get('success'):
+                return res
+        cache.set(key, True, ttl=10 * 365 * 24 * 3600)
+    return {'success': True}
+
+
+def publish_target(by='surge', file_name='temp_map.html'):
+    """
+    Decide where a map will be published before it is uploaded
+
+    Args:
+        by (str): 'surge' or 'github'. Default is 'surge'
+        file_name (str): Map name, used in the GitHub Pages path
+
+    Returns:
+        dict: by, url the map will be served from and the Surge name or GitHub repo path
+    """
+    if by == 'surge':
+        from foodie.util.surge_util import get_surge_batcher
+        # The suffix keeps maps queued within the same second apart
+        name = f"foodie-map-{int(time.time())}-{uuid.uuid4().hex[:6]}"
+        batcher = get_surge_batcher()
+        if batcher is not None:
+            # One subdirectory of the shared batch domain, deployed together with other recent maps
+            return {'by': by, 'name': name, 'batch': True, 'url': f"https://{batcher.domain}/{name}/"}
+        return {'by': by, 'name': name, 'batch': False, 'url': f"https://{name}.surge.sh"}
+
+    repo_file_path = f'{_github_base_path(file_name)}.html'
+    return {'by': by, 'path': repo_file_path, 'url': _github_uploader().pages_url(repo_file_path)}
+
+
+def _asset_base(target):
+    # Batched Surge maps live one directory below the shared assets
+    return '../' if target.get('batch') else ''
+
+
+def publish_map(content, by='surge', file_name='temp_map.html', assets=None, variants=None, target=None):
+    """
+    Publish a rendered map
+
+    With FOODIE_SURGE_BATCH_DOMAIN set, Surge maps become subpaths of that domain and maps
+    published close together share one surge deployment (see SurgeBatcher).
+
+    Args:
+        content (bytes, file-like or str): Rendered map HTML, or the path of a map file
+        by (str): 'surge' or 'github'. Default is 'surge'
+        file_name (str): Map name, used in the GitHub Pages path
+        assets (dict, optional): Shared files the page references, relative path -> bytes.
+                                 On GitHub each one is uploaded only once. For a batched Surge target
+                                 they sit at the site root, so render the page with _asset_base(target)
+        variants (dict, optional): Precompressed copies of the page, suffix (e.g. '.gz') -> bytes
+        target (dict, optional): Destination from publish_target. Decided here if None
+
+    Returns:
+        dict: success and url, or success False and error text
+    """
+    if by not in ('surge', 'github'):
+        return {'success': False, 'error': "[error](by should be 'surge' or 'github')"}
+    target = target or publish_target(by, file_name)
+
+    if by == 'surge':
+        from foodie.util.surge_util import get_surge_batcher, upload_to_surge
+        files = {f'index.html{suffix}': variant for suffix, variant in (variants or {}).items()}
+        if target['batch']:
+            # Assets are staged once at the site root, the page references them through _asset_base
+            surge_result = get_surge_batcher().publish(target['name'], content, files=files, shared=assets)
+        else:
+            files.update(assets or {})
+            surge_result = upload_to_surge(content, project_name=target['name'], files=files)
+        if surge_result['success']:
+            return {'success': True, 'url': surge_result['url']}
+        return {'success': False, 'error': f"[error]({surge_result['error']}) ({surge_result.get('output')})"}
+
+    elif by == 'github':
+        uploader = _github_uploader()
+
+        res = _publish_github_assets(uploader, assets or {})
+        if not res.get('success'):
+            return {'success': False, 'error': f"[error]({res.get('error_details') or res.get('error')})"}
+
+        repo_file_path = target['path']
+        for suffix, variant in (variants or {}).items():
+            res = uploader.upload_file(variant, repo_file_path=repo_file_path + suffix)
+            if not res.get('success'):
+                return {'success': False, 'error': f"[error]({res.get('error_details') or res.get('error')})"}
+        res = uploader.upload_file(content, repo_file_path=repo_file_path)
+        if res.get('success'):
+            return {'success': True, 'url': res['urls']['pages_url']}
+        return {'success': False, 'error': f"[error]({res.get('error_details') or res.get('error')})"}
+
+
+def create_static_map(addresses, zoom=12, width=800, height=600, file_name='temp_map.html', by='surge',
+                      renderer=None, use_cache=True, output=None, background=None) -> dict:
     """
     Create map link text for given addresses
     This link is markdown text can be displayed in Claude desktop
 
+    A map with the same pins and options as one published before (see artifact_key)
+    is not rendered or uploaded again: the published URL is returned at once.
+    In the background mode the URL the map will have is returned as soon as the pins
+    are geocoded, and map_status reports when the upload is live or has failed.
+
     Args:
         addresses (str): If you have multiple addresses, it should be separated by | (pipe string)
         zoom (int): Default zoom is 12
         width (int): Default width is 800
         height (int): Default height is 600
-        file_name (str, optional): Defaults to 'temp_map.html'
+        file_name (str, optional): Map name, used in the GitHub Pages path. Defaults to 'temp_map.html'
         by (str): 'surge' or 'github' for hosting service. Default is 'surge'.
+        renderer (str, optional): 'folium', 'template' or 'cluster'. Defaults to FOODIE_MAP_RENDERER,
+                                  or 'cluster' from FOODIE_MAP_CLUSTER_THRESHOLD pins
+        use_cache (bool): Reuse the URL of an identical published map. Default is True
+        output (str, optional): 'html', 'bundle' or 'live'. Defaults to FOODIE_MAP_OUTPUT. A bundle is a
+                                minified page with shared assets (template or cluster renderer) and, with
+                                FOODIE_MAP_PRECOMPRESS=1, .gz/.br variants. A live map is a bundle whose
+                                pins can be changed later with update_map. An identical live map is
+                                reused while its pins are unchanged
+        background (bool, optional): Render and upload on the publishing queue instead of waiting.
+                                     Defaults to FOODIE_MAP_BACKGROUND_PUBLISH
 
     Returns:
-        dict:
-
+        dict: MCP content with the markdown link (and the map id of a live or background map),
+              or an [error] text
     """
+    if by not in ('surge', 'github'):
+        return _text("[error](by should be 'surge' or 'github')")
+
     coordinates = []
 
-    address_list = [ele.strip().replace('\"', '') for ele in addresses.split('|') if len(ele) > 10]
+    address_list = _split_addresses(addresses)
 
     try:
-    # Convert address_list to coordinates
+        # Convert address_list to coordinates as the lookups resolve
         error_msg = ""
-        for address in address_list:
-            lat, lng = address_to_coordinates(address)
+        for address, lat, lng in geocode_batch(address_list):
             if lat and lng:
                 coordinates.append((lat, lng, address))
                 print(f"Found: {address} -> {lat}, {lng}")
@@ -64,130 +463,317 @@ def create_static_map(addresses, zoom=12, width=800, height=600, file_name='temp
 
         if not coordinates:
             print("No valid addresses found!")
-            return {"content": [{"type": "text",
-                                 "text": f"[error] No valid addresses found!\n{error_msg}"}]
-                    }
-
-        # Calculate center point
-        center_lat = sum(coord[0] for coord in coordinates) / len(coordinates)
-        center_lng = sum(coord[1] for coord in coordinates) / len(coordinates)
-
-        # Create map
-        m = folium.Map(
-            location=[center_lat, center_lng],
-            zoom_start=zoom,
-            width=width,
-            height=height
-        )
+            return _text(f"[error] No valid addresses found!\n{error_msg}")
 
-        # Add markers
-        for lat, lng, address in coordinates:
-            folium.Marker(
-                location=[lat, lng],
-                popup=address,
-                tooltip=address
-            ).add_to(m)
+        if renderer is None:
+            renderer = 'cluster' if len(coordinates) >= CLUSTER_THRESHOLD else MAP_RENDERER
+        output = output or MAP_OUTPUT
+        if output in ('bundle', 'live') and renderer == 'folium':
+            renderer = 'template'
 
-        html_file = os.path.abspath(file_name)
-        m.save(html_file)
+        background = MAP_BACKGROUND_PUBLISH if background is None else background
 
-        # For static image, you can use selenium + webdriver
-        # or save as HTML and screenshot manually
-        print(f"Map saved as {html_file}")
+        if output == 'live':
+            # An identical live map is reused only while its pins are still the ones it was created with
+            key = artifact_key(coordinates, zoom, width, height, by, renderer, output) if use_cache else None
+            reused = _reuse_live_map(key, coordinates) if key else None
+            if reused:
+                return reused
+            return _create_live_map(coordinates, zoom, width, height, file_name, by, renderer, background, key)
 
-        if by == 'surge':
-            from foodie.util.surge_util import upload_to_surge
-            project_name = f"foodie-map-{int(time.time())}"
-            surge_result = upload_to_surge(html_file, project_name=project_name)
+        key = artifact_key(coordinates, zoom, width, height, by, renderer, output)
+        published = get_artifact_cache().get(key) if use_cache else None
+        if published:
+            print(f"♻️ Map already published: {published}")
+            return _link(published)
 
-            # Clean up local file
-            try:
-                os.remove(html_file)
-            except:
-                pass
-
-            if surge_result['success']:
-                markdown_link = f"[{'link'}]({surge_result['url']})"
-                return {
-                    "content": [
-                        {
-                            "type": "text",
-                            "text": f"[link]({markdown_link})"
-                        }
-                    ]
-                }
-            else:
-                return {
-                    "content": [
-                        {
-                            "type": "text",
-                            "text": f"[error]({surge_result['error']}) ({surge_result['output']})"
-                        }
-                    ]
-                }
-        elif by == 'github':
-            # Now, upload to github
-            load_dotenv(Path(Path(__file__).parents[1], '.env'))
-            github_token = os.getenv('FIZZ_GITHUB')
-            username = "fizzmore"  # Your GitHub username
-            repo_name = "foodie"  # Your repository name
-
-            uploader  = GitHubUploader(github_token, username, repo_name)
-
-            # Get date time without '-' and ':' for html path
-            now_str = str(datetime.now()).split('.')[0].replace(' ', '_')
-            now_str = now_str.replace('-', '').replace(':', '')
-
-            if file_name.endswith('.html'):
-                file_name = file_name.split('.html')[0]
-
-            repo_file_path = f'docs/{file_name}__{now_str}.html'
-            res = uploader.upload_file(html_file, repo_file_path=repo_file_path)
-
-            # Clean up local file
-            try:
-                os.remove(html_file)
-            except:
-                pass
-
-            if res['success']:
-                markdown_link = f"[{'link'}]({res['urls']['pages_url']})"
-                return {
-                    "content": [
-                        {
-                            "type": "text",
-                            "text": f"[link]({markdown_link})"
-                        }
-                    ]
-                }
+        def render_and_publish(target=None):
+            # Create map, centered on the mean of the coordinates. It stays in memory,
+            # the publishers take the bytes directly
+            target = target or publish_target(by, file_name)
+            if output == 'bundle':
+                bundle = build_bundle(coordinates, zoom=zoom, width=width, height=height,
+                                      cluster=renderer == 'cluster', precompress=MAP_PRECOMPRESS,
+                                      asset_base=_asset_base(target))
+                result = publish_map(bundle['page'], by=by, file_name=file_name,
+                                     assets=bundle['assets'], variants=bundle['variants'], target=target)
             else:
-                return {
-                    "content": [
-                        {
-                            "type": "text",
-                            "text": f"[error]({res['error_details']})"
-                        }
-                    ]
-                }
+                html = render_map(coordinates, zoom=zoom, width=width, height=height, renderer=renderer)
+                result = publish_map(html.encode('utf-8'), by=by, file_name=file_name, target=target)
+
+            if result['success'] and use_cache:
+                get_artifact_cache().set(key, result['url'])
+            return result
+
+        if background:
+            # The job id follows the content, so an identical map that is still uploading is reused
+            map_id = key[:12]
+            target = publish_target(by, file_name)
+            job = get_publish_queue().submit(map_id, target['url'], render_and_publish, target)
+            return _pending_link(job['url'], map_id)
+
+        # Identical maps requested at the same time are published once
+        result = _publish_flights.do(key, render_and_publish)
+        if result['success']:
+            return _link(result['url'])
+        return _text(result['error'])
+
+    except Exception as e:
+        return _text(f"[error]({str(e)})")
+
+
+def publish_live_map(info, points, data_only=False):
+    """
+    Publish a live map, or only its marker data file
+
+    Args:
+        info (dict): Live map details from the marker store
+        points (list): (lat, lng, label) tuples
+        data_only (bool): Only republish the marker data. Surge always deploys the whole
+                          site, so this only saves work on GitHub
+
+    Returns:
+        dict: success and url, or success False and error text
+    """
+    bundle = build_bundle(points, zoom=info['zoom'], width=info['width'], height=info['height'],
+                          cluster=info['renderer'] == 'cluster', precompress=False, data_url=info['data_url'],
+                          asset_base=_asset_base(info))
+
+    if info['by'] == 'surge':
+        from foodie.util.surge_util import get_surge_batcher, upload_to_surge
+        files = dict(bundle['assets'])
+        files[info['data_url']] = bundle['data']
+        if info.get('batch'):
+            # Subdirectory of the batch domain, staged and deployed with other recent maps
+            batcher = get_surge_batcher()
+            if batcher is None or batcher.domain != info['domain']:
+                return {'success': False,
+                        'error': f"[error](map lives on {info['domain']}, set FOODIE_SURGE_BATCH_DOMAIN to it)"}
+            surge_result = batcher.publish(info['name'], bundle['page'], files={info['data_url']: bundle['data']},
+                                           shared=bundle['assets'])
         else:
-            return {
-                "content": [
-                    {
-                        "type": "text",
-                        "text": f"[error](by should be 'surge' or 'github')"
-                    }
-                ]
-            }
+            surge_result = upload_to_surge(bundle['page'], custom_domain=info['domain'], files=files)
+        if surge_result['success']:
+            return {'success': True, 'url': surge_result['url']}
+        return {'success': False, 'error': f"[error]({surge_result['error']}) ({surge_result.get('output')})"}
+
+    uploader = _github_uploader()
+    if not data_only:
+        res = _publish_github_assets(uploader, bundle['assets'])
+        if not res.get('success'):
+            return {'success': False, 'error': f"[error]({res.get('error_details') or res.get('error')})"}
+    res = uploader.upload_file(bundle['data'], repo_file_path=info['data_path'])
+    if res.get('success') and not data_only:
+        res = uploader.upload_file(bundle['page'], repo_file_path=info['page_path'])
+    if res.get('success'):
+        return {'success': True, 'url': info.get('url') or res['urls']['pages_url']}
+    return {'success': False, 'error': f"[error]({res.get('error_details') or res.get('error')})"}
+
+
+def _live_link(url, map_id, note=""):
+    result = _link(url)
+    result["content"].append({
+        "type": "text",
+        "text": f"map_id: {map_id} (pass it to update_map to add or remove pins){note}"
+    })
+    return result
+
+
+def _pending_link(url, map_id, note=""):
+    result = _link(url)
+    result["content"].append({
+        "type": "text",
+        "text": f"map_id: {map_id} (the map is being published, map_status reports when it is live){note}"
+    })
+    return result
+
+
+def _reuse_live_map(key, coordinates):
+    map_id = get_artifact_cache().get(key)
+    if not map_id:
+        return None
+    store = get_marker_store()
+    info = store.get_map(map_id)
+    pins = {geocode_key(address) for _, _, address in coordinates}
+    if info is None or {marker[0] for marker in store.markers(map_id)} != pins:
+        return None
+    print(f"♻️ Map already published: {info['url']}")
+    return _live_link(info['url'], map_id)
+
+
+def _create_live_map(coordinates, zoom, width, height, file_name, by, renderer, background=False, key=None):
+    map_id = uuid.uuid4().hex[:12]
+    info = {'map_id': map_id, 'by': by, 'zoom': zoom, 'width': width, 'height': height, 'renderer': renderer}
+    if by == 'surge':
+        from foodie.util.surge_util import get_surge_batcher
+        batcher = get_surge_batcher()
+        if batcher is not None:
+            # markers.json sits next to the page in the map's subdirectory
+            name = f"foodie-map-{map_id}"
+            info.update({'domain': batcher.domain, 'name': name, 'batch': True, 'data_url': 'markers.json',
+                         'url': f"https://{batcher.domain}/{name}/"})
+        else:
+            info.update({'domain': f"foodie-map-{map_id}.surge.sh", 'data_url': 'markers.json',
+                         'url': f"https://foodie-map-{map_id}.surge.sh"})
+    else:
+        base_path = _github_base_path(file_name)
+        info.update({
+            'page_path': f'{base_path}.html',
+            'data_path': f'{base_path}.markers.json',
+            'data_url': f'{os.path.basename(base_path)}.markers.json',
+            'url': _github_uploader().pages_url(f'{base_path}.html'),
+        })
+
+    def publish_and_store():
+        result = publish_live_map(info, coordinates)
+        if result['success']:
+            # The store only knows maps that are live, update_map waits for them
+            info['url'] = result['url']
+            store = get_marker_store()
+            store.save_map(map_id, info)
+            store.update_markers(map_id, add=[(geocode_key(address), address, lat, lng)
+                                              for lat, lng, address in coordinates])
+            if key:
+                get_artifact_cache().set(key, map_id)
+        return result
+
+    if background:
+        job = get_publish_queue().submit(map_id, info['url'], publish_and_store)
+        return _pending_link(job['url'], map_id, "\nOnce it is live, pass map_id to update_map to add or remove pins")
+
+    result = publish_and_store()
+    if not result['success']:
+        return _text(result['error'])
+    return _live_link(result['url'], map_id)
+
+
+def update_map(map_id, add_addresses="", remove_addresses="") -> dict:
+    """
+    Add or remove pins of a live map created by create_static_map(output='live')
+
+    Only the added addresses are geocoded, and only the marker data is published again.
+
+    Args:
+        map_id (str): Map id returned when the map was created
+        add_addresses (str): Addresses to add, separated by | (pipe string)
+        remove_addresses (str): Addresses to remove, separated by | (pipe string)
+
+    Returns:
+        dict: MCP content with the markdown link of the updated map, or an [error] text
+    """
+    # Updates of one map run one at a time, each one publishes the pins the previous one stored
+    with _update_lock(map_id):
+        return _update_map(map_id, add_addresses, remove_addresses)
+
+
+def _update_lock(map_id):
+    with _update_locks_guard:
+        return _update_locks.setdefault(map_id, threading.Lock())
+
+
+def _update_map(map_id, add_addresses, remove_addresses):
+    store = get_marker_store()
+    info = store.get_map(map_id)
+    if info is None:
+        job = get_publish_queue().status(map_id)
+        if job is not None and job['status'] == 'pending':
+            return _text(f"[error] Map {map_id} is still being published, try again once map_status reports it live")
+        return _text(f"[error] Unknown map id: {map_id}")
+
+    try:
+        current = {key: (address, lat, lng) for key, address, lat, lng in store.markers(map_id)}
+        remove = {geocode_key(address) for address in _split_addresses(remove_addresses)} & set(current)
+        new = [address for address in _split_addresses(add_addresses) if geocode_key(address) not in current]
+
+        added, error_msg = [], ""
+        for address, lat, lng in geocode_batch(new):
+            if lat and lng:
+                added.append((geocode_key(address), address, lat, lng))
+            else:
+                error_msg += f"\nCould not geocode: {address}"
+
+        if not added and not remove:
+            return _live_link(info['url'], map_id, f"\nNothing changed{error_msg}")
+        if len(current) - len(remove) + len(added) == 0:
+            return _text("[error] A map needs at least one pin")
+
+        # Publish first, the store only records pins that made it
+        points = [(lat, lng, address) for key, (address, lat, lng) in current.items() if key not in remove]
+        points += [(lat, lng, address) for key, address, lat, lng in added if key not in current]
+        result = publish_live_map(info, points, data_only=True)
+        if not result['success']:
+            return _text(result['error'])
+        store.update_markers(map_id, add=added, remove=remove)
+        return _live_link(result['url'], map_id, f"\nAdded {len(added)}, removed {len(remove)} pins{error_msg}")
 
     except Exception as e:
-        return {
-                "content": [
-                    {
-                        "type": "text",
-                        "text": f"[error]({str(e)})"
-                    }
-                ]
-            }
+        return _text(f"[error]({str(e)})")
+
+
+def map_status(map_id) -> dict:
+    """
+    Report whether a map published in the background is live
+
+    Args:
+        map_id (str): Map id returned by create_static_map
+
+    Returns:
+        dict: MCP content with the status ('pending', 'live' or 'failed') and the map link or error
+    """
+    job = get_publish_queue().status(map_id)
+    if job is None:
+        # Published before this process started, or synchronously
+        info = get_marker_store().get_map(map_id)
+        if info is None:
+            return _text(f"[error] Unknown map id: {map_id}")
+        job = {'status': 'live', 'url': info['url']}
 
+    if job['status'] == 'live':
+        return _text(f"live: [link]({job['url']})")
+    if job['status'] == 'pending':
+        return _text(f"pending: {job['url']} is still being published")
+    return _text(f"failed: {job['error']}")
 
 
+def create_png_map(addresses, zoom=None, width=800, height=600, labels=True) -> dict:
+    """
+    Create a static PNG map for given addresses, returned inline instead of published
+
+    Tiles come from FOODIE_TILE_URL through the shared tile cache and are stitched with Pillow,
+    no browser is started.
+
+    Args:
+        addresses (str): If you have multiple addresses, it should be separated by | (pipe string)
+        zoom (int, optional): Zoom level. Fits every address if None
+        width (int): Default width is 800
+        height (int): Default height is 600
+        labels (bool): Write the address next to each marker. Default is True
+
+    Returns:
+        dict: MCP content with the PNG image and a numbered legend, or an [error] text
+    """
+    address_list = _split_addresses(addresses)
+
+    try:
+        coordinates = []
+        error_msg = ""
+        for address, lat, lng in geocode_batch(address_list):
+            if lat and lng:
+                coordinates.append((lat, lng, address))
+            else:
+                error_msg += f"Could not geocode: {address}\n"
+
+        if not coordinates:
+            return _text(f"[error] No valid addresses found!\n{error_msg}")
+
+        png = render_png(coordinates, zoom=zoom, width=width, height=height, labels=labels, cache=get_tile_cache())
+        legend = "\n".join(f"{number}. {address}" for number, (_, _, address) in enumerate(coordinates, start=1))
+        return {
+            "content": [
+                {"type": "image", "data": base64.b64encode(png).decode('ascii'), "mimeType": "image/png"},
+                {"type": "text", "text": legend + (f"\n{error_msg}" if error_msg else "")},
+            ]
+        }
+
+    except Exception as e:
+        return _text(f"[error]({str(e)})")
@@ -1,55 +1,569 @@
-import requests
 from dotenv import load_dotenv
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain, islice
+import asyncio
+import html
 import os
+import re
+from foodie.util.brave_util import get_brave_client, get_async_brave_client
+from foodie.util.async_util import gather_limited
+from foodie.util.cache import TTLCache, default_cache_dir
+from foodie.util.address import rank_addresses
+from foodie.util.singleflight import SingleFlight
 
 
 load_dotenv(Path(Path(__file__).parents[1], '.env'))
 brave_key = os.environ.get('BRAVE_KEY')
 
+# Recommendations can be a few hours stale, restaurant addresses change rarely
+SEARCH_TTL = int(os.getenv('FOODIE_SEARCH_TTL', 6 * 3600))
+INFO_TTL = int(os.getenv('FOODIE_INFO_TTL', 3 * 24 * 3600))
 
-def search_web(location, cuisine="", top_n=5):
-    queries = [
-        f"top {top_n} {cuisine} restaurants in {location}"
-    ]
+# Maximum concurrent tasks of one fan-out: searches for search_many_async, restaurants
+# for research_restaurants_async. Brave requests overall are capped by the shared throttle
+MAX_CONCURRENCY = int(os.getenv('FOODIE_BRAVE_CONCURRENCY', 8))
 
+# Results requested by each of get_info's two queries
+ADDRESS_COUNT = int(os.getenv('FOODIE_INFO_ADDRESS_COUNT', 3))
+FAMOUS_COUNT = int(os.getenv('FOODIE_INFO_FAMOUS_COUNT', 3))
 
-    response = requests.get(
-        "https://api.search.brave.com/res/v1/web/search",
-        headers={
-            "Accept": "application/json",
-            "Accept-Encoding": "gzip",
-            "x-subscription-token": brave_key,
-        },
-        params={
-            "q": queries,
-            "count": 10,
-            "result_filter": "web"
-        },
-    ).json()
+# Brave page size and how many offset pages a search may walk (Brave allows offsets 0-9)
+PAGE_SIZE = 10
+MAX_PAGES = min(int(os.getenv('FOODIE_SEARCH_MAX_PAGES', 5)), 10)
 
-    return response
+# Character budgets for projected responses returned to the model
+SNIPPET_CHARS = int(os.getenv('FOODIE_SNIPPET_CHARS', 300))
+PAYLOAD_CHARS = int(os.getenv('FOODIE_PAYLOAD_CHARS', 4000))
+
+_TAGS = re.compile(r'<[^>]+>')
+
+_response_cache = None
+_executor = None
+_flights = SingleFlight()
+
+
+def get_response_cache():
+    """
+    Return the shared Brave response cache
+
+    Memory LRU of FOODIE_RESPONSE_CACHE_SIZE entries, backed by a SQLite file in the
+    foodie cache dir unless FOODIE_RESPONSE_CACHE_DISK is 0
+    """
+    global _response_cache
+    if _response_cache is None:
+        use_disk = os.getenv('FOODIE_RESPONSE_CACHE_DISK', '1') != '0'
+        _response_cache = TTLCache(
+            path=Path(default_cache_dir(), 'responses.sqlite') if use_disk else None,
+            namespace='brave',
+            ttl=SEARCH_TTL,
+            max_entries=int(os.getenv('FOODIE_RESPONSE_CACHE_SIZE', 512))
+        )
+    return _response_cache
+
+
+def get_cache_stats():
+    """Hit, miss and eviction counters of the Brave response cache"""
+    return get_response_cache().stats()
+
+
+def _normalize(text):
+    return ' '.join(str(text or '').lower().split())
+
+
+def search_key(location, cuisine="", top_n=5):
+    """Cache key for search_web: location and cuisine case/whitespace folded"""
+    return f"search|{_normalize(location)}|{_normalize(cuisine)}|{int(top_n)}"
+
+
+def info_key(restaurant_name, location, address_count=ADDRESS_COUNT, famous_count=FAMOUS_COUNT):
+    """Cache key for get_info"""
+    return f"info|{_normalize(restaurant_name)}|{_normalize(location)}|{address_count}|{famous_count}"
 
 
-def get_info(restaurant_name, location):
-    queries = [
-        f"What is street address for {restaurant_name} restaurant near {location}",
-        f"What is famous / good for {restaurant_name} restaurant near {location}",
+def _cacheable(response):
+    return isinstance(response, dict) and response.get('type') != 'ErrorResponse'
+
+
+def _search_query(location, cuisine, top_n):
+    return ' '.join(f"top {top_n} {cuisine or ''} restaurants in {location}".split())
+
+
+def _info_queries(restaurant_name, location, address_count, famous_count):
+    return [
+        (f"What is street address for {restaurant_name} restaurant near {location}", address_count),
+        (f"What is famous / good for {restaurant_name} restaurant near {location}", famous_count),
     ]
 
 
-    response = requests.get(
-        "https://api.search.brave.com/res/v1/web/search",
-        headers={
-            "Accept": "application/json",
-            "Accept-Encoding": "gzip",
-            "x-subscription-token": brave_key,
-        },
-        params={
-            "q": queries,
-            "count": 3,
-            "result_filter": "web"
-        },
-    ).json()
+def merge_responses(responses):
+    """
+    Merge the web results of several Brave responses, dropping repeated URLs
+
+    Results keep the order of responses. Error responses are skipped unless every
+    response is an error, in which case the first one is returned.
+
+    Args:
+        responses (list): Brave JSON responses
+
+    Returns:
+        dict: First successful response with web.results replaced by the merged list
+    """
+    successful = [response for response in responses if _cacheable(response)]
+    if not successful:
+        return responses[0]
+
+    merged, seen = [], set()
+    for response in successful:
+        for result in (response.get('web') or {}).get('results') or []:
+            url = result.get('url')
+            if url in seen:
+                continue
+            seen.add(url)
+            merged.append(result)
+
+    combined = dict(successful[0])
+    combined['web'] = dict(successful[0].get('web') or {}, results=merged)
+    return combined
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=MAX_CONCURRENCY, thread_name_prefix='brave')
+    return _executor
+
+
+def _cached(key, use_cache):
+    return get_response_cache().get(key) if use_cache else None
+
 
+def _store(key, response, ttl, use_cache):
+    if use_cache and _cacheable(response):
+        get_response_cache().set(key, response, ttl=ttl)
     return response
+
+
+def _web_results(response):
+    return ((response or {}).get('web') or {}).get('results') or []
+
+
+def _has_next_page(response, page_size):
+    if not _cacheable(response) or len(_web_results(response)) < page_size:
+        return False
+    return (response.get('query') or {}).get('more_results_available') is not False
+
+
+def iter_search_pages(query, page_size=PAGE_SIZE, max_pages=MAX_PAGES):
+    """
+    Lazily yield Brave result pages for query
+
+    While the caller processes one page, the next offset page is already being
+    fetched on the shared executor. Nothing beyond that is requested until the
+    caller asks for it, and closing the generator cancels a prefetch not yet started.
+
+    Args:
+        query (str): Search query
+        page_size (int): Results per page. Default is PAGE_SIZE
+        max_pages (int): Most pages to fetch. Defaults to FOODIE_SEARCH_MAX_PAGES
+
+    Returns:
+        generator: Brave responses, ending after the last page or the first error response
+    """
+    client = get_brave_client(brave_key)
+    response = client.search(query, count=page_size, offset=0)
+    pending = None
+    try:
+        for offset in range(1, max_pages + 1):
+            if offset < max_pages and _has_next_page(response, page_size):
+                pending = _get_executor().submit(client.search, query, count=page_size, offset=offset)
+            yield response
+            if pending is None:
+                return
+            response = pending.result()
+            pending = None
+    finally:
+        if pending is not None:
+            pending.cancel()
+
+
+async def aiter_search_pages(query, page_size=PAGE_SIZE, max_pages=MAX_PAGES):
+    """asyncio version of iter_search_pages, prefetching the next page as a task"""
+    client = get_async_brave_client(brave_key)
+    response = await client.search(query, count=page_size, offset=0)
+    pending = None
+    try:
+        for offset in range(1, max_pages + 1):
+            if offset < max_pages and _has_next_page(response, page_size):
+                pending = asyncio.ensure_future(client.search(query, count=page_size, offset=offset))
+            yield response
+            if pending is None:
+                return
+            response = await pending
+            pending = None
+    finally:
+        if pending is not None:
+            pending.cancel()
+
+
+def _is_new(result, seen):
+    # Listicles and the restaurant's own site often share a title: count each place once
+    keys = {result.get('url'), _normalize(_plain(result.get('title')))} - {None, ''}
+    if keys & seen:
+        return False
+    seen.update(keys)
+    return True
+
+
+def distinct_results(pages):
+    """
+    Results of consecutive pages, skipping repeated restaurants (same URL or title)
+
+    Args:
+        pages (iterable): Brave responses, e.g. from iter_search_pages
+
+    Returns:
+        generator: Brave web results
+    """
+    seen = set()
+    for page in pages:
+        for result in _web_results(page):
+            if _is_new(result, seen):
+                yield result
+
+
+def iter_search_results(query, top_n, page_size=PAGE_SIZE, max_pages=MAX_PAGES):
+    """
+    Lazily yield up to top_n distinct results for query
+
+    Further pages are only fetched as the consumer needs more results, and
+    fetching stops once top_n distinct restaurants have been seen.
+
+    Args:
+        query (str): Search query
+        top_n (int): Most results to yield
+        page_size (int): Results per page. Default is PAGE_SIZE
+        max_pages (int): Most pages to fetch. Defaults to FOODIE_SEARCH_MAX_PAGES
+
+    Returns:
+        generator: Brave web results
+    """
+    pages = iter_search_pages(query, page_size, max_pages)
+    try:
+        yield from islice(distinct_results(pages), top_n)
+    finally:
+        pages.close()
+
+
+def _with_results(response, results):
+    combined = dict(response)
+    combined['web'] = dict(response.get('web') or {}, results=results)
+    return combined
+
+
+def _search_pages(query, top_n):
+    pages = iter_search_pages(query)
+    try:
+        first = next(pages)
+        if not _cacheable(first):
+            return first
+        return _with_results(first, list(islice(distinct_results(chain([first], pages)), top_n)))
+    finally:
+        pages.close()
+
+
+async def _search_pages_async(query, top_n):
+    pages = aiter_search_pages(query)
+    first, results, seen = None, [], set()
+    try:
+        async for page in pages:
+            if first is None:
+                first = page
+                if not _cacheable(first):
+                    return first
+            for result in _web_results(page):
+                if not _is_new(result, seen):
+                    continue
+                results.append(result)
+                if len(results) >= top_n:
+                    return _with_results(first, results)
+    finally:
+        await pages.aclose()
+    return _with_results(first, results)
+
+
+def search_web(location, cuisine="", top_n=5, use_cache=True):
+    """
+    Search for top restaurants in a location
+
+    A top_n beyond one Brave page walks further offset pages lazily, prefetching
+    the next one, until top_n distinct restaurants are found.
+
+    Args:
+        location (str): Location to search
+        cuisine (str): Cuisine, optional
+        top_n (int): Number of restaurants wanted. Default is 5
+        use_cache (bool): Use the response cache. Default is True
+
+    Returns:
+        dict: Brave response, with the distinct results of every fetched page when top_n exceeds one page
+    """
+    key = search_key(location, cuisine, top_n)
+    cached = _cached(key, use_cache)
+    if cached is not None:
+        return cached
+
+    def fetch():
+        query = _search_query(location, cuisine, top_n)
+        if int(top_n) > PAGE_SIZE:
+            response = _search_pages(query, int(top_n))
+        else:
+            response = get_brave_client(brave_key).search(query, count=PAGE_SIZE)
+        return _store(key, response, SEARCH_TTL, use_cache)
+
+    # Identical concurrent searches share one Brave request
+    return _flights.do(key, fetch)
+
+
+def get_info(restaurant_name, location, use_cache=True, address_count=ADDRESS_COUNT, famous_count=FAMOUS_COUNT):
+    """
+    Search for a restaurant's street address and what it is famous for
+
+    The address and "famous for" queries run as two concurrent requests and their
+    results are merged, dropping repeated URLs.
+
+    Args:
+        restaurant_name (str): Restaurant name
+        location (str): Location the restaurant is near
+        use_cache (bool): Use the response cache. Default is True
+        address_count (int): Results for the address query. Defaults to FOODIE_INFO_ADDRESS_COUNT
+        famous_count (int): Results for the "famous for" query. Defaults to FOODIE_INFO_FAMOUS_COUNT
+
+    Returns:
+        dict: Brave response with the merged web results
+    """
+    key = info_key(restaurant_name, location, address_count, famous_count)
+    cached = _cached(key, use_cache)
+    if cached is not None:
+        return cached
+
+    def fetch():
+        client = get_brave_client(brave_key)
+        futures = [
+            _get_executor().submit(client.search, query, count=count)
+            for query, count in _info_queries(restaurant_name, location, address_count, famous_count)
+        ]
+        response = merge_responses([future.result() for future in futures])
+        return _store(key, response, INFO_TTL, use_cache)
+
+    return _flights.do(key, fetch)
+
+
+async def search_web_async(location, cuisine="", top_n=5, use_cache=True):
+    """asyncio version of search_web, sharing its cache"""
+    key = search_key(location, cuisine, top_n)
+    cached = _cached(key, use_cache)
+    if cached is not None:
+        return cached
+
+    async def fetch():
+        query = _search_query(location, cuisine, top_n)
+        if int(top_n) > PAGE_SIZE:
+            response = await _search_pages_async(query, int(top_n))
+        else:
+            response = await get_async_brave_client(brave_key).search(query, count=PAGE_SIZE)
+        return _store(key, response, SEARCH_TTL, use_cache)
+
+    return await _flights.do_async(key, fetch)
+
+
+async def get_info_async(restaurant_name, location, use_cache=True, address_count=ADDRESS_COUNT,
+                         famous_count=FAMOUS_COUNT):
+    """asyncio version of get_info, sharing its cache"""
+    key = info_key(restaurant_name, location, address_count, famous_count)
+    cached = _cached(key, use_cache)
+    if cached is not None:
+        return cached
+
+    async def fetch():
+        client = get_async_brave_client(brave_key)
+        responses = await asyncio.gather(*(
+            client.search(query, count=count)
+            for query, count in _info_queries(restaurant_name, location, address_count, famous_count)
+        ))
+        return _store(key, merge_responses(responses), INFO_TTL, use_cache)
+
+    return await _flights.do_async(key, fetch)
+
+
+async def search_many_async(queries, count=10, max_concurrency=MAX_CONCURRENCY):
+    """
+    Run many raw Brave queries concurrently
+
+    Args:
+        queries (list): Query strings
+        count (int): Results per query. Default is 10
+        max_concurrency (int): Maximum queries searched concurrently. Defaults to FOODIE_BRAVE_CONCURRENCY
+
+    Returns:
+        list: Brave responses in the same order as queries
+    """
+    client = get_async_brave_client(brave_key)
+    return await gather_limited((client.search(query, count=count) for query in queries), limit=max_concurrency)
+
+
+def _plain(text):
+    return html.unescape(_TAGS.sub('', text or ''))
+
+
+def _trim(text, limit):
+    text = _plain(text)
+    if len(text) <= limit:
+        return text
+    return text[:limit - 1].rstrip() + '…'
+
+
+def project_results(response, snippet_chars=SNIPPET_CHARS, max_chars=PAYLOAD_CHARS):
+    """
+    Project Brave web results down to what the model needs
+
+    Keeps title, url, description and extra snippets, strips HTML highlighting and
+    trims each text to snippet_chars. Results stop once max_chars is spent.
+
+    Args:
+        response (dict): Brave JSON response
+        snippet_chars (int): Budget per description or snippet. Defaults to FOODIE_SNIPPET_CHARS
+        max_chars (int): Budget for all results together. Defaults to FOODIE_PAYLOAD_CHARS
+
+    Returns:
+        list: Compact results
+    """
+    projected = []
+    remaining = max_chars
+    for result in ((response or {}).get('web') or {}).get('results') or []:
+        item = {
+            'title': _trim(result.get('title'), snippet_chars),
+            'url': result.get('url'),
+            'description': _trim(result.get('description'), snippet_chars),
+        }
+        snippets = [_trim(snippet, snippet_chars) for snippet in result.get('extra_snippets') or []]
+        if snippets:
+            item['extra_snippets'] = snippets
+
+        size = len(item['title']) + len(item['url'] or '') + len(item['description']) + sum(map(len, snippets))
+        if projected and size > remaining:
+            break
+        remaining -= size
+        projected.append(item)
+    return projected
+
+
+def project_response(response, snippet_chars=SNIPPET_CHARS, max_chars=PAYLOAD_CHARS):
+    """
+    Compact form of a Brave response for MCP payloads
+
+    Args:
+        response (dict): Brave JSON response
+        snippet_chars (int): Budget per description or snippet. Defaults to FOODIE_SNIPPET_CHARS
+        max_chars (int): Budget for all results together. Defaults to FOODIE_PAYLOAD_CHARS
+
+    Returns:
+        dict: query and projected results, or the error message of an error response
+    """
+    if not _cacheable(response):
+        error = (response.get('error') if isinstance(response, dict) else None) or {}
+        return {'error': error.get('detail') or error.get('code') or 'Brave search failed'}
+    query = (response.get('query') or {}).get('original')
+    return {'query': query, 'results': project_results(response, snippet_chars, max_chars)}
+
+
+def find_addresses(response):
+    """
+    Street addresses in a Brave response, ranked by agreement across results
+
+    Every result's title, description and extra snippets count as one source.
+    Structured postal_address fields count double.
+
+    Args:
+        response (dict): Brave JSON response
+
+    Returns:
+        list: dicts with address, score and sources, best first
+    """
+    sources = []
+    for result in ((response or {}).get('web') or {}).get('results') or []:
+        texts = [result.get('title'), result.get('description')] + list(result.get('extra_snippets') or [])
+        sources.append((' \n '.join(_plain(text) for text in texts if text), 1.0))
+
+        postal = result.get('postal_address') or (result.get('location') or {}).get('postal_address')
+        if isinstance(postal, dict):
+            structured = ', '.join(filter(None, (
+                postal.get('streetAddress'), postal.get('addressLocality'),
+                ' '.join(filter(None, (postal.get('addressRegion'), postal.get('postalCode'))))
+            )))
+            sources.append((structured, 2.0))
+    return rank_addresses(sources)
+
+
+def research_payload(restaurant_name, response):
+    """
+    Compact research result for one restaurant
+
+    Returns:
+        dict: name, best address (None if no result had one), how many results agree on it,
+              and the projected results
+    """
+    payload = project_response(response)
+    candidates = find_addresses(response) if 'error' not in payload else []
+    best = candidates[0] if candidates else None
+    return {
+        'name': restaurant_name,
+        'address': best['address'] if best else None,
+        'address_sources': best['sources'] if best else 0,
+        **payload,
+    }
+
+
+def _unique_names(restaurant_names):
+    if isinstance(restaurant_names, str):
+        restaurant_names = restaurant_names.split('|')
+
+    unique = {}
+    for name in restaurant_names:
+        name = name.strip().strip('"')
+        if name:
+            unique.setdefault(_normalize(name), name)
+    return list(unique.values())
+
+
+async def research_restaurants_async(restaurant_names, location, max_concurrency=MAX_CONCURRENCY):
+    """
+    Research many restaurants in parallel
+
+    Duplicate names (ignoring case and spacing) are looked up once and the
+    get_info lookups run concurrently, at most max_concurrency at a time.
+
+    Args:
+        restaurant_names (list or str): Restaurant names, or one string separated by | (pipe string)
+        location (str): Location the restaurants are near
+        max_concurrency (int): Maximum restaurants researched concurrently, each lookup makes two
+                               Brave requests. Defaults to FOODIE_BRAVE_CONCURRENCY
+
+    Returns:
+        dict: location, addresses (every found address separated by | (pipe string), ready for
+              build_map) and one entry per restaurant from research_payload, or an error
+    """
+    names = _unique_names(restaurant_names)
+    responses = await gather_limited(
+        (get_info_async(name, location) for name in names), limit=max_concurrency, return_exceptions=True
+    )
+
+    restaurants = []
+    for name, response in zip(names, responses):
+        if isinstance(response, Exception):
+            restaurants.append({'name': name, 'error': str(response)})
+        else:
+            restaurants.append(research_payload(name, response))
+
+    addresses = '|'.join(restaurant['address'] for restaurant in restaurants if restaurant.get('address'))
+    return {'location': location, 'addresses': addresses, 'restaurants': restaurants}
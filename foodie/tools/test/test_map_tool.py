@@ -1,6 +1,20 @@
+import os
+import tempfile
+import threading
+import time
 import unittest
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 from unittest.mock import patch, Mock
-from foodie.tools.map_tool import address_to_coordinates, create_static_map
+from foodie.tools.map_tool import (
+    address_to_coordinates, artifact_key, create_png_map, create_static_map, geocode_batch, geocode_key, map_status,
+    publish_map, publish_target, update_map
+)
+from foodie.util.cache import TTLCache
+from foodie.util.marker_store import MarkerStore
+from foodie.util.publish_queue import PublishQueue
+from foodie.util.map_bundle import MAP_JS_PATH
+from foodie.util.surge_util import SurgeBatcher
 
 
 class TestMapAgent(unittest.TestCase):
@@ -92,5 +106,461 @@ class TestMapAgent(unittest.TestCase):
 
         print(create_static_map(address, file_name="test_multiple_map"))
 
+class TestGeocodeCache(unittest.TestCase):
+    def setUp(self):
+        cache_patch = patch('foodie.tools.map_tool.get_geocode_cache', return_value=TTLCache())
+        limiter_patch = patch('foodie.tools.map_tool.get_rate_limiter')
+        cache_patch.start()
+        limiter_patch.start()
+        self.addCleanup(cache_patch.stop)
+        self.addCleanup(limiter_patch.stop)
+
+    @patch('foodie.tools.map_tool.requests.get')
+    def test_cache_hit_skips_request(self, mock_get):
+        mock_get.return_value.json.return_value = [{'lat': '34.0', 'lon': '-84.1'}]
+
+        self.assertEqual(address_to_coordinates("10305 Medlock Bridge Rd, Johns Creek, GA"), (34.0, -84.1))
+        self.assertEqual(address_to_coordinates("  10305 medlock bridge rd,  Johns Creek, GA"), (34.0, -84.1))
+        self.assertEqual(address_to_coordinates("10305 Medlock Bridge Road, Suite 4, Johns Creek, Georgia"), (34.0, -84.1))
+        mock_get.assert_called_once()
+
+    @patch('foodie.tools.map_tool.requests.get')
+    def test_negative_cache(self, mock_get):
+        mock_get.return_value.json.return_value = []
+
+        self.assertEqual(address_to_coordinates("Nowhere Street, Atlantis"), (None, None))
+        self.assertEqual(address_to_coordinates("Nowhere Street, Atlantis"), (None, None))
+        mock_get.assert_called_once()
+
+    @patch('foodie.tools.map_tool.requests.get')
+    def test_concurrent_lookups_share_request(self, mock_get):
+        def slow_get(*args, **kwargs):
+            time.sleep(0.05)
+            response = Mock()
+            response.json.return_value = [{'lat': '34.0', 'lon': '-84.1'}]
+            return response
+
+        mock_get.side_effect = slow_get
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(executor.map(address_to_coordinates, [
+                "10305 Medlock Bridge Rd, Johns Creek, GA",
+                "10305 Medlock Bridge Road, Johns Creek, GA",
+                "10305 medlock bridge rd, johns creek, ga",
+                "10305 Medlock Bridge Rd., Johns Creek, GA",
+            ]))
+
+        self.assertEqual(results, [(34.0, -84.1)] * 4)
+        mock_get.assert_called_once()
+
+    @patch('foodie.tools.map_tool.requests.get')
+    def test_use_cache_false(self, mock_get):
+        mock_get.return_value.json.return_value = [{'lat': '34.0', 'lon': '-84.1'}]
+
+        address_to_coordinates("10305 Medlock Bridge Rd, Johns Creek, GA", use_cache=False)
+        address_to_coordinates("10305 Medlock Bridge Rd, Johns Creek, GA", use_cache=False)
+        self.assertEqual(mock_get.call_count, 2)
+
+
+class TestGeocodeBatch(unittest.TestCase):
+    def setUp(self):
+        self.cache = TTLCache()
+        cache_patch = patch('foodie.tools.map_tool.get_geocode_cache', return_value=self.cache)
+        cache_patch.start()
+        self.addCleanup(cache_patch.stop)
+
+    @patch('foodie.tools.map_tool.address_to_coordinates')
+    def test_dedupes_and_serves_hits_first(self, mock_geocode):
+        self.cache.set('6955 mcginnis ferry rd, johns creek, ga', [34.05, -84.17])
+        mock_geocode.return_value = (34.02, -84.2)
+
+        results = list(geocode_batch(
+            "10305 Medlock Bridge Rd, Johns Creek, GA|"
+            "\"10305 medlock bridge rd,  Johns Creek, GA\"|"
+            "6955 McGinnis Ferry Rd, Johns Creek, GA"
+        ))
+
+        self.assertEqual(results[0], ("6955 McGinnis Ferry Rd, Johns Creek, GA", 34.05, -84.17))
+        self.assertEqual(results[1], ("10305 Medlock Bridge Rd, Johns Creek, GA", 34.02, -84.2))
+        self.assertEqual(len(results), 2)
+        mock_geocode.assert_called_once_with("10305 Medlock Bridge Rd, Johns Creek, GA", True, None)
+
+    @patch('foodie.tools.map_tool.address_to_coordinates')
+    def test_failures_are_yielded(self, mock_geocode):
+        self.cache.set(geocode_key("Nowhere Street, Atlantis"), None)
+        mock_geocode.side_effect = RuntimeError("connection reset")
+
+        results = dict((address, (lat, lng)) for address, lat, lng in geocode_batch(
+            ["Nowhere Street, Atlantis", "10970 State Bridge Rd, Johns Creek, GA"]
+        ))
+
+        self.assertEqual(results["Nowhere Street, Atlantis"], (None, None))
+        self.assertEqual(results["10970 State Bridge Rd, Johns Creek, GA"], (None, None))
+        # The cached failure is served without a lookup
+        mock_geocode.assert_called_once_with("10970 State Bridge Rd, Johns Creek, GA", True, None)
+
+    @patch('foodie.tools.map_tool.address_to_coordinates')
+    def test_same_name_different_street(self, mock_geocode):
+        mock_geocode.side_effect = lambda address, use_cache, backend: (
+            (34.0, -84.1) if address.startswith("Jang Su Jang, 1000") else (34.1, -84.0)
+        )
+
+        results = list(geocode_batch(
+            "Jang Su Jang, 1000 Pleasant Hill Rd, Duluth, GA|Jang Su Jang, 2100 Satellite Blvd, Duluth, GA"
+        ))
+
+        self.assertEqual(sorted(results), [
+            ("Jang Su Jang, 1000 Pleasant Hill Rd, Duluth, GA", 34.0, -84.1),
+            ("Jang Su Jang, 2100 Satellite Blvd, Duluth, GA", 34.1, -84.0),
+        ])
+
+
+class TestLocalBackend(unittest.TestCase):
+    def setUp(self):
+        self.local_geocoder = Mock()
+        self.local_geocoder.lookup.side_effect = lambda address: (34.03, -84.19) if address.startswith('10305') else None
+        for target, value in (('get_geocode_cache', TTLCache()), ('get_local_geocoder', self.local_geocoder)):
+            patcher = patch(f'foodie.tools.map_tool.{target}', return_value=value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        limiter_patch = patch('foodie.tools.map_tool.get_rate_limiter')
+        limiter_patch.start()
+        self.addCleanup(limiter_patch.stop)
+
+    @patch('foodie.tools.map_tool.requests.get')
+    def test_local_hit_skips_remote(self, mock_get):
+        self.assertEqual(address_to_coordinates("10305 Medlock Bridge Rd, Johns Creek, GA", backend='local'), (34.03, -84.19))
+        mock_get.assert_not_called()
+
+    @patch('foodie.tools.map_tool.requests.get')
+    def test_local_miss_falls_back_to_remote(self, mock_get):
+        mock_get.return_value.json.return_value = [{'lat': '40.75', 'lon': '-73.98'}]
+        self.assertEqual(address_to_coordinates("Times Square, New York, NY", backend='local'), (40.75, -73.98))
+        mock_get.assert_called_once()
+
+    @patch('foodie.tools.map_tool.requests.get')
+    def test_nominatim_backend_ignores_local(self, mock_get):
+        mock_get.return_value.json.return_value = [{'lat': '34.0', 'lon': '-84.0'}]
+        self.assertEqual(address_to_coordinates("10305 Medlock Bridge Rd, Johns Creek, GA", backend='nominatim'), (34.0, -84.0))
+        self.local_geocoder.lookup.assert_not_called()
+
+
+class TestArtifactCache(unittest.TestCase):
+    ADDRESSES = "10305 Medlock Bridge Rd, Johns Creek, GA|3505 Peachtree Pkwy, Suwanee, GA"
+    COORDINATES = {
+        "10305 Medlock Bridge Rd, Johns Creek, GA": (34.03, -84.19),
+        "3505 Peachtree Pkwy, Suwanee, GA": (34.05, -84.16),
+    }
+
+    def setUp(self):
+        patchers = [
+            patch('foodie.tools.map_tool.get_artifact_cache', return_value=TTLCache()),
+            patch('foodie.tools.map_tool.geocode_batch', side_effect=lambda addresses: (
+                (address, *self.COORDINATES[address]) for address in addresses
+            )),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_artifact_key(self):
+        pins = [(34.03, -84.19, 'a'), (34.05, -84.16, 'b')]
+        key = artifact_key(pins, 12, 800, 600, 'surge', 'template')
+        self.assertEqual(artifact_key(pins[::-1], 12, 800, 600, 'surge', 'template'), key)
+        self.assertNotEqual(artifact_key(pins, 13, 800, 600, 'surge', 'template'), key)
+        self.assertNotEqual(artifact_key(pins, 12, 800, 600, 'github', 'template'), key)
+
+    @patch('foodie.tools.map_tool.publish_map')
+    def test_identical_map_is_published_once(self, mock_publish):
+        mock_publish.return_value = {'success': True, 'url': 'https://foodie-map-1.surge.sh'}
+
+        first = create_static_map(self.ADDRESSES, renderer='template')
+        reordered = "|".join(reversed(self.ADDRESSES.split("|")))
+        second = create_static_map(reordered, renderer='template')
+
+        self.assertEqual(first, second)
+        self.assertIn('https://foodie-map-1.surge.sh', first['content'][0]['text'])
+        mock_publish.assert_called_once()
+        self.assertIsInstance(mock_publish.call_args[0][0], bytes)
+
+        create_static_map(self.ADDRESSES, zoom=14, renderer='template')
+        create_static_map(self.ADDRESSES, renderer='template', use_cache=False)
+        self.assertEqual(mock_publish.call_count, 3)
+
+    @patch('foodie.tools.map_tool.publish_map')
+    def test_failures_are_not_cached(self, mock_publish):
+        mock_publish.side_effect = [
+            {'success': False, 'error': '[error](Surge deployment failed)'},
+            {'success': True, 'url': 'https://foodie-map-2.surge.sh'},
+        ]
+        for expected in ('[error]', 'foodie-map-2'):
+            result = create_static_map(self.ADDRESSES, renderer='template')
+            self.assertIn(expected, result['content'][0]['text'])
+
+    @patch('foodie.tools.map_tool.get_tile_cache')
+    @patch('foodie.tools.map_tool.render_png', return_value=b'\x89PNG')
+    def test_png_map_is_inline(self, mock_render, mock_tile_cache):
+        content = create_png_map(self.ADDRESSES)['content']
+        self.assertEqual(content[0], {'type': 'image', 'data': 'iVBORw==', 'mimeType': 'image/png'})
+        self.assertIn('1. 10305 Medlock Bridge Rd', content[1]['text'])
+        self.assertEqual(len(mock_render.call_args[0][0]), 2)
+        self.assertIs(mock_render.call_args.kwargs['cache'], mock_tile_cache.return_value)
+
+    @patch('foodie.tools.map_tool.publish_map')
+    def test_bundle_output(self, mock_publish):
+        mock_publish.return_value = {'success': True, 'url': 'https://foodie-map-3.surge.sh'}
+        create_static_map(self.ADDRESSES, output='bundle')
+
+        args, kwargs = mock_publish.call_args
+        self.assertIn(b'window.FOODIE_MAP=', args[0])
+        self.assertTrue(all(path.startswith('assets/foodie-map.') for path in kwargs['assets']))
+
+    @patch('foodie.tools.map_tool.GitHubUploader')
+    def test_github_assets_are_published_once(self, mock_uploader):
+        uploader = mock_uploader.return_value
+        uploader.file_exists.return_value = (False, None)
+        uploader.upload_file.return_value = {'success': True, 'urls': {'pages_url': 'https://pages/map.html'}}
+        assets = {'assets/foodie-map.abc.js': b'js'}
+
+        for _ in range(2):
+            result = publish_map(b'<html></html>', by='github', file_name='korean-atlanta', assets=assets,
+                                 variants={'.gz': b'gz'})
+            self.assertEqual(result, {'success': True, 'url': 'https://pages/map.html'})
+
+        paths = [call.kwargs['repo_file_path'] for call in uploader.upload_file.call_args_list]
+        self.assertEqual(paths.count('docs/assets/foodie-map.abc.js'), 1)
+        self.assertEqual(len([path for path in paths if path.endswith('.html.gz')]), 2)
+
+    @patch('foodie.tools.map_tool.GitHubUploader')
+    def test_github_upload_failures_are_reported(self, mock_uploader):
+        uploader = mock_uploader.return_value
+        uploader.file_exists.return_value = (True, None)
+        uploader.upload_file.side_effect = lambda source, repo_file_path: (
+            {'success': False, 'error': 'HTTP 422'} if repo_file_path.endswith('.gz')
+            else {'success': True, 'urls': {'pages_url': 'https://pages/map.html'}}
+        )
+
+        result = publish_map(b'<html></html>', by='github', file_name='korean-atlanta', variants={'.gz': b'gz'})
+        self.assertEqual(result, {'success': False, 'error': '[error](HTTP 422)'})
+        self.assertEqual(uploader.upload_file.call_count, 1)
+
+    @patch('foodie.util.surge_util.upload_to_surge')
+    @patch('foodie.util.surge_util.get_surge_batcher')
+    def test_surge_batch_domain(self, mock_batcher, mock_upload):
+        mock_batcher.return_value.publish.return_value = {'success': True, 'url': 'https://maps.surge.sh/m/'}
+        self.assertEqual(publish_map(b'<html></html>'), {'success': True, 'url': 'https://maps.surge.sh/m/'})
+        self.assertTrue(mock_batcher.return_value.publish.call_args[0][0].startswith('foodie-map-'))
+        mock_upload.assert_not_called()
+
+    @patch('foodie.tools.map_tool._github_uploader')
+    @patch('foodie.util.surge_util.get_surge_batcher', return_value=None)
+    def test_targets_in_the_same_second_differ(self, mock_batcher, mock_uploader):
+        mock_uploader.return_value.pages_url.side_effect = lambda path: f'https://pages/{path}'
+        for by in ('surge', 'github'):
+            urls = {publish_target(by, 'korean-atlanta')['url'] for _ in range(5)}
+            self.assertEqual(len(urls), 5)
+
+    def test_invalid_host(self):
+        self.assertIn("by should be", create_static_map(self.ADDRESSES, by='netlify')['content'][0]['text'])
+
+
+class TestLiveMap(unittest.TestCase):
+    COORDINATES = dict(TestArtifactCache.COORDINATES, **{
+        "6000 Medlock Bridge Pkwy, Johns Creek, GA": (34.04, -84.20),
+        "3000 Old Alabama Rd, Johns Creek, GA": (34.02, -84.25),
+    })
+
+    def setUp(self):
+        self.store = MarkerStore()
+        self.geocoded = []
+
+        def geocode(addresses):
+            for address in addresses:
+                self.geocoded.append(address)
+                yield (address, *self.COORDINATES.get(address, (None, None)))
+
+        patchers = [
+            patch('foodie.tools.map_tool.get_marker_store', return_value=self.store),
+            patch('foodie.tools.map_tool.get_artifact_cache', return_value=TTLCache()),
+            patch('foodie.tools.map_tool.geocode_batch', side_effect=geocode),
+            patch('foodie.tools.map_tool.publish_live_map',
+                  side_effect=lambda info, points, data_only=False: {'success': True, 'url': f"https://{info['domain']}"}),
+        ]
+        self.mock_publish = patchers[-1].start()
+        self.addCleanup(patchers[-1].stop)
+        for patcher in patchers[:-1]:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_create_and_update(self):
+        result = create_static_map(TestArtifactCache.ADDRESSES, output='live')
+        map_id = result['content'][1]['text'].split()[1]
+        info = self.store.get_map(map_id)
+        self.assertEqual((info['domain'], info['data_url']), (f'foodie-map-{map_id}.surge.sh', 'markers.json'))
+        self.assertIn(info['url'], result['content'][0]['text'])
+        self.assertEqual(len(self.store.markers(map_id)), 2)
+
+        self.geocoded.clear()
+        result = update_map(map_id, add_addresses="6000 Medlock Bridge Pkwy, Johns Creek, GA|3505 Peachtree Pkwy, Suwanee, GA",
+                            remove_addresses="10305 Medlock Bridge Rd, Johns Creek, GA")
+        self.assertIn('Added 1, removed 1 pins', result['content'][1]['text'])
+        self.assertEqual(self.geocoded, ["6000 Medlock Bridge Pkwy, Johns Creek, GA"])
+
+        args, kwargs = self.mock_publish.call_args
+        self.assertTrue(kwargs['data_only'])
+        self.assertEqual([point[2] for point in args[1]],
+                         ["3505 Peachtree Pkwy, Suwanee, GA", "6000 Medlock Bridge Pkwy, Johns Creek, GA"])
+        self.assertEqual([marker[1] for marker in self.store.markers(map_id)],
+                         ["3505 Peachtree Pkwy, Suwanee, GA", "6000 Medlock Bridge Pkwy, Johns Creek, GA"])
+
+    def test_identical_live_map_is_reused_until_updated(self):
+        first = create_static_map(TestArtifactCache.ADDRESSES, output='live')
+        self.assertEqual(create_static_map(TestArtifactCache.ADDRESSES, output='live'), first)
+        self.assertEqual(self.mock_publish.call_count, 1)
+
+        map_id = first['content'][1]['text'].split()[1]
+        update_map(map_id, add_addresses="6000 Medlock Bridge Pkwy, Johns Creek, GA")
+        third = create_static_map(TestArtifactCache.ADDRESSES, output='live')
+        self.assertNotEqual(third['content'][1]['text'].split()[1], map_id)
+
+    def test_concurrent_updates_keep_every_pin(self):
+        map_id = create_static_map(TestArtifactCache.ADDRESSES, output='live')['content'][1]['text'].split()[1]
+        published = []
+
+        def slow_publish(info, points, data_only=False):
+            time.sleep(0.05)
+            published.append({point[2] for point in points})
+            return {'success': True, 'url': f"https://{info['domain']}"}
+
+        self.mock_publish.side_effect = slow_publish
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            list(executor.map(lambda address: update_map(map_id, add_addresses=address), [
+                "6000 Medlock Bridge Pkwy, Johns Creek, GA", "3000 Old Alabama Rd, Johns Creek, GA"
+            ]))
+
+        stored = {marker[1] for marker in self.store.markers(map_id)}
+        self.assertEqual(len(stored), 4)
+        self.assertEqual(published[-1], stored)
+
+    def test_update_errors(self):
+        self.assertIn('Unknown map id', update_map('nope', add_addresses="6000 Medlock Bridge Pkwy, Johns Creek, GA")
+                      ['content'][0]['text'])
+
+        map_id = create_static_map(TestArtifactCache.ADDRESSES, output='live')['content'][1]['text'].split()[1]
+        result = update_map(map_id, remove_addresses=TestArtifactCache.ADDRESSES)
+        self.assertIn('at least one pin', result['content'][0]['text'])
+        self.assertIn('Nothing changed', update_map(map_id, add_addresses="1 Nowhere Street, Atlantis")['content'][1]['text'])
+        self.assertEqual(len(self.store.markers(map_id)), 2)
+
+
+class TestLiveMapBatch(unittest.TestCase):
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.site_dir = os.path.join(temp_dir.name, 'site')
+        self.store = MarkerStore()
+        self.batcher = SurgeBatcher('maps.surge.sh', site_dir=self.site_dir, window=0,
+                                    deploy=lambda site_dir, domain: {'success': True, 'output': ''})
+        patchers = [
+            patch('foodie.tools.map_tool.get_marker_store', return_value=self.store),
+            patch('foodie.tools.map_tool.get_artifact_cache', return_value=TTLCache()),
+            patch('foodie.tools.map_tool.geocode_batch', side_effect=lambda addresses: (
+                (address, *TestLiveMap.COORDINATES[address]) for address in addresses
+            )),
+            patch('foodie.util.surge_util.get_surge_batcher', return_value=self.batcher),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_live_map_is_a_subpath_of_the_batch_domain(self):
+        result = create_static_map(TestArtifactCache.ADDRESSES, output='live')
+        map_id = result['content'][1]['text'].split()[1]
+        self.assertIn(f'https://maps.surge.sh/foodie-map-{map_id}/', result['content'][0]['text'])
+        self.assertTrue(os.path.exists(os.path.join(self.site_dir, f'foodie-map-{map_id}', 'markers.json')))
+
+        update_map(map_id, add_addresses="6000 Medlock Bridge Pkwy, Johns Creek, GA")
+        with open(os.path.join(self.site_dir, f'foodie-map-{map_id}', 'markers.json'), 'rb') as f:
+            self.assertIn(b'6000 Medlock Bridge Pkwy', f.read())
+        self.assertEqual(self.batcher.stats()['deploys'], 2)
+
+    def test_maps_share_one_copy_of_the_assets(self):
+        live_id = create_static_map(TestArtifactCache.ADDRESSES, output='live')['content'][1]['text'].split()[1]
+        create_static_map("6000 Medlock Bridge Pkwy, Johns Creek, GA", output='bundle')
+
+        maps = [name for name in os.listdir(self.site_dir) if name.startswith('foodie-map-')]
+        self.assertEqual(len(maps), 2)
+        for name in maps:
+            self.assertNotIn('assets', os.listdir(os.path.join(self.site_dir, name)))
+            with open(os.path.join(self.site_dir, name, 'index.html'), 'rb') as f:
+                self.assertIn(b'src="../assets/foodie-map.', f.read())
+        copies = [path for path in Path(self.site_dir).rglob('foodie-map.*.js')]
+        self.assertEqual(copies, [Path(self.site_dir, MAP_JS_PATH)])
+        self.assertIn(f'foodie-map-{live_id}', maps)
+
+
+class TestBackgroundPublish(unittest.TestCase):
+    def setUp(self):
+        self.queue = PublishQueue(max_workers=2)
+        self.store = MarkerStore()
+        self.release = threading.Event()
+        self.uploads = []
+
+        def upload(content, project_name=None, files=None, custom_domain=None):
+            self.release.wait(5)
+            self.uploads.append(project_name or custom_domain)
+            domain = custom_domain or f'{project_name}.surge.sh'
+            return {'success': True, 'url': f'https://{domain}', 'domain': domain}
+
+        patchers = [
+            patch('foodie.tools.map_tool.get_publish_queue', return_value=self.queue),
+            patch('foodie.tools.map_tool.get_artifact_cache', return_value=TTLCache()),
+            patch('foodie.tools.map_tool.get_marker_store', return_value=self.store),
+            patch('foodie.tools.map_tool.geocode_batch', side_effect=lambda addresses: (
+                (address, *TestArtifactCache.COORDINATES[address]) for address in addresses
+            )),
+            patch('foodie.util.surge_util.get_surge_batcher', return_value=None),
+            patch('foodie.util.surge_util.upload_to_surge', side_effect=upload),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.addCleanup(self.queue.shutdown)
+        self.addCleanup(self.release.set)
+
+    def test_predicted_url_is_returned_at_once(self):
+        result = create_static_map(TestArtifactCache.ADDRESSES, renderer='template', background=True)
+        map_id = result['content'][1]['text'].split()[1]
+        self.assertRegex(result['content'][0]['text'], r'https://foodie-map-\d+-[0-9a-f]{6}\.surge\.sh')
+        self.assertEqual(self.uploads, [])
+        self.assertIn('pending', map_status(map_id)['content'][0]['text'])
+
+        # The same map while it is uploading is not queued again
+        self.assertEqual(create_static_map(TestArtifactCache.ADDRESSES, renderer='template', background=True), result)
+
+        self.release.set()
+        self.queue.wait(map_id, timeout=5)
+        self.assertEqual(len(self.uploads), 1)
+        self.assertEqual(map_status(map_id)['content'][0]['text'],
+                         f"live: [link](https://{self.uploads[0]}.surge.sh)")
+
+    def test_live_map_is_stored_once_published(self):
+        result = create_static_map(TestArtifactCache.ADDRESSES, output='live', background=True)
+        map_id = result['content'][1]['text'].split()[1]
+        self.assertIn(f'https://foodie-map-{map_id}.surge.sh', result['content'][0]['text'])
+        self.assertIn('still being published', update_map(map_id, remove_addresses=TestArtifactCache.ADDRESSES)
+                      ['content'][0]['text'])
+
+        self.release.set()
+        self.queue.wait(map_id, timeout=5)
+        self.assertEqual(len(self.store.markers(map_id)), 2)
+        self.assertIn('live', map_status(map_id)['content'][0]['text'])
+
+    def test_unknown_and_failed(self):
+        self.assertIn('Unknown map id', map_status('nope')['content'][0]['text'])
+        self.queue.submit('bad', 'https://bad.surge.sh', lambda: {'success': False, 'error': '[error](quota)'})
+        self.queue.wait('bad', timeout=5)
+        self.assertEqual(map_status('bad')['content'][0]['text'], 'failed: [error](quota)')
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
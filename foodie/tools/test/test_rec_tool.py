@@ -0,0 +1,238 @@
+import asyncio
+import unittest
+from unittest.mock import patch, AsyncMock
+from foodie.tools.rec_tool import (
+    search_web, get_info, get_cache_stats, search_web_async, get_info_async, search_many_async,
+    research_restaurants_async, iter_search_results, merge_responses, project_response, find_addresses
+)
+from foodie.util.cache import TTLCache
+
+
+def fake_page(offset, count):
+    # Every page after the first repeats the last two restaurants of the previous one
+    start = offset * (count - 2)
+    results = [{'title': f'Restaurant {i}', 'url': f'https://r{i}.example/{offset}'} for i in range(start, start + count)]
+    return {'query': {'original': f'page {offset}', 'more_results_available': True}, 'web': {'results': results}}
+
+
+class TestRecTool(unittest.TestCase):
+    def setUp(self):
+        cache_patch = patch('foodie.tools.rec_tool.get_response_cache', return_value=TTLCache(max_entries=2))
+        cache_patch.start()
+        self.addCleanup(cache_patch.stop)
+
+    @patch('foodie.tools.rec_tool.get_brave_client')
+    def test_search_web_uses_shared_client(self, mock_client):
+        mock_client.return_value.search.return_value = {'web': {'results': []}}
+
+        self.assertEqual(search_web("johns creek", cuisine="korean"), {'web': {'results': []}})
+        args, kwargs = mock_client.return_value.search.call_args
+        self.assertEqual(args[0], "top 5 korean restaurants in johns creek")
+        self.assertEqual(kwargs['count'], 10)
+
+    @patch('foodie.tools.rec_tool.get_brave_client')
+    def test_search_web_paginates_lazily(self, mock_client):
+        mock_client.return_value.search.side_effect = lambda query, count, offset: fake_page(offset, count)
+
+        response = search_web("johns creek", cuisine="korean", top_n=15)
+        titles = [result['title'] for result in response['web']['results']]
+        self.assertEqual(len(titles), 15)
+        self.assertEqual(len(set(titles)), 15)
+        self.assertEqual(response['query']['original'], 'page 0')
+
+        # Page 1 repeats two restaurants of page 0 and completes top 15. At most page 2 was prefetched
+        offsets = sorted(call.kwargs['offset'] for call in mock_client.return_value.search.call_args_list)
+        self.assertEqual(offsets[:2], [0, 1])
+        self.assertLessEqual(len(offsets), 3)
+
+    @patch('foodie.tools.rec_tool.get_brave_client')
+    def test_iter_search_results_stops_early(self, mock_client):
+        mock_client.return_value.search.side_effect = lambda query, count, offset: fake_page(offset, count)
+
+        results = iter_search_results("korean restaurants", top_n=3)
+        self.assertEqual(len([next(results) for _ in range(3)]), 3)
+        self.assertEqual(list(results), [])
+        self.assertLessEqual(mock_client.return_value.search.call_count, 2)
+
+        mock_client.return_value.search.side_effect = [{'type': 'ErrorResponse', 'error': {'code': 'HTTP_429'}}]
+        self.assertEqual(list(iter_search_results("korean restaurants", top_n=30)), [])
+
+    @patch('foodie.tools.rec_tool.get_brave_client')
+    def test_get_info_uses_shared_client(self, mock_client):
+        mock_client.return_value.search.return_value = {'web': {'results': []}}
+        get_info("Jang Su Jang", "johns creek")
+        get_info("Sushi Hayakawa", "atlanta")
+        self.assertEqual(mock_client.return_value.search.call_count, 4)
+
+    @patch('foodie.tools.rec_tool.get_brave_client')
+    def test_get_info_merges_two_queries(self, mock_client):
+        def search(query, count=10):
+            if query.startswith('What is street address'):
+                return {'type': 'search', 'web': {'results': [{'url': 'https://a'}, {'url': 'https://b'}][:count]}}
+            return {'type': 'search', 'web': {'results': [{'url': 'https://b'}, {'url': 'https://c'}][:count]}}
+
+        mock_client.return_value.search.side_effect = search
+        response = get_info("Jang Su Jang", "johns creek", address_count=2, famous_count=2)
+
+        self.assertEqual([r['url'] for r in response['web']['results']], ['https://a', 'https://b', 'https://c'])
+        counts = sorted(call.kwargs['count'] for call in mock_client.return_value.search.call_args_list)
+        self.assertEqual(counts, [2, 2])
+        for call in mock_client.return_value.search.call_args_list:
+            self.assertIsInstance(call.args[0], str)
+
+    def test_merge_responses_skips_errors(self):
+        error = {'type': 'ErrorResponse', 'error': {'code': 'RATE_LIMITED'}}
+        ok = {'type': 'search', 'web': {'results': [{'url': 'https://a'}]}}
+
+        self.assertEqual(merge_responses([error, ok])['web']['results'], [{'url': 'https://a'}])
+        self.assertIs(merge_responses([error, error]), error)
+
+    @patch('foodie.tools.rec_tool.get_brave_client')
+    def test_search_web_cache_key_normalization(self, mock_client):
+        mock_client.return_value.search.return_value = {'web': {'results': [{'title': 'Jang Su Jang'}]}}
+
+        search_web("Johns Creek", cuisine="Korean", top_n=5)
+        search_web("  johns   creek ", cuisine="korean", top_n="5")
+        search_web("johns creek", cuisine="japanese", top_n=5)
+
+        self.assertEqual(mock_client.return_value.search.call_count, 2)
+        stats = get_cache_stats()
+        self.assertEqual((stats['hits'], stats['misses']), (1, 2))
+
+    @patch('foodie.tools.rec_tool.get_brave_client')
+    def test_error_responses_are_not_cached(self, mock_client):
+        mock_client.return_value.search.return_value = {'type': 'ErrorResponse', 'error': {'code': 'RATE_LIMITED'}}
+
+        search_web("johns creek", cuisine="korean")
+        search_web("johns creek", cuisine="korean")
+        self.assertEqual(mock_client.return_value.search.call_count, 2)
+
+    @patch('foodie.tools.rec_tool.get_brave_client')
+    def test_evictions(self, mock_client):
+        mock_client.return_value.search.return_value = {'web': {'results': []}}
+
+        for name in ("a", "b", "c"):
+            get_info(name, "johns creek")
+        self.assertEqual(get_cache_stats()['evictions'], 1)
+
+
+    def test_project_response(self):
+        response = {
+            'query': {'original': 'top 5 korean restaurants in johns creek'},
+            'web': {'results': [
+                {'title': 'Best <strong>Korean</strong> &amp; BBQ', 'url': 'https://a', 'description': 'x' * 50,
+                 'page_age': '2024-01-01', 'extra_snippets': ['y' * 50, 'short']},
+                {'title': 'Second', 'url': 'https://b', 'description': 'z' * 100},
+            ]}
+        }
+        projected = project_response(response, snippet_chars=20, max_chars=100)
+
+        self.assertEqual(projected['query'], 'top 5 korean restaurants in johns creek')
+        self.assertEqual(len(projected['results']), 1)
+        first = projected['results'][0]
+        self.assertEqual(first['title'], 'Best Korean & BBQ')
+        self.assertEqual(first['description'], 'x' * 19 + '…')
+        self.assertEqual(first['extra_snippets'], ['y' * 19 + '…', 'short'])
+        self.assertNotIn('page_age', first)
+
+        self.assertEqual(project_response({'type': 'ErrorResponse', 'error': {'code': 'RATE_LIMITED'}}),
+                         {'error': 'RATE_LIMITED'})
+
+
+    def test_find_addresses_uses_structured_fields(self):
+        response = {'web': {'results': [
+            {'title': 'Jang Su Jang', 'description': 'Now at 100 Main St, Duluth, GA 30096'},
+            {'title': 'Jang Su Jang - Yelp', 'description': 'Korean BBQ',
+             'location': {'postal_address': {'streetAddress': '3105 Peachtree Industrial Blvd',
+                                             'addressLocality': 'Duluth', 'addressRegion': 'GA',
+                                             'postalCode': '30097'}}},
+        ]}}
+        ranked = find_addresses(response)
+        self.assertEqual(ranked[0]['address'], '3105 Peachtree Industrial Blvd, Duluth, GA 30097')
+        self.assertEqual(ranked[1]['address'], '100 Main St, Duluth, GA 30096')
+
+
+class TestRecToolAsync(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        cache_patch = patch('foodie.tools.rec_tool.get_response_cache', return_value=TTLCache())
+        cache_patch.start()
+        self.addCleanup(cache_patch.stop)
+
+    @patch('foodie.tools.rec_tool.get_async_brave_client')
+    async def test_search_web_async_paginates(self, mock_client):
+        mock_client.return_value.search = AsyncMock(side_effect=lambda query, count, offset: fake_page(offset, count))
+
+        response = await search_web_async("johns creek", cuisine="korean", top_n=20)
+        titles = [result['title'] for result in response['web']['results']]
+        self.assertEqual(titles, [f'Restaurant {i}' for i in range(20)])
+        self.assertLessEqual(mock_client.return_value.search.call_count, 4)
+
+    @patch('foodie.tools.rec_tool.get_async_brave_client')
+    async def test_async_functions_share_cache(self, mock_client):
+        mock_client.return_value.search = AsyncMock(return_value={'web': {'results': []}})
+
+        await search_web_async("johns creek", cuisine="korean")
+        await search_web_async("Johns Creek", cuisine="Korean")
+        await get_info_async("Jang Su Jang", "johns creek")
+        with patch('foodie.tools.rec_tool.get_brave_client') as mock_sync_client:
+            get_info("jang su jang", "Johns Creek")
+            mock_sync_client.assert_not_called()
+
+        self.assertEqual(mock_client.return_value.search.call_count, 3)
+
+    @patch('foodie.tools.rec_tool.get_async_brave_client')
+    async def test_identical_requests_are_coalesced(self, mock_client):
+        async def search(query, count=10):
+            await asyncio.sleep(0.01)
+            return {'web': {'results': [{'url': query}]}}
+
+        mock_client.return_value.search = AsyncMock(side_effect=search)
+        results = await asyncio.gather(*(get_info_async("Jang Su Jang", "johns creek", use_cache=False)
+                                         for _ in range(5)))
+
+        self.assertEqual(mock_client.return_value.search.call_count, 2)
+        self.assertTrue(all(result == results[0] for result in results))
+
+    @patch('foodie.tools.rec_tool.get_async_brave_client')
+    async def test_search_many_keeps_order(self, mock_client):
+        async def search(query, count=10):
+            await asyncio.sleep(0.01 if query == 'first' else 0)
+            return {'query': query}
+
+        mock_client.return_value.search = search
+        results = await search_many_async(['first', 'second', 'third'], max_concurrency=2)
+        self.assertEqual([result['query'] for result in results], ['first', 'second', 'third'])
+
+
+    @patch('foodie.tools.rec_tool.get_async_brave_client')
+    async def test_research_restaurants(self, mock_client):
+        async def search(queries, count=10):
+            await asyncio.sleep(0)
+            if 'Broken' in queries:
+                raise TimeoutError('read timeout')
+            return {'web': {'results': [{
+                'title': queries, 'url': 'https://example.com',
+                'description': 'Korean BBQ at <strong>3105 Peachtree Industrial Blvd</strong>, Duluth, GA 30097',
+                'thumbnail': {'src': 'https://example.com/large.jpg'}, 'profile': {'name': 'Example'}
+            }]}}
+
+        mock_client.return_value.search = AsyncMock(side_effect=search)
+        payload = await research_restaurants_async(
+            "Jang Su Jang| jang su  jang |Broken Place|Sushi Hayakawa", "johns creek", max_concurrency=2
+        )
+
+        self.assertEqual(mock_client.return_value.search.call_count, 6)
+        self.assertEqual([r['name'] for r in payload['restaurants']], ['Jang Su Jang', 'Broken Place', 'Sushi Hayakawa'])
+        self.assertEqual(payload['restaurants'][1], {'name': 'Broken Place', 'error': 'read timeout'})
+        self.assertEqual(
+            set(payload['restaurants'][0]['results'][0]), {'title', 'url', 'description'}
+        )
+        self.assertEqual(payload['restaurants'][0]['address'], '3105 Peachtree Industrial Blvd, Duluth, GA 30097')
+        self.assertEqual(
+            payload['addresses'],
+            '3105 Peachtree Industrial Blvd, Duluth, GA 30097|3105 Peachtree Industrial Blvd, Duluth, GA 30097'
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,310 @@
+import re
+from functools import lru_cache
+
+
+# USPS Publication 28 street suffixes: every known spelling -> standard abbreviation
+STREET_SUFFIXES = {
+    'alley': 'aly', 'allee': 'aly', 'ally': 'aly', 'aly': 'aly',
+    'avenue': 'ave', 'av': 'ave', 'aven': 'ave', 'avenu': 'ave', 'avn': 'ave', 'avnue': 'ave', 'ave': 'ave',
+    'bend': 'bnd', 'bnd': 'bnd',
+    'boulevard': 'blvd', 'boul': 'blvd', 'boulv': 'blvd', 'blvd': 'blvd',
+    'bypass': 'byp', 'byp': 'byp',
+    'causeway': 'cswy', 'cswy': 'cswy',
+    'center': 'ctr', 'centre': 'ctr', 'cntr': 'ctr', 'ctr': 'ctr',
+    'circle': 'cir', 'circ': 'cir', 'crcl': 'cir', 'cir': 'cir',
+    'court': 'ct', 'crt': 'ct', 'ct': 'ct',
+    'cove': 'cv', 'cv': 'cv',
+    'creek': 'crk', 'crk': 'crk',
+    'crossing': 'xing', 'crssng': 'xing', 'xing': 'xing',
+    'drive': 'dr', 'driv': 'dr', 'drv': 'dr', 'dr': 'dr',
+    'expressway': 'expy', 'expr': 'expy', 'express': 'expy', 'expw': 'expy', 'expy': 'expy',
+    'freeway': 'fwy', 'frway': 'fwy', 'frwy': 'fwy', 'fwy': 'fwy',
+    'highway': 'hwy', 'highwy': 'hwy', 'hiway': 'hwy', 'hiwy': 'hwy', 'hway': 'hwy', 'hwy': 'hwy',
+    'lane': 'ln', 'ln': 'ln',
+    'loop': 'loop', 'loops': 'loop',
+    'parkway': 'pkwy', 'parkwy': 'pkwy', 'pkway': 'pkwy', 'pky': 'pkwy', 'pkwy': 'pkwy',
+    'pike': 'pike', 'pikes': 'pike',
+    'place': 'pl', 'pl': 'pl',
+    'plaza': 'plz', 'plza': 'plz', 'plz': 'plz',
+    'point': 'pt', 'pt': 'pt',
+    'road': 'rd', 'rd': 'rd',
+    'route': 'rte', 'rte': 'rte',
+    'square': 'sq', 'sqr': 'sq', 'squ': 'sq', 'sq': 'sq',
+    'street': 'st', 'str': 'st', 'strt': 'st', 'st': 'st',
+    'terrace': 'ter', 'terr': 'ter', 'ter': 'ter',
+    'trace': 'trce', 'trce': 'trce',
+    'trail': 'trl', 'trl': 'trl',
+    'turnpike': 'tpke', 'trnpk': 'tpke', 'turnpk': 'tpke', 'tpke': 'tpke',
+    'way': 'way', 'wy': 'way',
+}
+
+DIRECTIONALS = {
+    'north': 'n', 'south': 's', 'east': 'e', 'west': 'w',
+    'northeast': 'ne', 'northwest': 'nw', 'southeast': 'se', 'southwest': 'sw',
+    'n': 'n', 's': 's', 'e': 'e', 'w': 'w', 'ne': 'ne', 'nw': 'nw', 'se': 'se', 'sw': 'sw',
+}
+
+STATES = {
+    'alabama': 'al', 'alaska': 'ak', 'arizona': 'az', 'arkansas': 'ar', 'california': 'ca',
+    'colorado': 'co', 'connecticut': 'ct', 'delaware': 'de', 'district of columbia': 'dc',
+    'florida': 'fl', 'georgia': 'ga', 'hawaii': 'hi', 'idaho': 'id', 'illinois': 'il',
+    'indiana': 'in', 'iowa': 'ia', 'kansas': 'ks', 'kentucky': 'ky', 'louisiana': 'la',
+    'maine': 'me', 'maryland': 'md', 'massachusetts': 'ma', 'michigan': 'mi', 'minnesota': 'mn',
+    'mississippi': 'ms', 'missouri': 'mo', 'montana': 'mt', 'nebraska': 'ne', 'nevada': 'nv',
+    'new hampshire': 'nh', 'new jersey': 'nj', 'new mexico': 'nm', 'new york': 'ny',
+    'north carolina': 'nc', 'north dakota': 'nd', 'ohio': 'oh', 'oklahoma': 'ok', 'oregon': 'or',
+    'pennsylvania': 'pa', 'puerto rico': 'pr', 'rhode island': 'ri', 'south carolina': 'sc',
+    'south dakota': 'sd', 'tennessee': 'tn', 'texas': 'tx', 'utah': 'ut', 'vermont': 'vt',
+    'virginia': 'va', 'washington': 'wa', 'west virginia': 'wv', 'wisconsin': 'wi', 'wyoming': 'wy',
+}
+STATE_CODES = frozenset(STATES.values())
+
+# Standard abbreviation -> spelled out form, for style='long'
+_SPELLED_OUT = (
+    'alley', 'avenue', 'bend', 'boulevard', 'bypass', 'causeway', 'center', 'circle', 'court', 'cove', 'creek',
+    'crossing', 'drive', 'expressway', 'freeway', 'highway', 'lane', 'loop', 'parkway', 'pike', 'place', 'plaza',
+    'point', 'road', 'route', 'square', 'street', 'terrace', 'trace', 'trail', 'turnpike', 'way',
+    'north', 'south', 'east', 'west', 'northeast', 'northwest', 'southeast', 'southwest',
+)
+LONG_FORMS = {STREET_SUFFIXES.get(name) or DIRECTIONALS[name]: name for name in _SPELLED_OUT}
+
+_COUNTRIES = frozenset(('usa', 'us', 'united states', 'united states of america'))
+_PUNCTUATION = re.compile(r'[.;"\'()]+')
+_WHITESPACE = re.compile(r'\s+')
+_ZIP = re.compile(r'(?:^|\s)(\d{5})(?:-\d{4})?$')
+_UNIT = re.compile(
+    r'(?:^|\s)(?:apt|apartment|suite|ste|unit|bldg|building|floor|fl|rm|room|dept|lot|spc|space|#)'
+    r'\s*#?\s*(?:[a-z]?\d[a-z0-9-]*|[a-z])(?=\s|$)'
+)
+_HASH_UNIT = re.compile(r'\s*#\s*[a-z0-9-]+')
+_HOUSE_NUMBER = re.compile(r'^\d+[a-z]?(?:-\d+[a-z]?)?$')
+
+
+def _fold(address):
+    text = _PUNCTUATION.sub('', address.lower())
+    return _WHITESPACE.sub(' ', text).strip()
+
+
+def normalize_street(street, style='short'):
+    """
+    Normalize street suffixes and directionals to USPS form
+
+    Args:
+        street (str): Street name such as "Medlock Bridge Road"
+        style (str): 'short' collapses to USPS abbreviations (rd, n), 'long' expands them (road, north)
+
+    Returns:
+        str: Lower case street name
+    """
+    tokens = _fold(street).split()
+    tokens = [DIRECTIONALS.get(token) or STREET_SUFFIXES.get(token) or token for token in tokens]
+    if style == 'long':
+        tokens = [LONG_FORMS.get(token, token) for token in tokens]
+    return ' '.join(tokens)
+
+
+def _strip_units(part):
+    part = _UNIT.sub('', part)
+    return _HASH_UNIT.sub('', part).strip()
+
+
+def _split_parts(address):
+    # Comma separated parts with the country, ZIP, state and unit designators taken off
+    parts = [part.strip() for part in _fold(address).split(',')]
+    parts = [part for part in parts if part]
+    if parts and parts[-1] in _COUNTRIES:
+        parts.pop()
+
+    zip_code = None
+    if parts:
+        match = _ZIP.search(parts[-1])
+        if match:
+            zip_code = match.group(1)
+            parts[-1] = parts[-1][:match.start()].strip()
+            if not parts[-1]:
+                parts.pop()
+
+    # A trailing state is only trusted when it cannot be part of the street line ("123 Main Ct")
+    state = None
+    if parts and (len(parts) > 1 or zip_code):
+        tokens = parts[-1].split()
+        for width in (3, 2, 1):
+            if len(tokens) < width:
+                continue
+            candidate = ' '.join(tokens[-width:])
+            code = STATES.get(candidate) or (candidate if width == 1 and candidate in STATE_CODES else None)
+            if code and (len(tokens) > width or len(parts) > 1):
+                state = code
+                parts[-1] = ' '.join(tokens[:-width])
+                if not parts[-1]:
+                    parts.pop()
+                break
+
+    parts = [_strip_units(part) for part in parts]
+    return [part for part in parts if part], state, zip_code
+
+
+def _street_index(parts):
+    # The street line is the part starting with a house number, preferably one with a street
+    # suffix ("7 Spice, 1000 Pleasant Hill Rd"). Without any, the first part is taken
+    numbered = [i for i, part in enumerate(parts) if _HOUSE_NUMBER.match(part.split(' ', 1)[0])]
+    for i in numbered:
+        if any(token in STREET_SUFFIXES or token in DIRECTIONALS for token in parts[i].split()[1:]):
+            return i
+    return numbered[0] if numbered else 0
+
+
+def _street_line(part, style='short'):
+    tokens = part.split(' ', 1)
+    if _HOUSE_NUMBER.match(tokens[0]):
+        return tokens[0], normalize_street(tokens[1] if len(tokens) > 1 else '', style=style) or None
+    return None, normalize_street(part, style=style) or None
+
+
+def parse_address(address, style='short'):
+    """
+    Split a US address into components
+
+    Case, whitespace and punctuation are folded, unit designators (Suite 4, Apt B, #12)
+    are dropped and the state is reduced to its two letter code. The street line is the
+    part with the house number, so a leading place name ("Jang Su Jang, 1000 ...") is skipped.
+
+    Args:
+        address (str): Address such as "10305 Medlock Bridge Road, Suite 4, Johns Creek, Georgia 30097"
+        style (str): 'short' or 'long' form for street suffixes and directionals
+
+    Returns:
+        dict: number, street, city, state and zip. Missing components are None
+    """
+    parts, state, zip_code = _split_parts(address)
+
+    number, street, city = None, None, None
+    if parts:
+        index = _street_index(parts)
+        number, street = _street_line(parts[index], style=style)
+        if index < len(parts) - 1:
+            city = parts[-1]
+
+    return {'number': number, 'street': street, 'city': city, 'state': state, 'zip': zip_code}
+
+
+@lru_cache(maxsize=65536)
+def canonical_address(address):
+    """
+    Canonical key for cache lookups and request deduplication
+
+    "123 Main St." and "123 Main Street, Suite 4" both become "123 main st". Every part
+    other than units and the country is kept, so places that share a name or a city
+    but not the street get different keys.
+
+    Args:
+        address (str): Free form US address
+
+    Returns:
+        str: Canonical lower case address
+    """
+    parts, state, zip_code = _split_parts(address)
+    if parts:
+        index = _street_index(parts)
+        parts[index] = ' '.join(filter(None, _street_line(parts[index])))
+    region = ' '.join(filter(None, (state, zip_code)))
+    return ', '.join(filter(None, parts + [region]))
+
+
+_STATE_CODE_PATTERN = '|'.join(sorted((code.upper() for code in STATE_CODES), reverse=True))
+_STATE_NAME_PATTERN = '|'.join(sorted(STATES, key=len, reverse=True))
+_SUFFIX_PATTERN = '|'.join(sorted(STREET_SUFFIXES, key=len, reverse=True))
+_DIRECTIONAL_PATTERN = '|'.join(sorted(DIRECTIONALS, key=len, reverse=True))
+
+# number, street words, suffix, optional directional and unit, city, state and optional ZIP
+_ADDRESS_IN_TEXT = re.compile(
+    r'\b(\d{1,6}[A-Za-z]?)\s+'
+    r'((?:(?:[A-Za-z][\w\'.-]*|\d+(?:st|nd|rd|th))\s+){0,5}?'
+    rf'(?:{_SUFFIX_PATTERN})\b\.?'
+    rf'(?:\s+(?:{_DIRECTIONAL_PATTERN})\b\.?)?)'
+    r'(?:\s*,?\s*(?:suite|ste|apt|unit|bldg|#)\.?\s*#?\s*[\w-]+)?'
+    r'\s*,\s*([A-Za-z][A-Za-z .\'-]{1,40}?)\s*,?\s+'
+    rf'((?-i:{_STATE_CODE_PATTERN})|{_STATE_NAME_PATTERN})\b\.?'
+    r'(?:\s+(\d{5})(?:-\d{4})?)?',
+    re.IGNORECASE
+)
+
+
+def format_address(address):
+    """
+    Normalized display form, e.g. "10305 Medlock Bridge Rd, Johns Creek, GA 30097"
+
+    Args:
+        address (str or dict): Free form address or the result of parse_address
+
+    Returns:
+        str: Formatted address
+    """
+    parsed = parse_address(address) if isinstance(address, str) else address
+    street = ' '.join(
+        token.upper() if token in DIRECTIONALS else token.capitalize()
+        for token in (parsed['street'] or '').split()
+    )
+    street_line = ' '.join(filter(None, (parsed['number'], street)))
+    region = ' '.join(filter(None, ((parsed['state'] or '').upper(), parsed['zip'])))
+    city = ' '.join(word.capitalize() for word in (parsed['city'] or '').split())
+    return ', '.join(filter(None, (street_line, city, region)))
+
+
+def extract_addresses(text):
+    """
+    Find US street addresses with city and state in free text
+
+    Args:
+        text (str): Text such as a search result snippet
+
+    Returns:
+        list: Addresses in the order they appear, as "number street, city, state zip"
+    """
+    addresses = []
+    for match in _ADDRESS_IN_TEXT.finditer(text or ''):
+        number, street, city, state, zip_code = match.groups()
+        address = f"{number} {street.strip()}, {city.strip()}, {state}"
+        addresses.append(f"{address} {zip_code}" if zip_code else address)
+    return addresses
+
+
+def rank_addresses(sources):
+    """
+    Rank addresses found in several sources by how many of them agree
+
+    Candidates are grouped by house number and street. Each source votes once per
+    group with its weight, and the most complete spelling (with city, state and ZIP)
+    of a group is returned.
+
+    Args:
+        sources (iterable): (text, weight) pairs, one per search result or structured field
+
+    Returns:
+        list: dicts with address (formatted), score and sources, best first
+    """
+    groups = {}
+    for position, (text, weight) in enumerate(sources):
+        seen = set()
+        for address in extract_addresses(text):
+            parsed = parse_address(address)
+            if not parsed['number'] or not parsed['street']:
+                continue
+            key = f"{parsed['number']} {parsed['street']}"
+            group = groups.setdefault(key, {'score': 0.0, 'sources': 0, 'first': position, 'spellings': {}})
+            completeness = sum(1 for field in ('city', 'state', 'zip') if parsed[field])
+            spelling = format_address(parsed)
+            group['spellings'][spelling] = max(group['spellings'].get(spelling, 0), completeness)
+            if key not in seen:
+                seen.add(key)
+                group['score'] += weight
+                group['sources'] += 1
+
+    ranked = []
+    for group in groups.values():
+        best = max(group['spellings'].items(), key=lambda item: (item[1], len(item[0])))[0]
+        ranked.append({'address': best, 'score': group['score'], 'sources': group['sources'], 'first': group['first']})
+    ranked.sort(key=lambda candidate: (-candidate['score'], candidate['first']))
+    for candidate in ranked:
+        del candidate['first']
+    return ranked
@@ -0,0 +1,22 @@
+import asyncio
+
+
+async def gather_limited(awaitables, limit=8, return_exceptions=False):
+    """
+    Await many coroutines with at most `limit` of them running at once
+
+    Args:
+        awaitables (iterable): Coroutines or futures
+        limit (int): Maximum number running concurrently. Default is 8
+        return_exceptions (bool): Return exceptions in place of results instead of raising
+
+    Returns:
+        list: Results in the same order as awaitables
+    """
+    semaphore = asyncio.Semaphore(max(1, limit))
+
+    async def run(awaitable):
+        async with semaphore:
+            return await awaitable
+
+    return await asyncio.gather(*(run(awaitable) for awaitable in awaitables), return_exceptions=return_exceptions)
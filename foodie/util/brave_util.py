@@ -0,0 +1,535 @@
+import os
+import asyncio
+import json
+import random
+import threading
+import time
+import weakref
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+
+BRAVE_SEARCH_URL = "https://api.search.brave.com/res/v1/web/search"
+
+# Nested objects nobody downstream reads: images, site profiles, URL parts, sitelinks
+DROP_KEYS = frozenset((
+    'thumbnail', 'profile', 'meta_url', 'deep_results', 'favicon', 'img', 'logo',
+    'family_friendly', 'is_source_local', 'is_source_both', 'language', 'mixed',
+))
+
+
+def _prune(obj):
+    if DROP_KEYS.isdisjoint(obj):
+        return obj
+    return {key: value for key, value in obj.items() if key not in DROP_KEYS}
+
+
+def decode_response(body, prune=True):
+    """
+    Decode a Brave response body
+
+    With prune, DROP_KEYS are removed by an object_hook as each JSON object is
+    decoded, so thumbnails, profiles and sitelinks never make it into the final tree.
+
+    Args:
+        body (bytes or str): Response body
+        prune (bool): Drop DROP_KEYS while decoding. Default is True
+
+    Returns:
+        dict: Decoded response
+    """
+    return json.loads(body, object_hook=_prune if prune else None)
+
+
+def _error_response(status_code, content):
+    """Brave error responses pass through, anything else is wrapped in the same shape"""
+    try:
+        data = json.loads(content)
+        if isinstance(data, dict) and data.get('type') == 'ErrorResponse':
+            return data
+    except ValueError:
+        pass
+    text = content.decode('utf-8', 'replace') if isinstance(content, bytes) else str(content)
+    return {
+        'type': 'ErrorResponse',
+        'error': {'code': f'HTTP_{status_code}', 'status': status_code, 'detail': text[:200] or f'HTTP {status_code}'},
+    }
+
+
+def _header_values(value, cast=int):
+    values = []
+    for part in (value or '').split(','):
+        part = part.split(';')[0].strip()
+        if part:
+            try:
+                values.append(cast(part))
+            except ValueError:
+                return []
+    return values
+
+
+class BraveThrottle:
+    """
+    Quota tracking, 429 backoff and AIMD concurrency control for Brave Search
+
+    Brave reports its per-second and per-month budgets in X-RateLimit-Limit,
+    X-RateLimit-Remaining and X-RateLimit-Reset ("1, 15000" style values, shortest
+    window first). Every acquire spends one request of the short window; once it is
+    used up, callers wait for the next window, one window's budget at a time. The
+    throttle backs off with jitter on 429 and adapts how many requests may be in flight:
+    +1 per window of successful requests, halved on every 429, never above the per-second limit.
+    """
+
+    def __init__(self, initial=4, minimum=1, maximum=16, max_retries=3, base_backoff=0.5, max_backoff=30,
+                 acquire_timeout=60, window=1.0):
+        """
+        Initialize throttle
+
+        Args:
+            initial (int): Starting concurrency limit. Default is 4
+            minimum (int): Lowest concurrency limit. Default is 1
+            maximum (int): Highest concurrency limit. Default is 16
+            max_retries (int): Retries after a 429. Default is 3
+            base_backoff (float): First backoff ceiling in seconds, doubled per retry. Default is 0.5
+            max_backoff (float): Longest wait before giving up on a retry. Default is 30
+            acquire_timeout (float): Longest wait for a free request slot before TimeoutError. Default is 60
+            window (float): Length of Brave's short quota window in seconds. Default is 1.0
+        """
+        self.minimum = minimum
+        self.maximum = maximum
+        self.max_retries = max_retries
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.acquire_timeout = acquire_timeout
+        self.window = window
+        self.limit = float(min(max(initial, minimum), maximum))
+        self.in_flight = 0
+        self.quota = {'limit': [], 'remaining': [], 'reset': [], 'updated_at': None}
+        self.counters = {'requests': 0, 'throttled': 0, 'retries': 0, 'errors': 0}
+        self._condition = threading.Condition()
+        self._async_waiters = []
+        # Local view of the short window: when it ends and how many requests it has left
+        self._window_end = None
+        self._window_left = 0
+
+    def acquire(self):
+        """
+        Block until a request may be sent
+
+        Returns:
+            float: Seconds waited for the quota window
+
+        Raises:
+            TimeoutError: No request slot freed up within acquire_timeout
+        """
+        deadline = time.monotonic() + self.acquire_timeout
+        with self._condition:
+            while not self._try_acquire():
+                left = deadline - time.monotonic()
+                if left <= 0:
+                    raise TimeoutError(f'No Brave request slot within {self.acquire_timeout}s')
+                self._condition.wait(left)
+        try:
+            return self._pause(time.sleep)
+        except BaseException:
+            self._abandon()
+            raise
+
+    async def acquire_async(self):
+        """asyncio version of acquire. A cancelled caller gives its slot back"""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.acquire_timeout
+        while True:
+            with self._condition:
+                if self._try_acquire():
+                    break
+                left = deadline - loop.time()
+                if left <= 0:
+                    raise TimeoutError(f'No Brave request slot within {self.acquire_timeout}s')
+                waiter = loop.create_future()
+                self._async_waiters.append((loop, waiter))
+            try:
+                await asyncio.wait_for(waiter, left)
+            except asyncio.TimeoutError:
+                raise TimeoutError(f'No Brave request slot within {self.acquire_timeout}s') from None
+            finally:
+                # A timed out or cancelled waiter must not outlive its loop
+                with self._condition:
+                    if (loop, waiter) in self._async_waiters:
+                        self._async_waiters.remove((loop, waiter))
+        try:
+            wait = self._pause()
+            if wait:
+                await asyncio.sleep(wait)
+        except BaseException:
+            self._abandon()
+            raise
+        return wait
+
+    def release(self, status_code=None, headers=None, attempt=0):
+        """
+        Record a finished request and free its slot
+
+        Args:
+            status_code (int, optional): HTTP status, None if the request raised
+            headers (Mapping, optional): Response headers
+            attempt (int): Retry number of this request
+
+        Returns:
+            float: Seconds to wait before retrying, or None if the request should not be retried
+        """
+        retry_after = None
+        with self._condition:
+            self.in_flight -= 1
+            self.counters['requests'] += 1
+            if headers is not None:
+                self._update_quota(headers)
+
+            if status_code == 429:
+                self.counters['throttled'] += 1
+                self.limit = max(self.minimum, self.limit / 2)
+                retry_after = self._backoff(attempt, headers)
+                if retry_after is not None:
+                    self.counters['retries'] += 1
+            elif status_code is not None and 200 <= status_code < 300:
+                self.limit = min(self._ceiling(), self.limit + 1 / max(self.limit, 1))
+            else:
+                self.counters['errors'] += 1
+
+            self._wake()
+        return retry_after
+
+    def stats(self):
+        """
+        Current quota and throttling state
+
+        Returns:
+            dict: Brave limit/remaining/reset per window, concurrency limit, requests in flight
+                  and request, 429, retry and error counters
+        """
+        with self._condition:
+            return {
+                'limit': list(self.quota['limit']),
+                'remaining': list(self.quota['remaining']),
+                'reset': list(self.quota['reset']),
+                'quota_updated_at': self.quota['updated_at'],
+                'concurrency_limit': int(self.limit),
+                'in_flight': self.in_flight,
+                **self.counters,
+            }
+
+    def _wake(self):
+        # Called with the condition held
+        self._condition.notify_all()
+        waiters, self._async_waiters = self._async_waiters, []
+        for loop, waiter in waiters:
+            if loop.is_closed():
+                continue
+            try:
+                loop.call_soon_threadsafe(lambda w=waiter: w.done() or w.set_result(None))
+            except RuntimeError:  # closed after the check
+                pass
+
+    def _abandon(self):
+        # Give back a slot that never sent a request, without counting it
+        with self._condition:
+            self.in_flight -= 1
+            self._wake()
+
+    def _try_acquire(self):
+        if self.in_flight < max(int(self.limit), self.minimum):
+            self.in_flight += 1
+            return True
+        return False
+
+    def _window_budget(self):
+        limits = self.quota['limit']
+        return limits[0] if limits and limits[0] > 0 else 1
+
+    def _pause(self, sleep=None):
+        # Spend one request of the short window. When it is used up, take a request of the
+        # next window and wait for it instead of collecting a 429
+        with self._condition:
+            if self._window_end is None:
+                return 0.0
+            now = time.time()
+            if now >= self._window_end:
+                passed = int((now - self._window_end) // self.window) + 1
+                self._window_end += passed * self.window
+                self._window_left = self._window_budget()
+            wait = 0.0
+            if self._window_left <= 0:
+                wait = self._window_end - now
+                if wait > self.max_backoff:
+                    return 0.0
+                self._window_end += self.window
+                self._window_left = self._window_budget()
+            self._window_left -= 1
+        if wait and sleep:
+            sleep(wait)
+        return wait
+
+    def _ceiling(self):
+        limits = self.quota['limit']
+        if limits and limits[0] > 0:
+            return max(self.minimum, min(self.maximum, limits[0]))
+        return self.maximum
+
+    def _update_quota(self, headers):
+        limit = _header_values(headers.get('X-RateLimit-Limit'))
+        remaining = _header_values(headers.get('X-RateLimit-Remaining'))
+        reset = _header_values(headers.get('X-RateLimit-Reset'), cast=float)
+        if limit or remaining or reset:
+            now = time.time()
+            self.quota.update({'limit': limit, 'remaining': remaining, 'reset': reset, 'updated_at': now})
+            self.limit = min(self.limit, self._ceiling())
+            if remaining and reset:
+                end = now + reset[0]
+                if self._window_end is None or end > self._window_end + self.window / 2:
+                    self._window_end, self._window_left = end, remaining[0]
+                elif end > self._window_end - self.window / 2:
+                    # Same window: Brave's count can lag requests still in flight, keep the lower one
+                    self._window_left = min(self._window_left, remaining[0])
+                # An earlier window than ours means requests were already booked into later ones
+
+    def _backoff(self, attempt, headers):
+        if attempt >= self.max_retries:
+            return None
+        wait = random.uniform(0, self.base_backoff * 2 ** attempt)
+        if headers is not None:
+            hints = _header_values(headers.get('Retry-After'), cast=float)
+            remaining = self.quota['remaining']
+            # Only the exhausted window's reset matters; a spent monthly quota is not worth waiting for
+            exhausted = [reset for reset, left in zip(self.quota['reset'], remaining) if left <= 0]
+            hints += exhausted
+            if hints:
+                wait = max(hints) + random.uniform(0, self.base_backoff)
+        return wait if wait <= self.max_backoff else None
+
+
+class BraveClient:
+    """
+    Long-lived Brave Search client
+
+    One requests.Session with a pooled HTTPAdapter keeps TCP/TLS connections to
+    api.search.brave.com alive between calls. Every request has explicit connect
+    and read timeouts so a stuck call cannot hang an MCP tool forever.
+    """
+
+    def __init__(self, api_key, connect_timeout=3.05, read_timeout=10, pool_connections=4, pool_maxsize=16,
+                 throttle=None):
+        """
+        Initialize Brave client
+
+        Args:
+            api_key (str): Brave subscription token
+            connect_timeout (float): Seconds to wait for a connection. Default is 3.05
+            read_timeout (float): Seconds to wait for the response. Default is 10
+            pool_connections (int): Number of host pools to keep. Default is 4
+            pool_maxsize (int): Connections kept alive per host. Default is 16
+            throttle (BraveThrottle, optional): Shared quota/concurrency control. A private one if None
+        """
+        self.api_key = api_key
+        self.throttle = throttle or BraveThrottle(maximum=pool_maxsize)
+        self.timeout = (connect_timeout, read_timeout)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.headers.update({
+            "Accept": "application/json",
+            "Accept-Encoding": "gzip",
+            "x-subscription-token": api_key or "",
+        })
+
+    def search(self, q, count=10, result_filter="web", prune=True, **params):
+        """
+        Run a web search
+
+        Args:
+            q (str): Search query
+            count (int): Number of results. Default is 10
+            result_filter (str): Brave result_filter. Default is 'web'
+            prune (bool): Drop DROP_KEYS while decoding. Default is True
+            **params: Extra Brave query parameters such as offset
+
+        Returns:
+            dict: Brave JSON response
+        """
+        params.update({"q": q, "count": count, "result_filter": result_filter})
+        attempt = 0
+        while True:
+            self.throttle.acquire()
+            try:
+                response = self.session.get(BRAVE_SEARCH_URL, params=params, timeout=self.timeout)
+            except Exception:
+                self.throttle.release()
+                raise
+            retry_after = self.throttle.release(response.status_code, response.headers, attempt)
+            if retry_after is None:
+                break
+            time.sleep(retry_after)
+            attempt += 1
+
+        if response.status_code >= 400:
+            return _error_response(response.status_code, response.content)
+        return decode_response(response.content, prune=prune)
+
+    def close(self):
+        """Close pooled connections"""
+        self.session.close()
+
+
+class AsyncBraveClient:
+    """
+    asyncio counterpart of BraveClient built on httpx.AsyncClient
+
+    Lets the MCP server overlap many outstanding searches on its event loop
+    instead of blocking it on synchronous requests.
+    """
+
+    def __init__(self, api_key, connect_timeout=3.05, read_timeout=10, pool_maxsize=16, throttle=None):
+        """
+        Initialize async Brave client
+
+        Args:
+            api_key (str): Brave subscription token
+            connect_timeout (float): Seconds to wait for a connection. Default is 3.05
+            read_timeout (float): Seconds to wait for the response. Default is 10
+            pool_maxsize (int): Maximum open and keep-alive connections. Default is 16
+            throttle (BraveThrottle, optional): Shared quota/concurrency control. A private one if None
+        """
+        self.api_key = api_key
+        self.throttle = throttle or BraveThrottle(maximum=pool_maxsize)
+        self.client = httpx.AsyncClient(
+            headers={
+                "Accept": "application/json",
+                "Accept-Encoding": "gzip",
+                "x-subscription-token": api_key or "",
+            },
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+            limits=httpx.Limits(max_connections=pool_maxsize, max_keepalive_connections=pool_maxsize),
+        )
+
+    async def search(self, q, count=10, result_filter="web", prune=True, **params):
+        """
+        Run a web search
+
+        Args:
+            q (str): Search query
+            count (int): Number of results. Default is 10
+            result_filter (str): Brave result_filter. Default is 'web'
+            prune (bool): Drop DROP_KEYS while decoding. Default is True
+            **params: Extra Brave query parameters such as offset
+
+        Returns:
+            dict: Brave JSON response
+        """
+        params.update({"q": q, "count": count, "result_filter": result_filter})
+        attempt = 0
+        while True:
+            await self.throttle.acquire_async()
+            try:
+                response = await self.client.get(BRAVE_SEARCH_URL, params=params)
+            except BaseException:
+                self.throttle.release()
+                raise
+            retry_after = self.throttle.release(response.status_code, response.headers, attempt)
+            if retry_after is None:
+                break
+            await asyncio.sleep(retry_after)
+            attempt += 1
+
+        if response.status_code >= 400:
+            return _error_response(response.status_code, response.content)
+        return decode_response(response.content, prune=prune)
+
+    async def aclose(self):
+        """Close pooled connections"""
+        await self.client.aclose()
+
+
+_client = None
+_client_lock = threading.Lock()
+_async_clients = weakref.WeakKeyDictionary()
+_throttle = None
+
+
+def get_brave_throttle():
+    """
+    Return the throttle shared by the sync and async Brave clients
+
+    FOODIE_BRAVE_CONCURRENCY caps the adaptive concurrency limit and
+    FOODIE_BRAVE_MAX_RETRIES sets the retries after a 429.
+    """
+    global _throttle
+    with _client_lock:
+        if _throttle is None:
+            maximum = int(os.getenv('FOODIE_BRAVE_CONCURRENCY', 8))
+            _throttle = BraveThrottle(
+                initial=min(4, maximum),
+                maximum=maximum,
+                max_retries=int(os.getenv('FOODIE_BRAVE_MAX_RETRIES', 3)),
+            )
+        return _throttle
+
+
+def get_brave_stats():
+    """Current Brave quota and throttling stats, see BraveThrottle.stats"""
+    return get_brave_throttle().stats()
+
+
+def get_brave_client(api_key=None):
+    """
+    Return the process-wide Brave client shared by every Brave caller
+
+    Timeouts and pool sizes come from FOODIE_BRAVE_CONNECT_TIMEOUT, FOODIE_BRAVE_READ_TIMEOUT,
+    FOODIE_BRAVE_POOL_CONNECTIONS and FOODIE_BRAVE_POOL_MAXSIZE.
+
+    Args:
+        api_key (str, optional): Brave subscription token. Defaults to BRAVE_KEY
+
+    Returns:
+        BraveClient: Shared client
+    """
+    global _client
+    throttle = get_brave_throttle()
+    with _client_lock:
+        if _client is None:
+            _client = BraveClient(
+                api_key or os.environ.get('BRAVE_KEY'),
+                connect_timeout=float(os.getenv('FOODIE_BRAVE_CONNECT_TIMEOUT', 3.05)),
+                read_timeout=float(os.getenv('FOODIE_BRAVE_READ_TIMEOUT', 10)),
+                pool_connections=int(os.getenv('FOODIE_BRAVE_POOL_CONNECTIONS', 4)),
+                pool_maxsize=int(os.getenv('FOODIE_BRAVE_POOL_MAXSIZE', 16)),
+                throttle=throttle,
+            )
+        return _client
+
+
+def get_async_brave_client(api_key=None):
+    """
+    Return the async Brave client of the running event loop
+
+    httpx connection pools belong to one event loop, so each loop gets its own
+    client. Configured with the same FOODIE_BRAVE_* variables as get_brave_client.
+
+    Args:
+        api_key (str, optional): Brave subscription token. Defaults to BRAVE_KEY
+
+    Returns:
+        AsyncBraveClient: Client shared by every coroutine on this loop
+    """
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        client = AsyncBraveClient(
+            api_key or os.environ.get('BRAVE_KEY'),
+            connect_timeout=float(os.getenv('FOODIE_BRAVE_CONNECT_TIMEOUT', 3.05)),
+            read_timeout=float(os.getenv('FOODIE_BRAVE_READ_TIMEOUT', 10)),
+            pool_maxsize=int(os.getenv('FOODIE_BRAVE_POOL_MAXSIZE', 16)),
+            throttle=get_brave_throttle(),
+        )
+        _async_clients[loop] = client
+    return client
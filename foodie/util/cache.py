@@ -0,0 +1,171 @@
+import os
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+
+def default_cache_dir():
+    """
+    Directory used for foodie's on-disk caches
+
+    Uses FOODIE_CACHE_DIR when it is set, otherwise ~/.cache/foodie
+
+    Returns:
+        Path: Existing cache directory
+    """
+    cache_dir = Path(os.getenv('FOODIE_CACHE_DIR') or Path(Path.home(), '.cache', 'foodie'))
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    return cache_dir
+
+
+class TTLCache:
+    """
+    Two tier cache: an in-memory LRU in front of an optional SQLite table
+
+    Values must be JSON serializable. None is a valid value, so callers that
+    want negative caching should pass their own sentinel as default to get().
+    Expired disk rows are purged when the cache is opened and every purge_every writes.
+    """
+
+    def __init__(self, path=None, namespace='default', ttl=3600, max_entries=1024, purge_every=1000):
+        """
+        Initialize cache
+
+        Args:
+            path (str, optional): SQLite file for the disk tier. Memory only if None
+            namespace (str): Keys of different caches can share one SQLite file
+            ttl (int): Default time to live in seconds
+            max_entries (int): Maximum number of entries kept in memory
+            purge_every (int): Writes between purges of expired disk rows. 0 only purges on open
+        """
+        self.path = str(path) if path else None
+        self.namespace = namespace
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.purge_every = purge_every
+        self._writes = 0
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = None
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        if self.path:
+            self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS cache ('
+                'namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT, expires_at REAL NOT NULL, '
+                'PRIMARY KEY (namespace, key))'
+            )
+            self._conn.execute('CREATE INDEX IF NOT EXISTS cache_expires_at ON cache (namespace, expires_at)')
+            self._conn.commit()
+            self.purge_expired()
+
+    def get(self, key, default=None):
+        """Return cached value for key, or default if it is missing or expired"""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at > now:
+                    self._memory.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._memory[key]
+
+            if self._conn is None:
+                self.misses += 1
+                return default
+
+            row = self._conn.execute(
+                'SELECT value, expires_at FROM cache WHERE namespace = ? AND key = ?',
+                (self.namespace, key)
+            ).fetchone()
+            if row is None or row[1] <= now:
+                self.misses += 1
+                return default
+
+            value = json.loads(row[0])
+            self._remember(key, value, row[1])
+            self.hits += 1
+            self.disk_hits += 1
+            return value
+
+    def set(self, key, value, ttl=None):
+        """Store value for key. ttl overrides the default time to live"""
+        expires_at = time.time() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._remember(key, value, expires_at)
+            if self._conn is not None:
+                self._conn.execute(
+                    'INSERT OR REPLACE INTO cache (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)',
+                    (self.namespace, key, json.dumps(value), expires_at)
+                )
+                self._writes += 1
+                if self.purge_every and self._writes % self.purge_every == 0:
+                    self._purge()
+                self._conn.commit()
+
+    def delete(self, key):
+        """Remove key from both tiers"""
+        with self._lock:
+            self._memory.pop(key, None)
+            if self._conn is not None:
+                self._conn.execute('DELETE FROM cache WHERE namespace = ? AND key = ?', (self.namespace, key))
+                self._conn.commit()
+
+    def clear(self):
+        """Remove every entry of this namespace, including expired ones on disk"""
+        with self._lock:
+            self._memory.clear()
+            if self._conn is not None:
+                self._conn.execute('DELETE FROM cache WHERE namespace = ?', (self.namespace,))
+                self._conn.commit()
+
+    def purge_expired(self):
+        """Drop expired rows from the disk tier"""
+        if self._conn is None:
+            return 0
+        with self._lock:
+            removed = self._purge()
+            self._conn.commit()
+            return removed
+
+    def _purge(self):
+        return self._conn.execute(
+            'DELETE FROM cache WHERE namespace = ? AND expires_at <= ?', (self.namespace, time.time())
+        ).rowcount
+
+    def stats(self):
+        """
+        Cache counters for sizing
+
+        Returns:
+            dict: hits (disk_hits of them served by SQLite), misses, memory evictions,
+                  entries currently in memory and the hit rate
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'entries': len(self._memory),
+                'max_entries': self.max_entries,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
+
+    def _remember(self, key, value, expires_at):
+        self._memory[key] = (value, expires_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self.evictions += 1
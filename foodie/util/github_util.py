@@ -1,3 +1,4 @@
+import io
 import os
 import sys
 import requests
@@ -7,6 +8,36 @@ from datetime import datetime
 from pathlib import Path
 
 
+def iter_base64(stream, chunk_size=3 * 2 ** 16):
+    """
+    Base64 encode a file-like object chunk by chunk
+
+    Chunks are cut at multiples of 3 bytes, so the pieces concatenate to the
+    same text as encoding the whole content at once.
+
+    Args:
+        stream: Binary or text file-like object. Text is encoded as UTF-8
+        chunk_size (int): Bytes read per chunk
+
+    Yields:
+        bytes: Base64 pieces
+    """
+    carry = b''
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        if isinstance(chunk, str):
+            chunk = chunk.encode('utf-8')
+        chunk = carry + chunk
+        cut = len(chunk) - len(chunk) % 3
+        carry = chunk[cut:]
+        if cut:
+            yield base64.b64encode(chunk[:cut])
+    if carry:
+        yield base64.b64encode(carry)
+
+
 class GitHubUploader:
     def __init__(self, github_token, username, repo_name):
         """Initialize GitHub uploader"""
@@ -41,30 +72,46 @@ class GitHubUploader:
             print(f"❌ Connection error: {e}")
             return False
 
+    def pages_url(self, repo_file_path):
+        """GitHub Pages URL a repository file is served from"""
+        return f"https://{self.username}.github.io/{self.repo}/{repo_file_path}"
+
     def file_exists(self, file_path):
         """Check if file already exists in repository"""
         url = f"{self.api_base}/contents/{file_path}"
         response = requests.get(url, headers=self.headers)
         return response.status_code == 200, response.json() if response.status_code == 200 else None
 
-    def upload_file(self, local_file_path, repo_file_path=None, commit_message=None):
-        """Upload HTML file to GitHub repository"""
-        if not os.path.exists(local_file_path):
-            return {'error': f'Local file not found: {local_file_path}'}
+    def upload_file(self, source, repo_file_path=None, commit_message=None):
+        """
+        Upload HTML file to GitHub repository
 
-        # Set repository path
-        if not repo_file_path:
-            repo_file_path = os.path.basename(local_file_path)
+        Args:
+            source: Local file path, bytes, or a file-like object
+            repo_file_path (str, optional): Path in the repository. Defaults to the file name,
+                                            required for bytes and file-like sources
+            commit_message (str, optional): Custom commit message
 
-        # Read HTML content
-        try:
-            with open(local_file_path, 'r', encoding='utf-8') as f:
-                html_content = f.read()
-        except Exception as e:
-            return {'error': f'Failed to read file: {e}'}
+        Returns:
+            dict: Upload result with GitHub and Pages URLs
+        """
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            stream = io.BytesIO(source)
+        elif hasattr(source, 'read'):
+            stream = source
+        else:
+            if not os.path.exists(source):
+                return {'success': False, 'error': f'Local file not found: {source}'}
+            if not repo_file_path:
+                repo_file_path = os.path.basename(source)
+            try:
+                with open(source, 'rb') as f:
+                    return self.upload_file(f, repo_file_path=repo_file_path, commit_message=commit_message)
+            except OSError as e:
+                return {'success': False, 'error': f'Failed to read file: {e}'}
 
-        # Encode content
-        content_encoded = base64.b64encode(html_content.encode('utf-8')).decode('utf-8')
+        if not repo_file_path:
+            return {'success': False, 'error': 'repo_file_path is required for bytes or file-like sources'}
 
         # Check if file exists
         exists, existing_file = self.file_exists(repo_file_path)
@@ -75,8 +122,7 @@ class GitHubUploader:
             commit_message = f"{action} HTML file: {repo_file_path}"
 
         commit_data = {
-            "message": commit_message,
-            "content": content_encoded
+            "message": commit_message
         }
 
         # Add SHA if file exists (for updates)
@@ -86,9 +132,18 @@ class GitHubUploader:
         else:
             print(f"📤 Uploading new file: {repo_file_path}")
 
+        # The body is built in full before the request. Joining the base64 chunks into it
+        # directly skips the intermediate base64 str and its json.dumps copy
+        body = b''.join([
+            json.dumps(commit_data)[:-1].encode('utf-8'),
+            b', "content": "',
+            *iter_base64(stream),
+            b'"}',
+        ])
+
         # Upload file
         url = f"{self.api_base}/contents/{repo_file_path}"
-        response = requests.put(url, headers=self.headers, json=commit_data)
+        response = requests.put(url, headers=self.headers, data=body)
 
         if response.status_code in [200, 201]:
             result = response.json()
@@ -97,7 +152,7 @@ class GitHubUploader:
             urls = {
                 'github_url': result['content']['html_url'],
                 'raw_url': result['content']['download_url'],
-                'pages_url': f"https://{self.username}.github.io/{self.repo}/{repo_file_path}",
+                'pages_url': self.pages_url(repo_file_path),
                 'api_url': result['content']['url']
             }
 
@@ -0,0 +1,209 @@
+import os
+import csv
+import re
+import sqlite3
+import sys
+import threading
+from foodie.util.address import STATES, normalize_street, parse_address
+
+
+# Column names accepted for each field. The first set matches OpenAddresses extracts
+COLUMN_ALIASES = {
+    'lat': ('lat', 'latitude', 'y'),
+    'lon': ('lon', 'lng', 'long', 'longitude', 'x'),
+    'number': ('number', 'house_number', 'housenumber'),
+    'street': ('street', 'street_name', 'road'),
+    'city': ('city', 'locality', 'town'),
+    'region': ('region', 'state'),
+    'postcode': ('postcode', 'zip', 'zipcode', 'postal_code'),
+}
+
+_NON_ALNUM = re.compile(r'[^a-z0-9]+')
+
+
+def normalize_text(text):
+    """Lower case, drop punctuation and collapse whitespace"""
+    return _NON_ALNUM.sub(' ', (text or '').lower()).strip()
+
+
+class LocalGeocoder:
+    """
+    Offline geocoder backed by an address extract loaded into SQLite
+
+    Streets are stored in the canonical USPS form of foodie.util.address, so "Road" and
+    "Rd." match. Exact (number, street) matches use a B-tree index. When SQLite has FTS5,
+    street names that only partially match fall back to a full text search.
+    """
+
+    def __init__(self, db_path):
+        """
+        Initialize local geocoder
+
+        Args:
+            db_path (str): SQLite file built by build()
+        """
+        self.db_path = str(db_path)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS addresses ('
+            'id INTEGER PRIMARY KEY, number TEXT NOT NULL, street TEXT NOT NULL, '
+            'city TEXT, region TEXT, postcode TEXT, lat REAL NOT NULL, lon REAL NOT NULL)'
+        )
+        self._conn.execute('CREATE INDEX IF NOT EXISTS addresses_number_street ON addresses (number, street)')
+        try:
+            self._conn.execute(
+                'CREATE VIRTUAL TABLE IF NOT EXISTS addresses_fts USING fts5('
+                'street, city, content=addresses, content_rowid=id)'
+            )
+            self.has_fts = True
+        except sqlite3.OperationalError:
+            self.has_fts = False
+        self._conn.commit()
+
+    def build(self, csv_path, replace=False, batch_size=10000):
+        """
+        Load a CSV or OpenAddresses-style extract into the store
+
+        Args:
+            csv_path (str): Extract with lat/lon, number and street columns (city, region, postcode optional)
+            replace (bool): Drop previously loaded addresses first. Default appends, so several
+                            metro extracts can share one store
+            batch_size (int): Rows inserted per executemany call
+
+        Returns:
+            int: Number of addresses loaded
+        """
+        count = 0
+        with open(csv_path, newline='', encoding='utf-8') as f:
+            reader = csv.DictReader(f)
+            columns = self._resolve_columns(reader.fieldnames or [])
+
+            with self._lock:
+                if replace:
+                    self._conn.execute('DELETE FROM addresses')
+                batch = []
+                for row in reader:
+                    record = self._parse_row(row, columns)
+                    if record is None:
+                        continue
+                    batch.append(record)
+                    if len(batch) >= batch_size:
+                        count += self._insert(batch)
+                        batch = []
+                if batch:
+                    count += self._insert(batch)
+
+                if self.has_fts:
+                    self._conn.execute("INSERT INTO addresses_fts (addresses_fts) VALUES ('rebuild')")
+                self._conn.commit()
+
+        print(f"📦 Loaded {count} addresses from {csv_path} into {self.db_path}")
+        return count
+
+    def lookup(self, address):
+        """
+        Geocode an address from the local store
+
+        Args:
+            address (str): Address such as "10305 Medlock Bridge Rd, Johns Creek, GA 30097"
+
+        Returns:
+            tuple: (lat, lng), or None if the address is not in the extract
+        """
+        parsed = parse_address(address)
+        number, street = parsed['number'], parsed['street']
+        if not number or not street:
+            return None
+
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT city, region, postcode, lat, lon FROM addresses WHERE number = ? AND street = ?',
+                (number, street)
+            ).fetchall()
+            if not rows and self.has_fts:
+                query = ' '.join(f'"{token}"' for token in street.split())
+                rows = self._conn.execute(
+                    'SELECT a.city, a.region, a.postcode, a.lat, a.lon FROM addresses_fts '
+                    'JOIN addresses a ON a.id = addresses_fts.rowid '
+                    'WHERE addresses_fts MATCH ? AND a.number = ? ORDER BY bm25(addresses_fts) LIMIT 20',
+                    (f'street : ({query})', number)
+                ).fetchall()
+
+        if not rows:
+            return None
+        if parsed['city'] or parsed['state'] or parsed['zip']:
+            # Same number and street exist in many towns: only answer for the one the query mentions
+            rows = sorted(rows, key=lambda row: -self._context_score(row, parsed))
+            best = rows[0]
+            if self._context_score(best, parsed) == 0 and (best[0] or best[2]):
+                return None
+        return rows[0][3], rows[0][4]
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM addresses').fetchone()[0]
+
+    def _insert(self, batch):
+        self._conn.executemany(
+            'INSERT INTO addresses (number, street, city, region, postcode, lat, lon) VALUES (?, ?, ?, ?, ?, ?, ?)',
+            batch
+        )
+        return len(batch)
+
+    @staticmethod
+    def _context_score(row, parsed):
+        city, region, postcode = row[0], row[1], row[2]
+        score = 0
+        if postcode and postcode == parsed['zip']:
+            score += 2
+        if city and city == parsed['city']:
+            score += 2
+        if region and region == parsed['state']:
+            score += 1
+        return score
+
+    @staticmethod
+    def _resolve_columns(fieldnames):
+        lowered = {name.strip().lower(): name for name in fieldnames}
+        columns = {}
+        for field, aliases in COLUMN_ALIASES.items():
+            for alias in aliases:
+                if alias in lowered:
+                    columns[field] = lowered[alias]
+                    break
+        missing = [field for field in ('lat', 'lon', 'number', 'street') if field not in columns]
+        if missing:
+            raise ValueError(f'Extract is missing required columns: {", ".join(missing)}')
+        return columns
+
+    @staticmethod
+    def _parse_row(row, columns):
+        try:
+            lat = float(row[columns['lat']])
+            lon = float(row[columns['lon']])
+        except (TypeError, ValueError):
+            return None
+        number = normalize_text(row[columns['number']]).replace(' ', '')
+        street = normalize_street(row[columns['street']] or '')
+        if not number or not street:
+            return None
+        region = normalize_text(row.get(columns.get('region'), ''))
+        return (
+            number,
+            street,
+            normalize_text(row.get(columns.get('city'), '')),
+            STATES.get(region, region),
+            normalize_text(row.get(columns.get('postcode'), ''))[:5],
+            lat,
+            lon,
+        )
+
+
+if __name__ == '__main__':
+    # python -m foodie.util.local_geocoder <extract.csv> [<db_path>]
+    if len(sys.argv) < 2:
+        print("Usage: python -m foodie.util.local_geocoder <extract.csv> [<db_path>]")
+        sys.exit(1)
+    target = sys.argv[2] if len(sys.argv) > 2 else os.getenv('FOODIE_LOCAL_GEOCODER_DB', 'local_geocoder.sqlite')
+    LocalGeocoder(target).build(sys.argv[1])
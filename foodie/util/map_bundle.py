@@ -0,0 +1,220 @@
+import gzip
+import hashlib
+import json
+import re
+import string
+from foodie.util.map_render import (
+    LEAFLET_CSS, LEAFLET_JS, MARKERCLUSTER_URL, TILE_ATTRIBUTION, TILE_URL,
+    _css_size, coordinates_json, labels_json, map_center
+)
+
+try:
+    import brotli
+except ImportError:  # optional, .br variants are skipped without it
+    brotli = None
+
+
+ASSET_DIR = 'assets'
+
+# Shared by every published map, so each map page only carries its own data
+MAP_JS = """
+(function () {
+  var c = window.FOODIE_MAP;
+  var map = L.map('map', {preferCanvas: c.cluster}).setView(c.center, c.zoom);
+  L.tileLayer(c.tileUrl, {maxZoom: 19, attribution: c.attribution}).addTo(map);
+  function draw(coords, labels) {
+    var layers = new Array(coords.length / 2);
+    for (var i = 0; i < layers.length; i++) {
+      layers[i] = L.marker([coords[2 * i], coords[2 * i + 1]], {i: i});
+    }
+    if (c.cluster) {
+      var group = L.markerClusterGroup({chunkedLoading: true});
+      group.on('click', function (e) {
+        var label = labels[e.layer.options.i];
+        if (label) { e.layer.bindPopup(label).openPopup(); }
+      });
+      group.addLayers(layers);
+      map.addLayer(group);
+    } else {
+      for (var j = 0; j < layers.length; j++) {
+        if (labels[j]) { layers[j].bindPopup(labels[j]).bindTooltip(labels[j]); }
+        layers[j].addTo(map);
+      }
+    }
+  }
+  if (c.dataUrl) {
+    fetch(c.dataUrl, {cache: 'no-cache'}).then(function (r) { return r.json(); }).then(function (d) {
+      map.setView(d.center, c.zoom);
+      draw(d.coords, d.labels);
+    });
+  } else {
+    draw(c.coords, c.labels);
+  }
+})();
+"""
+
+MAP_CSS = """
+html, body { margin: 0; padding: 0; }
+"""
+
+_BETWEEN_TAGS = re.compile(r'>\s+<')
+_JS_SPACES = re.compile(r'\s*([{}();,=<>+*/:?|&!\[\]])\s*')
+_CSS_SPACES = re.compile(r'\s*([{};:,])\s*')
+
+
+def minify_html(text):
+    """Drop indentation, line breaks and whitespace between tags"""
+    return _BETWEEN_TAGS.sub('><', ' '.join(line.strip() for line in text.splitlines() if line.strip()))
+
+
+def minify_js(text):
+    """Whitespace-only minifier for the asset scripts of this module (no strings with significant spaces)"""
+    return _JS_SPACES.sub(r'\1', ' '.join(line.strip() for line in text.splitlines() if line.strip()))
+
+
+def minify_css(text):
+    """Drop whitespace around CSS punctuation"""
+    return _CSS_SPACES.sub(r'\1', ' '.join(text.split())).strip()
+
+
+def versioned_name(stem, extension, content):
+    """Asset file name with a content hash, e.g. foodie-map.1a2b3c4d5e.js"""
+    return f"{stem}.{hashlib.sha256(content).hexdigest()[:10]}.{extension}"
+
+
+def shared_assets():
+    """
+    Minified, content-versioned JS and CSS shared by every bundled map
+
+    Returns:
+        dict: path under ASSET_DIR -> bytes
+    """
+    js = minify_js(MAP_JS).encode('utf-8')
+    css = minify_css(MAP_CSS).encode('utf-8')
+    return {
+        f"{ASSET_DIR}/{versioned_name('foodie-map', 'js', js)}": js,
+        f"{ASSET_DIR}/{versioned_name('foodie-map', 'css', css)}": css,
+    }
+
+
+SHARED_ASSETS = shared_assets()
+MAP_JS_PATH, MAP_CSS_PATH = sorted(SHARED_ASSETS, key=lambda path: not path.endswith('.js'))
+
+# Minified once at import
+PAGE_TEMPLATE = string.Template(minify_html("""
+<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1.0">
+<link rel="stylesheet" href="$leaflet_css">$cluster_css<link rel="stylesheet" href="$map_css">
+<script src="$leaflet_js"></script>$cluster_js</head>
+<body>
+<div id="map" style="width:$width;height:$height"></div>
+<script>window.FOODIE_MAP=$config;</script>
+<script src="$map_js"></script>
+</body>
+</html>
+"""))
+
+
+def compressed_variants(content):
+    """
+    Precompressed copies of content for hosts that serve them
+
+    Returns:
+        dict: '.gz' (and '.br' when brotli is installed) -> bytes
+    """
+    variants = {'.gz': gzip.compress(content, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants['.br'] = brotli.compress(content)
+    return variants
+
+
+def markers_data(points):
+    """
+    Marker data file of a map published with a data_url
+
+    Returns:
+        bytes: JSON object with center, coords and labels
+    """
+    lat, lng = map_center(points)
+    return (
+        f'{{"center":[{round(lat, 6)},{round(lng, 6)}],'
+        f'"coords":{coordinates_json(points)},"labels":{labels_json(points)}}}'
+    ).encode('utf-8')
+
+
+def render_page(points, zoom=12, width=800, height=600, cluster=False, data_url=None, asset_base=''):
+    """
+    Minified map page that references the shared assets instead of inlining them
+
+    Args:
+        points (list): (lat, lng, label) tuples, at least one
+        zoom (int): Default zoom is 12
+        width (int or str): Default width is 800
+        height (int or str): Default height is 600
+        cluster (bool): Cluster markers client-side, for large maps. Default is False
+        data_url (str, optional): Load the markers from this markers_data file instead of
+                                  embedding them, so they can be republished on their own
+        asset_base (str): Prefix of the shared asset paths, e.g. '../' for a page in a subdirectory
+                          of the site that holds the assets. Default is ''
+
+    Returns:
+        str: HTML document
+    """
+    lat, lng = map_center(points)
+    attribution = json.dumps(TILE_ATTRIBUTION).replace('</', '<\\/')
+    if data_url:
+        data = f'"dataUrl":{json.dumps(data_url)}'
+    else:
+        data = f'"coords":{coordinates_json(points)},"labels":{labels_json(points)}'
+    config = (
+        f'{{"center":[{round(lat, 6)},{round(lng, 6)}],"zoom":{int(zoom)},"cluster":{str(cluster).lower()},'
+        f'"tileUrl":{json.dumps(TILE_URL)},"attribution":{attribution},{data}}}'
+    )
+    return PAGE_TEMPLATE.substitute(
+        leaflet_css=LEAFLET_CSS,
+        leaflet_js=LEAFLET_JS,
+        cluster_css=f'<link rel="stylesheet" href="{MARKERCLUSTER_URL}/MarkerCluster.css">'
+                    f'<link rel="stylesheet" href="{MARKERCLUSTER_URL}/MarkerCluster.Default.css">' if cluster else '',
+        cluster_js=f'<script src="{MARKERCLUSTER_URL}/leaflet.markercluster.js"></script>' if cluster else '',
+        map_css=asset_base + MAP_CSS_PATH,
+        map_js=asset_base + MAP_JS_PATH,
+        width=_css_size(width),
+        height=_css_size(height),
+        config=config,
+    )
+
+
+def build_bundle(points, zoom=12, width=800, height=600, cluster=False, precompress=True, data_url=None,
+                 asset_base=''):
+    """
+    Build the publishable files of a map
+
+    Args:
+        points (list): (lat, lng, label) tuples, at least one
+        zoom (int): Default zoom is 12
+        width (int or str): Default width is 800
+        height (int or str): Default height is 600
+        cluster (bool): Cluster markers client-side. Default is False
+        precompress (bool): Add .gz/.br variants of the page and assets. Default is True
+        data_url (str, optional): Keep the markers in a separate data file loaded from this URL
+        asset_base (str): Prefix of the shared asset paths in the page, see render_page. Default is ''
+
+    Returns:
+        dict: page (bytes), variants (suffix -> bytes of the page),
+              assets (relative path -> bytes, including their variants) and
+              data (markers_data bytes, None without data_url)
+    """
+    page = render_page(points, zoom=zoom, width=width, height=height, cluster=cluster,
+                       data_url=data_url, asset_base=asset_base).encode('utf-8')
+    assets = dict(SHARED_ASSETS)
+    variants = {}
+    if precompress:
+        variants = compressed_variants(page)
+        for path, content in SHARED_ASSETS.items():
+            for suffix, compressed in compressed_variants(content).items():
+                assets[path + suffix] = compressed
+    data = markers_data(points) if data_url else None
+    return {'page': page, 'variants': variants, 'assets': assets, 'data': data}
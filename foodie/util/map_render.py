@@ -0,0 +1,266 @@
+import csv
+import html
+import json
+import string
+import sys
+import folium
+
+
+LEAFLET_VERSION = '1.9.4'
+LEAFLET_CSS = f'https://cdn.jsdelivr.net/npm/leaflet@{LEAFLET_VERSION}/dist/leaflet.css'
+LEAFLET_JS = f'https://cdn.jsdelivr.net/npm/leaflet@{LEAFLET_VERSION}/dist/leaflet.js'
+MARKERCLUSTER_VERSION = '1.5.3'
+MARKERCLUSTER_URL = f'https://cdn.jsdelivr.net/npm/leaflet.markercluster@{MARKERCLUSTER_VERSION}/dist'
+TILE_URL = 'https://tile.openstreetmap.org/{z}/{x}/{y}.png'
+TILE_ATTRIBUTION = '&copy; <a href="https://www.openstreetmap.org/copyright">OpenStreetMap</a> contributors'
+
+# Compiled once at import, rendering is a single substitute() call
+LEAFLET_TEMPLATE = string.Template("""<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1.0">
+<link rel="stylesheet" href="$leaflet_css">
+<script src="$leaflet_js"></script>
+<style>html, body {margin: 0; padding: 0;} #map {width: $width; height: $height;}</style>
+</head>
+<body>
+<div id="map"></div>
+<script>
+var map = L.map('map').setView([$lat, $lng], $zoom);
+L.tileLayer('$tile_url', {maxZoom: 19, attribution: '$attribution'}).addTo(map);
+var markers = $markers;
+for (var i = 0; i < markers.length; i++) {
+  var p = markers[i];
+  L.marker([p[0], p[1]]).bindPopup(p[2]).bindTooltip(p[2]).addTo(map);
+}
+</script>
+</body>
+</html>
+""")
+
+
+# Bulk mode: coordinates as one flat array, markers created in chunks inside a cluster group,
+# popups bound only when a marker is clicked
+CLUSTER_TEMPLATE = string.Template("""<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1.0">
+<link rel="stylesheet" href="$leaflet_css">
+<link rel="stylesheet" href="$cluster_url/MarkerCluster.css">
+<link rel="stylesheet" href="$cluster_url/MarkerCluster.Default.css">
+<script src="$leaflet_js"></script>
+<script src="$cluster_url/leaflet.markercluster.js"></script>
+<style>html, body {margin: 0; padding: 0;} #map {width: $width; height: $height;}</style>
+</head>
+<body>
+<div id="map"></div>
+<script>
+var map = L.map('map', {preferCanvas: true}).setView([$lat, $lng], $zoom);
+L.tileLayer('$tile_url', {maxZoom: 19, attribution: '$attribution'}).addTo(map);
+var coords = $coords;
+var labels = $labels;
+var layers = new Array(coords.length / 2);
+for (var i = 0; i < layers.length; i++) {
+  layers[i] = L.marker([coords[2 * i], coords[2 * i + 1]], {i: i});
+}
+var cluster = L.markerClusterGroup({chunkedLoading: true});
+cluster.on('click', function (e) {
+  var label = labels[e.layer.options.i];
+  if (label) { e.layer.bindPopup(label).openPopup(); }
+});
+cluster.addLayers(layers);
+map.addLayer(cluster);
+</script>
+</body>
+</html>
+""")
+
+
+def _css_size(value):
+    return f'{value}px' if isinstance(value, (int, float)) else str(value)
+
+
+def map_center(points):
+    """Mean latitude and longitude of (lat, lng, label) points"""
+    return (
+        sum(point[0] for point in points) / len(points),
+        sum(point[1] for point in points) / len(points),
+    )
+
+
+def markers_json(points):
+    """
+    Encode points as one compact JSON array of [lat, lng, label]
+
+    Labels are HTML-escaped and "</" is escaped so the array can be inlined in a script tag.
+
+    Args:
+        points (list): (lat, lng, label) tuples
+
+    Returns:
+        str: JSON array
+    """
+    markers = [[round(lat, 6), round(lng, 6), html.escape(label or '')] for lat, lng, label in points]
+    return json.dumps(markers, separators=(',', ':')).replace('</', '<\\/')
+
+
+def render_template(points, zoom=12, width=800, height=600):
+    """
+    Render a Leaflet map from the precompiled template
+
+    Produces the same map as render_folium (OSM tiles, one marker with popup and tooltip per point)
+    without building folium's element tree.
+
+    Args:
+        points (list): (lat, lng, label) tuples
+        zoom (int): Default zoom is 12
+        width (int or str): Pixels, or a CSS size such as '100%'. Default is 800
+        height (int or str): Pixels, or a CSS size. Default is 600
+
+    Returns:
+        str: HTML document
+    """
+    lat, lng = map_center(points)
+    return LEAFLET_TEMPLATE.substitute(
+        leaflet_css=LEAFLET_CSS,
+        leaflet_js=LEAFLET_JS,
+        width=_css_size(width),
+        height=_css_size(height),
+        lat=round(lat, 6),
+        lng=round(lng, 6),
+        zoom=int(zoom),
+        tile_url=TILE_URL,
+        attribution=TILE_ATTRIBUTION,
+        markers=markers_json(points),
+    )
+
+
+def coordinates_json(points, precision=5):
+    """
+    Encode point coordinates as one flat JSON array [lat0, lng0, lat1, lng1, ...]
+
+    Args:
+        points (list): (lat, lng, label) tuples
+        precision (int): Decimals kept, 5 is about one meter. Default is 5
+
+    Returns:
+        str: JSON array
+    """
+    flat = []
+    for point in points:
+        flat.append(round(point[0], precision))
+        flat.append(round(point[1], precision))
+    return json.dumps(flat, separators=(',', ':'))
+
+
+def labels_json(points):
+    """JSON array of HTML-escaped labels, 0 for points without one"""
+    labels = [html.escape(point[2]) if point[2] else 0 for point in points]
+    return json.dumps(labels, separators=(',', ':'))
+
+
+def render_cluster(points, zoom=12, width=800, height=600):
+    """
+    Render a clustered Leaflet map for tens of thousands of points
+
+    Per point only the coordinates and an HTML-escaped label are embedded. The browser
+    builds markers in chunks inside a Leaflet.markercluster group and binds a popup
+    only when a marker is clicked. Generation is linear in the number of points.
+
+    Args:
+        points (list): (lat, lng, label) tuples. label may be None for no popup
+        zoom (int): Default zoom is 12
+        width (int or str): Pixels, or a CSS size such as '100%'. Default is 800
+        height (int or str): Pixels, or a CSS size. Default is 600
+
+    Returns:
+        str: HTML document
+    """
+    lat, lng = map_center(points)
+    return CLUSTER_TEMPLATE.substitute(
+        leaflet_css=LEAFLET_CSS,
+        leaflet_js=LEAFLET_JS,
+        cluster_url=MARKERCLUSTER_URL,
+        width=_css_size(width),
+        height=_css_size(height),
+        lat=round(lat, 6),
+        lng=round(lng, 6),
+        zoom=int(zoom),
+        tile_url=TILE_URL,
+        attribution=TILE_ATTRIBUTION,
+        coords=coordinates_json(points),
+        labels=labels_json(points),
+    )
+
+
+def render_folium(points, zoom=12, width=800, height=600):
+    """
+    Render a map with folium, one folium.Marker per point
+
+    Args:
+        points (list): (lat, lng, label) tuples
+        zoom (int): Default zoom is 12
+        width (int or str): Default width is 800
+        height (int or str): Default height is 600
+
+    Returns:
+        str: HTML document
+    """
+    m = folium.Map(location=list(map_center(points)), zoom_start=zoom, width=width, height=height)
+    for lat, lng, label in points:
+        folium.Marker(location=[lat, lng], popup=label, tooltip=label).add_to(m)
+    return m.get_root().render()
+
+
+RENDERERS = {
+    'folium': render_folium,
+    'template': render_template,
+    'cluster': render_cluster,
+}
+
+
+def render_map(points, zoom=12, width=800, height=600, renderer='folium'):
+    """
+    Render map HTML for points with the chosen renderer
+
+    Args:
+        points (list): (lat, lng, label) tuples, at least one
+        zoom (int): Default zoom is 12
+        width (int or str): Default width is 800
+        height (int or str): Default height is 600
+        renderer (str): One of RENDERERS. Default is 'folium'
+
+    Returns:
+        str: HTML document
+    """
+    if renderer not in RENDERERS:
+        raise ValueError(f"renderer should be one of {', '.join(RENDERERS)}")
+    return RENDERERS[renderer](points, zoom=zoom, width=width, height=height)
+
+
+def read_points(csv_path):
+    """Read (lat, lng, label) points from a CSV with lat/lon and optional name or address columns"""
+    points = []
+    with open(csv_path, newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            row = {key.strip().lower(): value for key, value in row.items() if key}
+            try:
+                lat = float(row.get('lat') or row.get('latitude'))
+                lng = float(row.get('lon') or row.get('lng') or row.get('longitude'))
+            except (TypeError, ValueError):
+                continue
+            points.append((lat, lng, row.get('name') or row.get('address') or None))
+    return points
+
+
+if __name__ == '__main__':
+    # python -m foodie.util.map_render <points.csv> <map.html>
+    if len(sys.argv) < 3:
+        print("Usage: python -m foodie.util.map_render <points.csv> <map.html>")
+        sys.exit(1)
+    rows = read_points(sys.argv[1])
+    with open(sys.argv[2], 'w', encoding='utf-8') as out:
+        out.write(render_cluster(rows, width='100%', height='100%'))
+    print(f"🗺️ Rendered {len(rows)} points to {sys.argv[2]}")
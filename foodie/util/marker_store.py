@@ -0,0 +1,95 @@
+import json
+import sqlite3
+import threading
+import time
+
+
+class MarkerStore:
+    """
+    Pins and publishing details of published maps, keyed by map id
+
+    Lets a map be updated in place: only added pins are geocoded and only the
+    marker data file is published again.
+    """
+
+    def __init__(self, path=None):
+        """
+        Initialize marker store
+
+        Args:
+            path (str, optional): SQLite file. Memory only if None
+        """
+        self.path = str(path) if path else ':memory:'
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        if path:
+            self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS maps ('
+            'map_id TEXT PRIMARY KEY, info TEXT NOT NULL, created_at REAL NOT NULL, updated_at REAL NOT NULL)'
+        )
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS markers ('
+            'map_id TEXT NOT NULL, key TEXT NOT NULL, address TEXT NOT NULL, lat REAL NOT NULL, lng REAL NOT NULL, '
+            'position INTEGER NOT NULL, PRIMARY KEY (map_id, key))'
+        )
+        self._conn.commit()
+
+    def save_map(self, map_id, info):
+        """Create or replace the publishing details of a map (JSON serializable dict)"""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                'INSERT INTO maps (map_id, info, created_at, updated_at) VALUES (?, ?, ?, ?) '
+                'ON CONFLICT (map_id) DO UPDATE SET info = excluded.info, updated_at = excluded.updated_at',
+                (map_id, json.dumps(info), now, now)
+            )
+            self._conn.commit()
+
+    def get_map(self, map_id):
+        """Publishing details of a map, or None if the id is unknown"""
+        with self._lock:
+            row = self._conn.execute('SELECT info FROM maps WHERE map_id = ?', (map_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def markers(self, map_id):
+        """
+        Pins of a map in the order they were added
+
+        Returns:
+            list: (key, address, lat, lng) tuples
+        """
+        with self._lock:
+            return self._conn.execute(
+                'SELECT key, address, lat, lng FROM markers WHERE map_id = ? ORDER BY position', (map_id,)
+            ).fetchall()
+
+    def update_markers(self, map_id, add=(), remove=()):
+        """
+        Add and remove pins of a map in one transaction
+
+        Args:
+            map_id (str): Map id
+            add (list): (key, address, lat, lng) tuples. Existing keys are replaced
+            remove (list): Keys to remove
+
+        Returns:
+            int: Number of pins removed
+        """
+        with self._lock:
+            position = self._conn.execute(
+                'SELECT COALESCE(MAX(position), -1) FROM markers WHERE map_id = ?', (map_id,)
+            ).fetchone()[0]
+            removed = 0
+            for key in remove:
+                removed += self._conn.execute(
+                    'DELETE FROM markers WHERE map_id = ? AND key = ?', (map_id, key)
+                ).rowcount
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO markers (map_id, key, address, lat, lng, position) VALUES (?, ?, ?, ?, ?, ?)',
+                [(map_id, key, address, lat, lng, position + offset)
+                 for offset, (key, address, lat, lng) in enumerate(add, start=1)]
+            )
+            self._conn.execute('UPDATE maps SET updated_at = ? WHERE map_id = ?', (time.time(), map_id))
+            self._conn.commit()
+            return removed
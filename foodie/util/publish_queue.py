@@ -0,0 +1,109 @@
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+
+class PublishQueue:
+    """
+    Publish maps on a worker pool and remember the outcome per job id
+
+    Callers hand in the URL the map will have once it is published and get it back
+    at once, while the upload runs in the background. status() reports whether a
+    job is still 'pending', 'live' or 'failed'. Submitting a job id that is pending
+    or live returns that job instead of publishing again.
+    """
+
+    def __init__(self, max_workers=4, max_jobs=1024):
+        """
+        Initialize publish queue
+
+        Args:
+            max_workers (int): Concurrent uploads. Default is 4
+            max_jobs (int): Finished jobs kept for status(), oldest are dropped first. Default is 1024
+        """
+        self.max_jobs = max_jobs
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='foodie-publish')
+        self._lock = threading.Lock()
+        self._jobs = OrderedDict()
+        self._futures = {}
+
+    def submit(self, job_id, url, fn, *args, **kwargs):
+        """
+        Queue fn(*args, **kwargs) for job_id unless that job is pending or live already
+
+        Args:
+            job_id (str): Job id, e.g. the map id
+            url (str): Predicted URL of the published map
+            fn (callable): Publishes the map, returns a dict with success and url or error
+
+        Returns:
+            dict: Job status, see status()
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None and job['status'] != 'failed':
+                return dict(job)
+            job = {'job_id': job_id, 'status': 'pending', 'url': url, 'error': None,
+                   'submitted_at': time.time(), 'finished_at': None}
+            self._jobs[job_id] = job
+            self._jobs.move_to_end(job_id)
+            self._evict()
+            self._futures[job_id] = self._executor.submit(self._run, job, fn, args, kwargs)
+            return dict(job)
+
+    def status(self, job_id):
+        """
+        Status of a job
+
+        Returns:
+            dict: job_id, status ('pending', 'live' or 'failed'), url, error, submitted_at
+                  and finished_at, or None for an unknown job id
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job is not None else None
+
+    def wait(self, job_id, timeout=None):
+        """Wait until a job has finished and return its status, None for an unknown job id"""
+        with self._lock:
+            future = self._futures.get(job_id)
+        if future is not None:
+            future.result(timeout=timeout)
+        return self.status(job_id)
+
+    def stats(self):
+        """Number of known jobs per status"""
+        with self._lock:
+            counts = {'pending': 0, 'live': 0, 'failed': 0}
+            for job in self._jobs.values():
+                counts[job['status']] += 1
+            return counts
+
+    def shutdown(self, wait=True):
+        """Stop the workers, by default after the queued jobs are done"""
+        self._executor.shutdown(wait=wait)
+
+    def _run(self, job, fn, args, kwargs):
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            result = {'success': False, 'error': f"[error]({str(e)})"}
+        with self._lock:
+            if result.get('success'):
+                job['status'] = 'live'
+                job['url'] = result.get('url') or job['url']
+            else:
+                job['status'] = 'failed'
+                job['error'] = result.get('error')
+            job['finished_at'] = time.time()
+            self._futures.pop(job['job_id'], None)
+            status, url = job['status'], job['url']
+        print(f"{'✅' if status == 'live' else '❌'} Map {job['job_id']} {status}: {url}")
+
+    def _evict(self):
+        # Pending jobs are kept, their callers still expect a status
+        for job_id in [job_id for job_id, job in self._jobs.items() if job['status'] != 'pending']:
+            if len(self._jobs) <= self.max_jobs:
+                return
+            del self._jobs[job_id]
@@ -0,0 +1,141 @@
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from foodie.util.cache import default_cache_dir
+
+
+class RateLimiter:
+    """
+    Token bucket rate limiter shared across threads and, through a SQLite file, across processes
+
+    Callers reserve tokens up front and only sleep for as long as the bucket is
+    in debt, so a request never waits unless another request has just used the budget.
+    """
+
+    def __init__(self, name, rate, capacity=1, path=None):
+        """
+        Initialize rate limiter
+
+        Args:
+            name (str): Bucket name. Limiters with the same name and path share one budget
+            rate (float): Tokens added per second
+            capacity (int): Maximum burst size
+            path (str, optional): SQLite file holding the bucket state. In-process only if None
+        """
+        self.name = name
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self.path = str(path) if path else None
+        self._lock = threading.Lock()
+        self._tokens = self.capacity
+        self._updated_at = time.time()
+        self._conn = None
+
+        if self.path:
+            self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None)
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS buckets ('
+                'name TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL)'
+            )
+
+    def reserve(self, tokens=1):
+        """
+        Take tokens from the bucket without sleeping
+
+        Args:
+            tokens (int): Number of tokens to take
+
+        Returns:
+            float: Seconds the caller has to wait before using the tokens
+        """
+        with self._lock:
+            if self._conn is None:
+                return self._take(tokens)
+
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                row = self._conn.execute(
+                    'SELECT tokens, updated_at FROM buckets WHERE name = ?', (self.name,)
+                ).fetchone()
+                if row is None:
+                    self._tokens, self._updated_at = self.capacity, time.time()
+                else:
+                    self._tokens, self._updated_at = row
+                wait = self._take(tokens)
+                self._conn.execute(
+                    'INSERT OR REPLACE INTO buckets (name, tokens, updated_at) VALUES (?, ?, ?)',
+                    (self.name, self._tokens, self._updated_at)
+                )
+                self._conn.execute('COMMIT')
+            except Exception:
+                self._conn.execute('ROLLBACK')
+                raise
+            return wait
+
+    def acquire(self, tokens=1):
+        """
+        Block until tokens are available
+
+        Args:
+            tokens (int): Number of tokens to take
+
+        Returns:
+            float: Seconds spent waiting
+        """
+        wait = self.reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def _take(self, tokens):
+        now = time.time()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+        self._tokens -= tokens
+        if self._tokens >= 0:
+            return 0.0
+        return -self._tokens / self.rate
+
+
+# Requests per second and burst size for outbound clients
+# Override with FOODIE_RATE_LIMIT_<NAME>="<rate>/<capacity>", e.g. FOODIE_RATE_LIMIT_BRAVE="20/5"
+DEFAULT_BUDGETS = {
+    'nominatim': (1.0, 1),
+    'brave': (1.0, 1),
+    'github': (1.0, 5),
+}
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(name, rate=None, capacity=None):
+    """
+    Return the process-wide limiter for a named budget, persisted in the foodie cache dir
+
+    Args:
+        name (str): Budget name such as 'nominatim', 'brave' or 'github'
+        rate (float, optional): Requests per second. Defaults to DEFAULT_BUDGETS or the env override
+        capacity (int, optional): Burst size. Defaults to DEFAULT_BUDGETS or the env override
+
+    Returns:
+        RateLimiter: Shared limiter
+    """
+    with _limiters_lock:
+        if name not in _limiters:
+            default_rate, default_capacity = DEFAULT_BUDGETS.get(name, (1.0, 1))
+            override = os.getenv(f'FOODIE_RATE_LIMIT_{name.upper()}')
+            if override:
+                parts = override.split('/')
+                default_rate = float(parts[0])
+                default_capacity = float(parts[1]) if len(parts) > 1 else default_capacity
+
+            _limiters[name] = RateLimiter(
+                name,
+                rate=default_rate if rate is None else rate,
+                capacity=default_capacity if capacity is None else capacity,
+                path=os.getenv('FOODIE_RATE_LIMIT_DB') or Path(default_cache_dir(), 'rate_limits.sqlite')
+            )
+        return _limiters[name]
@@ -0,0 +1,86 @@
+import asyncio
+import threading
+import weakref
+
+
+class _Call:
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Coalesce identical in-flight calls
+
+    While a call for a key is running, other callers with the same key wait for it
+    and share its result (or exception) instead of issuing their own request.
+    Threads coalesce through do(), asyncio tasks on the same event loop through do_async().
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._tasks = weakref.WeakKeyDictionary()
+
+    def do(self, key, fn, *args, **kwargs):
+        """
+        Run fn(*args, **kwargs) unless a call for key is already running, then wait for that one
+
+        Args:
+            key (hashable): Normalized request key
+            fn (callable): Function doing the actual work
+
+        Returns:
+            Result of the shared call. Its exception is raised in every waiting caller
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args, **kwargs)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+
+    async def do_async(self, key, coro_fn, *args, **kwargs):
+        """
+        Await coro_fn(*args, **kwargs) unless a call for key is already running on this loop
+
+        The shared call runs as its own task, so a cancelled caller does not cancel it
+        for the others.
+
+        Args:
+            key (hashable): Normalized request key
+            coro_fn (callable): Coroutine function doing the actual work
+
+        Returns:
+            Result of the shared call. Its exception is raised in every waiting caller
+        """
+        loop = asyncio.get_running_loop()
+        tasks = self._tasks.setdefault(loop, {})
+        task = tasks.get(key)
+        if task is None:
+            task = tasks[key] = loop.create_task(coro_fn(*args, **kwargs))
+            task.add_done_callback(lambda _: tasks.pop(key, None))
+        return await asyncio.shield(task)
+
+    def in_flight(self):
+        """Number of calls currently running in threads"""
+        with self._lock:
+            return len(self._calls)
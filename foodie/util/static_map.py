@@ -0,0 +1,149 @@
+import io
+import math
+import os
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from PIL import Image, ImageDraw, ImageFont
+
+
+# Slippy-map tile server, e.g. a local tile server during tests or a commercial style
+TILE_URL = os.getenv('FOODIE_TILE_URL', 'https://tile.openstreetmap.org/{z}/{x}/{y}.png')
+TILE_SIZE = 256
+MAX_ZOOM = 18
+
+MARKER_RADIUS = 9
+MARKER_COLOR = (214, 39, 40)
+BLANK_TILE_COLOR = (229, 227, 223)
+
+
+def to_pixel(lat, lng, zoom):
+    """Web Mercator pixel coordinates of lat/lng in the world image at zoom"""
+    scale = TILE_SIZE * 2 ** zoom
+    lat = max(min(lat, 85.05112878), -85.05112878)
+    x = (lng + 180.0) / 360.0 * scale
+    sin_lat = math.sin(math.radians(lat))
+    y = (0.5 - math.log((1 + sin_lat) / (1 - sin_lat)) / (4 * math.pi)) * scale
+    return x, y
+
+
+def fit_zoom(points, width, height, padding=40, max_zoom=16):
+    """Highest zoom at which every point fits in width x height with padding pixels to spare"""
+    for zoom in range(max_zoom, 0, -1):
+        xs, ys = zip(*(to_pixel(lat, lng, zoom) for lat, lng, _ in points))
+        if max(xs) - min(xs) <= width - 2 * padding and max(ys) - min(ys) <= height - 2 * padding:
+            return zoom
+    return 1
+
+
+def fetch_tile(session, tile_url, z, x, y):
+    """
+    Download one tile
+
+    Returns:
+        bytes: Tile image, or None if the tile could not be fetched
+    """
+    try:
+        response = session.get(tile_url.format(z=z, x=x, y=y), timeout=10)
+        if response.status_code == 200:
+            return response.content
+        print(f"Tile {z}/{x}/{y} failed: {response.status_code}")
+    except requests.RequestException as e:
+        print(f"Tile {z}/{x}/{y} failed: {e}")
+    return None
+
+
+def fetch_tiles(tiles, tile_url=TILE_URL, max_workers=8, cache=None, style=None):
+    """
+    Download tiles concurrently over one keep-alive session
+
+    Args:
+        tiles (list): (z, x, y) tuples
+        tile_url (str): URL template with {z}, {x} and {y}. Defaults to FOODIE_TILE_URL
+        max_workers (int): Concurrent downloads. Default is 8
+        cache (TileCache, optional): Serve tiles from and store downloads in this cache
+        style (str, optional): Cache key of the tile style. Defaults to tile_url
+
+    Returns:
+        dict: (z, x, y) -> tile bytes, or None for tiles that failed
+    """
+    with requests.Session() as session:
+        session.headers['User-Agent'] = 'Foodie-App/1.0'  # Required by the OSM tile usage policy
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(tiles)))) as executor:
+            if cache is None:
+                data = executor.map(lambda tile: fetch_tile(session, tile_url, *tile), tiles)
+            else:
+                data = executor.map(lambda tile: cache.get_or_fetch(
+                    *tile, style or tile_url, lambda: fetch_tile(session, tile_url, *tile)
+                ), tiles)
+            return dict(zip(tiles, data))
+
+
+def _draw_marker(draw, font, x, y, number, label):
+    # Numbered pin with the label in a white box to its right
+    draw.ellipse((x - MARKER_RADIUS, y - MARKER_RADIUS, x + MARKER_RADIUS, y + MARKER_RADIUS),
+                 fill=MARKER_COLOR, outline='white', width=2)
+    draw.text((x, y), str(number), fill='white', font=font, anchor='mm')
+    if label:
+        left, top, right, bottom = draw.textbbox((x + MARKER_RADIUS + 4, y), label, font=font, anchor='lm')
+        draw.rectangle((left - 2, top - 2, right + 2, bottom + 2), fill=(255, 255, 255, 220))
+        draw.text((x + MARKER_RADIUS + 4, y), label, fill='black', font=font, anchor='lm')
+
+
+def render_png(points, zoom=None, width=800, height=600, tile_url=TILE_URL, max_workers=8, labels=True,
+               cache=None):
+    """
+    Render a static map as PNG without a browser
+
+    Tiles covering the view are fetched concurrently, stitched with Pillow and
+    a numbered marker (and label) is drawn for every point.
+
+    Args:
+        points (list): (lat, lng, label) tuples, at least one
+        zoom (int, optional): Zoom level. Fits every point if None
+        width (int): Image width in pixels. Default is 800
+        height (int): Image height in pixels. Default is 600
+        tile_url (str): URL template with {z}, {x} and {y}. Defaults to FOODIE_TILE_URL
+        max_workers (int): Concurrent tile downloads. Default is 8
+        labels (bool): Draw the label next to each marker. Default is True
+        cache (TileCache, optional): Tile cache, keyed by tile_url as style
+
+    Returns:
+        bytes: PNG image
+    """
+    zoom = min(int(zoom), MAX_ZOOM) if zoom else fit_zoom(points, width, height)
+    pixels = [to_pixel(lat, lng, zoom) for lat, lng, _ in points]
+
+    # Center the view on the bounding box of the points
+    center_x = (min(x for x, _ in pixels) + max(x for x, _ in pixels)) / 2
+    center_y = (min(y for _, y in pixels) + max(y for _, y in pixels)) / 2
+    left, top = int(center_x - width / 2), int(center_y - height / 2)
+
+    tile_count = 2 ** zoom
+    tiles = [
+        (zoom, tx, ty)
+        for ty in range(math.floor(top / TILE_SIZE), math.floor((top + height - 1) / TILE_SIZE) + 1)
+        for tx in range(math.floor(left / TILE_SIZE), math.floor((left + width - 1) / TILE_SIZE) + 1)
+    ]
+    # x wraps around the antimeridian, rows beyond the poles stay blank
+    wanted = sorted({(z, tx % tile_count, ty) for z, tx, ty in tiles if 0 <= ty < tile_count})
+    data = fetch_tiles(wanted, tile_url=tile_url, max_workers=max_workers, cache=cache)
+
+    image = Image.new('RGB', (width, height), BLANK_TILE_COLOR)
+    for z, tx, ty in tiles:
+        content = data.get((z, tx % tile_count, ty))
+        if not content:
+            continue
+        try:
+            tile = Image.open(io.BytesIO(content)).convert('RGB')
+        except OSError:
+            continue
+        image.paste(tile, (tx * TILE_SIZE - left, ty * TILE_SIZE - top))
+
+    draw = ImageDraw.Draw(image, 'RGBA')
+    font = ImageFont.load_default()
+    for number, ((x, y), (_, _, label)) in enumerate(zip(pixels, points), start=1):
+        _draw_marker(draw, font, x - left, y - top, number, label if labels else None)
+
+    buffer = io.BytesIO()
+    image.save(buffer, format='PNG')
+    return buffer.getvalue()
@@ -4,28 +4,63 @@ import tempfile
 import shutil
 import random
 import string
+import threading
 import time
+from contextlib import contextmanager
 from pathlib import Path
+from foodie.util.cache import default_cache_dir
 
+try:
+    import fcntl
+except ImportError:  # not on Windows, deploys are then only serialized within one process
+    fcntl = None
 
-def upload_to_surge(local_file_path, custom_domain=None, project_name=None):
+
+# Domain that batched deployments go to, one subdirectory per map. Batching is off when unset
+SURGE_BATCH_DOMAIN = os.getenv('FOODIE_SURGE_BATCH_DOMAIN')
+
+# Seconds a batch collects maps before it is deployed in one surge run
+SURGE_BATCH_WINDOW = float(os.getenv('FOODIE_SURGE_BATCH_WINDOW', 1.0))
+
+# Maps not staged again for this many seconds are dropped from the batch site. 0 keeps them forever
+SURGE_BATCH_MAX_AGE = int(os.getenv('FOODIE_SURGE_BATCH_MAX_AGE', 30 * 24 * 3600))
+
+
+def write_source(source, target_file):
+    """
+    Write a path, bytes or file-like object to target_file
+
+    Bytes and file-like objects are written directly, paths are copied.
+    """
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        with open(target_file, 'wb') as f:
+            f.write(source)
+    elif hasattr(source, 'read'):
+        with open(target_file, 'wb') as f:
+            shutil.copyfileobj(source, f)
+    else:
+        shutil.copy2(source, target_file)
+
+
+def upload_to_surge(source, custom_domain=None, project_name=None, files=None):
     """
     Upload HTML file to Surge.sh for instant hosting with no authentication required
 
     Args:
-        local_file_path (str): Path to the HTML file to upload
+        source (str, bytes or file-like): Path to the HTML file to upload, or its content
         custom_domain (str, optional): Custom domain (e.g., my-app.surge.sh)
         project_name (str, optional): Name for the project, used to generate domain
                                       if custom_domain not provided
+        files (dict, optional): More files to deploy next to index.html, relative path -> bytes
 
     Returns:
         dict: Upload result with URL and status
     """
     # Verify file exists
-    if not os.path.exists(local_file_path):
+    if isinstance(source, (str, os.PathLike)) and not os.path.exists(source):
         return {
             'success': False,
-            'error': f'Local file not found: {local_file_path}'
+            'error': f'Local file not found: {source}'
         }
 
     try:
@@ -53,10 +88,14 @@ def upload_to_surge(local_file_path, custom_domain=None, project_name=None):
 
         # Create a temp directory for the project
         with tempfile.TemporaryDirectory() as temp_dir:
-            # Copy the HTML file to the temp dir as index.html
+            # Write the HTML to the temp dir as index.html
             target_file = os.path.join(temp_dir, 'index.html')
-            shutil.copy2(local_file_path, target_file)
-            print(f"📦 Copied {local_file_path} to {target_file}")
+            write_source(source, target_file)
+            for relative_path, content in (files or {}).items():
+                path = os.path.join(temp_dir, relative_path)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                write_source(content, path)
+            print(f"📦 Staged {1 + len(files or {})} files in {temp_dir}")
 
             # Determine the domain
             domain = None
@@ -136,6 +175,221 @@ def upload_to_surge(local_file_path, custom_domain=None, project_name=None):
         }
 
 
+def deploy_site(site_dir, domain):
+    """
+    Deploy a whole directory to a Surge domain with one surge run
+
+    Args:
+        site_dir (str or Path): Directory to deploy
+        domain (str): Surge domain, e.g. my-maps.surge.sh
+
+    Returns:
+        dict: success, or success False with error and output
+    """
+    if shutil.which('surge') is None:
+        return {
+            'success': False,
+            'error': 'Surge CLI not found. Please install with: npm install --global surge',
+            'install_command': 'npm install --global surge'
+        }
+    try:
+        result = subprocess.run(['surge', str(site_dir), domain], capture_output=True, text=True, check=False)
+    except Exception as e:
+        return {'success': False, 'error': f'Error executing Surge command: {str(e)}'}
+    if result.returncode != 0:
+        return {'success': False, 'error': 'Surge deployment failed', 'details': result.stderr,
+                'output': result.stdout}
+    return {'success': True, 'output': result.stdout}
+
+
+@contextmanager
+def _file_lock(path):
+    # Exclusive lock across processes sharing the cache dir
+    with open(path, 'a') as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+class _Batch:
+    def __init__(self):
+        self.names = []
+        self.done = threading.Event()
+        self.result = None
+
+
+class SurgeBatcher:
+    """
+    Deploy many maps to one Surge domain with shared surge runs
+
+    Every map is staged in its own subdirectory of a persistent local site. Maps
+    published within `window` seconds of each other join one batch, and the whole
+    site is deployed with a single surge run, so bursts of maps pay the CLI startup
+    and upload once. Shared files such as the content-versioned map assets are staged
+    once at the site root, where every map page references them. Deploys are serialized, also across processes through a lock file
+    next to the site: a surge run replaces the whole site, so each one must contain
+    everything staged before it. Maps not staged again within max_age are pruned
+    before a deploy, so the site does not grow without bound.
+    """
+
+    def __init__(self, domain, site_dir=None, window=1.0, deploy=deploy_site, max_age=30 * 24 * 3600):
+        """
+        Initialize batcher
+
+        Args:
+            domain (str): Surge domain the maps are served from
+            site_dir (str or Path, optional): Staging site. Defaults to surge/<domain> in the foodie cache dir
+            window (float): Seconds a batch collects maps before it is deployed. Default is 1.0
+            deploy (callable): deploy(site_dir, domain) -> result dict. Default is deploy_site
+            max_age (float): Seconds after its last staging that a map is pruned. 0 keeps maps forever.
+                             Default is 30 days
+        """
+        self.domain = domain
+        self.site_dir = Path(site_dir or Path(default_cache_dir(), 'surge', domain))
+        self.site_dir.mkdir(parents=True, exist_ok=True)
+        self.lock_path = Path(self.site_dir.parent, f'{self.site_dir.name}.lock')
+        self.max_age = max_age
+        self.window = window
+        self._deploy = deploy
+        self._lock = threading.Lock()
+        self._deploy_lock = threading.Lock()
+        self._pending = None
+        self.deploys = 0
+        self.published = 0
+        self.pruned = 0
+
+    def stage(self, name, source, files=None, shared=None):
+        """
+        Write a map as <name>/index.html (and its files) into the staging site
+
+        Shared files go to the site root. They are content-versioned, so one that is
+        already staged is only touched to keep it from being pruned.
+        """
+        if not name or name != os.path.basename(name) or name.startswith('.'):
+            raise ValueError(f'Invalid map name: {name}')
+        for relative_path, content in (shared or {}).items():
+            path = Path(self.site_dir, relative_path)
+            if path.exists():
+                os.utime(path)
+            else:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                write_source(content, path)
+        map_dir = Path(self.site_dir, name)
+        map_dir.mkdir(exist_ok=True)
+        write_source(source, Path(map_dir, 'index.html'))
+        for relative_path, content in (files or {}).items():
+            path = Path(map_dir, relative_path)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            write_source(content, path)
+
+    def publish(self, name, source, files=None, shared=None):
+        """
+        Stage a map and wait for the batch deployment that includes it
+
+        Args:
+            name (str): Subdirectory of the map, also its URL path
+            source (str, bytes or file-like): Map HTML, or the path of a map file
+            files (dict, optional): More files next to index.html, relative path -> bytes
+            shared (dict, optional): Files at the site root shared by every map, relative path -> bytes
+
+        Returns:
+            dict: Upload result with the map URL, like upload_to_surge
+        """
+        try:
+            self.stage(name, source, files, shared)
+        except (OSError, ValueError) as e:
+            return {'success': False, 'error': f'Surge staging error: {str(e)}'}
+
+        with self._lock:
+            batch = self._pending
+            if batch is None:
+                batch = self._pending = _Batch()
+                timer = threading.Timer(self.window, self._flush, args=(batch,))
+                timer.daemon = True
+                timer.start()
+            batch.names.append(name)
+        batch.done.wait()
+
+        if not batch.result['success']:
+            return batch.result
+        return {
+            'success': True,
+            'url': f"https://{self.domain}/{name}/",
+            'domain': self.domain,
+            'message': f"🚀 Site deployed successfully to Surge.sh!",
+            'output': batch.result.get('output')
+        }
+
+    def _flush(self, batch):
+        # New maps start the next batch from here on; everything in this one is already staged
+        with self._lock:
+            if self._pending is batch:
+                self._pending = None
+        with self._deploy_lock:
+            print(f"🌍 Deploying {len(batch.names)} maps to domain: {self.domain}")
+            try:
+                with _file_lock(self.lock_path):
+                    self.prune()
+                    batch.result = self._deploy(self.site_dir, self.domain)
+            except Exception as e:
+                batch.result = {'success': False, 'error': f'Surge upload error: {str(e)}'}
+            self.deploys += 1
+            if batch.result['success']:
+                self.published += len(batch.names)
+        batch.done.set()
+
+    def prune(self):
+        """
+        Remove maps whose files were last staged more than max_age ago
+
+        Returns:
+            int: Number of maps removed
+        """
+        if not self.max_age:
+            return 0
+        cutoff = time.time() - self.max_age
+        removed = 0
+        for map_dir in self.site_dir.iterdir():
+            if not map_dir.is_dir():
+                continue
+            staged_at = max((path.stat().st_mtime for path in map_dir.rglob('*') if path.is_file()), default=0)
+            if staged_at < cutoff:
+                shutil.rmtree(map_dir, ignore_errors=True)
+                removed += 1
+        if removed:
+            print(f"🧹 Pruned {removed} maps from {self.site_dir}")
+        self.pruned += removed
+        return removed
+
+    def stats(self):
+        """Deploy runs, maps published through them and maps pruned"""
+        return {'deploys': self.deploys, 'published': self.published, 'pruned': self.pruned, 'domain': self.domain}
+
+
+_batcher = None
+_batcher_lock = threading.Lock()
+
+
+def get_surge_batcher():
+    """
+    Return the shared batcher for FOODIE_SURGE_BATCH_DOMAIN, or None when batching is off
+
+    FOODIE_SURGE_BATCH_WINDOW sets the collection window and FOODIE_SURGE_BATCH_MAX_AGE
+    how long unchanged maps are kept, both in seconds.
+    """
+    global _batcher
+    if not SURGE_BATCH_DOMAIN:
+        return None
+    with _batcher_lock:
+        if _batcher is None:
+            _batcher = SurgeBatcher(SURGE_BATCH_DOMAIN, window=SURGE_BATCH_WINDOW, max_age=SURGE_BATCH_MAX_AGE)
+    return _batcher
+
+
 def create_surge_map(addresses, zoom=12, width=800, height=600, file_name=None, custom_domain=None):
     """
     Create a map and deploy it to Surge.sh for instant public hosting
@@ -145,31 +399,31 @@ def create_surge_map(addresses, zoom=12, width=800, height=600, file_name=None,
         zoom (int): Map zoom level (default: 12)
         width (int): Map width in pixels (default: 800)
         height (int): Map height in pixels (default: 600)
-        file_name (str, optional): Local filename for the map
+        file_name (str, optional): Unused, the map is rendered in memory
         custom_domain (str, optional): Custom Surge.sh domain
 
     Returns:
         dict: Result with Surge.sh URL and deployment info
     """
     # Import here to avoid circular imports
-    from foodie.tools.map_tool import address_to_coordinates
+    from foodie.tools.map_tool import geocode_batch
     import folium
 
-    # Generate unique filename if not provided
-    if not file_name:
-        rand_str = ''.join(random.choices(string.ascii_lowercase + string.digits, k=8))
-        file_name = f"surge_map_{rand_str}.html"
-
     coordinates = []
     address_list = [addr.strip().replace('"', '') for addr in addresses.split('|') if len(addr.strip()) > 10]
 
     try:
-        # Geocode all addresses
+        # Geocode all addresses, building markers while the remaining lookups run
         error_messages = []
-        for address in address_list:
-            lat, lng = address_to_coordinates(address)
+        markers = []
+        for address, lat, lng in geocode_batch(address_list):
             if lat and lng:
                 coordinates.append((lat, lng, address))
+                markers.append(folium.Marker(
+                    location=[lat, lng],
+                    popup=folium.Popup(address, max_width=300),
+                    tooltip=address
+                ))
                 print(f"✅ Found: {address} -> {lat}, {lng}")
             else:
                 error_msg = f"❌ Could not geocode: {address}"
@@ -197,27 +451,15 @@ def create_surge_map(addresses, zoom=12, width=800, height=600, file_name=None,
         )
 
         # Add markers for each location
-        for lat, lng, address in coordinates:
-            folium.Marker(
-                location=[lat, lng],
-                popup=folium.Popup(address, max_width=300),
-                tooltip=address
-            ).add_to(m)
-
-        # Save map locally first
-        html_file = os.path.abspath(file_name)
-        m.save(html_file)
-        print(f"💾 Map saved locally: {html_file}")
+        for marker in markers:
+            marker.add_to(m)
+
+        # Render in memory, upload_to_surge writes it straight into its deploy dir
+        html = m.get_root().render().encode('utf-8')
 
         # Deploy to Surge
         project_name = f"foodie-map-{int(time.time())}"
-        surge_result = upload_to_surge(html_file, custom_domain=custom_domain, project_name=project_name)
-
-        # Clean up local file
-        try:
-            os.remove(html_file)
-        except:
-            pass
+        surge_result = upload_to_surge(html, custom_domain=custom_domain, project_name=project_name)
 
         if surge_result['success']:
             return {
@@ -0,0 +1,49 @@
+"""
+Render time and peak memory of the map renderers
+
+python -m foodie.util.test.bench_map_render [marker counts...] [--skip-folium-above N]
+"""
+import argparse
+import random
+import time
+import tracemalloc
+from foodie.util.map_render import RENDERERS
+
+
+def make_points(n, seed=0):
+    rng = random.Random(seed)
+    return [
+        (33.7 + rng.random() * 0.5, -84.6 + rng.random() * 0.5, f'{rng.randint(1, 9999)} Peachtree St NE, Atlanta, GA')
+        for _ in range(n)
+    ]
+
+
+def measure(renderer, points):
+    tracemalloc.start()
+    start = time.perf_counter()
+    html = RENDERERS[renderer](points)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak, len(html)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark map renderers')
+    parser.add_argument('counts', nargs='*', type=int, default=[10, 1000, 100000])
+    parser.add_argument('--skip-folium-above', type=int, default=None,
+                        help='Skip folium for larger marker counts (it takes minutes at 100k)')
+    args = parser.parse_args()
+
+    print(f"{'markers':>8} {'renderer':>9} {'seconds':>9} {'peak MB':>8} {'HTML MB':>8}")
+    for count in args.counts:
+        points = make_points(count)
+        for renderer in RENDERERS:
+            if renderer == 'folium' and args.skip_folium_above is not None and count > args.skip_folium_above:
+                continue
+            elapsed, peak, size = measure(renderer, points)
+            print(f"{count:>8} {renderer:>9} {elapsed:>9.3f} {peak / 2 ** 20:>8.1f} {size / 2 ** 20:>8.2f}")
+
+
+if __name__ == '__main__':
+    main()
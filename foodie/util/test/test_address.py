@@ -0,0 +1,83 @@
+import unittest
+from foodie.util.address import (
+    canonical_address, normalize_street, parse_address, extract_addresses, format_address, rank_addresses
+)
+
+
+class TestAddress(unittest.TestCase):
+    def test_canonical_key_ignores_abbreviations_and_units(self):
+        self.assertEqual(canonical_address("123 Main St."), canonical_address("123 Main Street, Suite 4"))
+        self.assertEqual(
+            canonical_address("10305 Medlock Bridge Road, Ste. 100, Johns Creek, Georgia 30097-1234, USA"),
+            "10305 medlock bridge rd, johns creek, ga 30097"
+        )
+        self.assertEqual(
+            canonical_address('  "500 N Michigan Ave #300,   Chicago, IL 60611"'),
+            canonical_address("500 North Michigan Avenue, Chicago, Illinois 60611")
+        )
+
+    def test_canonical_key_keeps_every_part(self):
+        self.assertNotEqual(canonical_address("Jang Su Jang, 1000 Pleasant Hill Rd, Duluth, GA"),
+                            canonical_address("Jang Su Jang, 2100 Satellite Blvd, Duluth, GA"))
+        self.assertNotEqual(canonical_address("Food Court, 3505 Peachtree Pkwy, Duluth, GA"),
+                            canonical_address("Food Court, 2131 Pleasant Hill Rd, Duluth, GA"))
+        self.assertNotEqual(canonical_address("Shop 5, 123 George St, Sydney NSW 2000, Australia"),
+                            canonical_address("Shop 5, 88 Pitt St, Sydney NSW 2000, Australia"))
+        self.assertEqual(canonical_address("Jang Su Jang, 1000 Pleasant Hill Road, Suite 4, Duluth, Georgia"),
+                         "jang su jang, 1000 pleasant hill rd, duluth, ga")
+        self.assertEqual(canonical_address("7 Spice, 1000 Pleasant Hill Rd, Duluth, GA"),
+                         "7 spice, 1000 pleasant hill rd, duluth, ga")
+
+    def test_parse_address_skips_place_name(self):
+        self.assertEqual(
+            parse_address("Jang Su Jang, 2100 Satellite Blvd, Duluth, GA 30097"),
+            {'number': '2100', 'street': 'satellite blvd', 'city': 'duluth', 'state': 'ga', 'zip': '30097'}
+        )
+
+    def test_parse_address(self):
+        self.assertEqual(
+            parse_address("1600 Pennsylvania Avenue NW, Washington, District of Columbia 20500"),
+            {'number': '1600', 'street': 'pennsylvania ave nw', 'city': 'washington', 'state': 'dc', 'zip': '20500'}
+        )
+        self.assertEqual(
+            parse_address("Apt 4B, 12 West Road, Miami, FL"),
+            {'number': '12', 'street': 'w rd', 'city': 'miami', 'state': 'fl', 'zip': None}
+        )
+
+    def test_street_suffix_is_not_a_state(self):
+        self.assertEqual(parse_address("123 Main Ct")['state'], None)
+        self.assertEqual(parse_address("123 Main Ct")['street'], 'main ct')
+
+    def test_unit_words_inside_street_names(self):
+        self.assertEqual(parse_address("123 Space Center Blvd, Houston, TX")['street'], 'space ctr blvd')
+
+    def test_long_style(self):
+        self.assertEqual(normalize_street("N Michigan Ave", style='long'), 'north michigan avenue')
+        self.assertEqual(normalize_street("Medlock Bridge Road"), 'medlock bridge rd')
+
+
+    def test_extract_addresses(self):
+        text = ("Jang Su Jang is at <b>3105 Peachtree Industrial Blvd, Duluth, GA 30097</b>. Open since 1998, "
+                "rated 5 stars. Second shop: 10305 Medlock Bridge Rd Ste 100, Johns Creek, Georgia 30097-1234. "
+                "Or try 123 main st, Springfield or nearby")
+        self.assertEqual(extract_addresses(text), [
+            '3105 Peachtree Industrial Blvd, Duluth, GA 30097',
+            '10305 Medlock Bridge Rd, Johns Creek, Georgia 30097',
+        ])
+
+    def test_format_address(self):
+        self.assertEqual(format_address("500 north michigan avenue #3, chicago, illinois 60611"),
+                         '500 N Michigan Ave, Chicago, IL 60611')
+
+    def test_rank_addresses_by_agreement(self):
+        ranked = rank_addresses([
+            ("Visit 10305 Medlock Bridge Rd, Johns Creek, GA 30097 or 3105 Peachtree Industrial Blvd, Duluth, GA", 1),
+            ("3105 Peachtree Industrial Boulevard, Duluth, GA", 1),
+            ("3105 Peachtree Industrial Blvd., Duluth, Georgia 30097 and again 3105 Peachtree Industrial Blvd, Duluth, GA", 1),
+        ])
+        self.assertEqual(ranked[0], {'address': '3105 Peachtree Industrial Blvd, Duluth, GA 30097', 'score': 3, 'sources': 3})
+        self.assertEqual(ranked[1]['address'], '10305 Medlock Bridge Rd, Johns Creek, GA 30097')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,37 @@
+import asyncio
+import unittest
+from foodie.util.async_util import gather_limited
+
+
+class TestGatherLimited(unittest.IsolatedAsyncioTestCase):
+    async def test_order_and_concurrency_cap(self):
+        running = 0
+        peak = 0
+
+        async def work(i):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01 * (5 - i % 5))
+            running -= 1
+            return i
+
+        results = await gather_limited((work(i) for i in range(12)), limit=3)
+
+        self.assertEqual(results, list(range(12)))
+        self.assertEqual(peak, 3)
+
+    async def test_return_exceptions(self):
+        async def fail():
+            raise ValueError("boom")
+
+        async def ok():
+            return 1
+
+        results = await gather_limited([ok(), fail()], limit=2, return_exceptions=True)
+        self.assertEqual(results[0], 1)
+        self.assertIsInstance(results[1], ValueError)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,198 @@
+import asyncio
+import threading
+import unittest
+from unittest.mock import patch, AsyncMock, Mock
+from foodie.util.brave_util import (
+    BraveClient, BraveThrottle, BRAVE_SEARCH_URL, get_async_brave_client, decode_response
+)
+
+
+def make_response(status_code=200, content=b'{"web": {"results": []}}', headers=None):
+    response = Mock()
+    response.status_code = status_code
+    response.content = content
+    response.headers = headers or {}
+    return response
+
+
+class TestBraveClient(unittest.TestCase):
+    def test_session_reuse_and_timeouts(self):
+        client = BraveClient('token', connect_timeout=2, read_timeout=7, pool_maxsize=8)
+        adapter = client.session.get_adapter(BRAVE_SEARCH_URL)
+        self.assertEqual(adapter._pool_maxsize, 8)
+        self.assertEqual(client.session.headers['x-subscription-token'], 'token')
+
+        with patch.object(client.session, 'get', return_value=make_response()) as mock_get:
+            client.search('korean restaurants', count=5)
+            client.search('japanese restaurants', count=5, offset=1)
+
+        self.assertEqual(mock_get.call_count, 2)
+        args, kwargs = mock_get.call_args
+        self.assertEqual(args[0], BRAVE_SEARCH_URL)
+        self.assertEqual(kwargs['timeout'], (2, 7))
+        self.assertEqual(kwargs['params'], {'q': 'japanese restaurants', 'count': 5, 'result_filter': 'web', 'offset': 1})
+
+
+    def test_decode_response_prunes_heavy_fields(self):
+        body = (
+            '{"type": "search", "mixed": {"main": []}, "web": {"results": [{"title": "Jang Su Jang", '
+            '"url": "https://a", "thumbnail": {"src": "https://img"}, "profile": {"img": "x"}, '
+            '"meta_url": {"favicon": "https://icon"}, "extra_snippets": ["Korean BBQ"]}]}}'
+        )
+        self.assertEqual(decode_response(body), {'type': 'search', 'web': {'results': [
+            {'title': 'Jang Su Jang', 'url': 'https://a', 'extra_snippets': ['Korean BBQ']}
+        ]}})
+        self.assertIn('thumbnail', decode_response(body, prune=False)['web']['results'][0])
+
+    @patch('foodie.util.brave_util.time.sleep')
+    def test_retries_429_with_backoff(self, mock_sleep):
+        client = BraveClient('token', throttle=BraveThrottle(initial=4, maximum=8, max_retries=2))
+        throttled = make_response(429, b'{"type": "ErrorResponse"}', {'Retry-After': '1'})
+        with patch.object(client.session, 'get', side_effect=[throttled, make_response()]) as mock_get:
+            self.assertEqual(client.search('korean restaurants'), {'web': {'results': []}})
+
+        self.assertEqual(mock_get.call_count, 2)
+        self.assertGreaterEqual(mock_sleep.call_args[0][0], 1)
+        stats = client.throttle.stats()
+        self.assertEqual((stats['requests'], stats['throttled'], stats['retries']), (2, 1, 1))
+        self.assertEqual(stats['in_flight'], 0)
+
+    @patch('foodie.util.brave_util.time.sleep')
+    def test_gives_up_and_returns_error_response(self, mock_sleep):
+        client = BraveClient('token', throttle=BraveThrottle(max_retries=1))
+        throttled = make_response(429, b'Too Many Requests')
+        with patch.object(client.session, 'get', return_value=throttled) as mock_get:
+            result = client.search('korean restaurants')
+
+        self.assertEqual(mock_get.call_count, 2)
+        self.assertEqual(result['type'], 'ErrorResponse')
+        self.assertEqual(result['error']['status'], 429)
+
+        # A spent monthly quota resets far beyond max_backoff: no retry
+        client = BraveClient('token', throttle=BraveThrottle(max_retries=3))
+        headers = {'X-RateLimit-Limit': '1, 2000', 'X-RateLimit-Remaining': '1, 0', 'X-RateLimit-Reset': '1, 864000'}
+        with patch.object(client.session, 'get', return_value=make_response(429, b'', headers)) as mock_get:
+            self.assertEqual(client.search('korean restaurants')['error']['code'], 'HTTP_429')
+        self.assertEqual(mock_get.call_count, 1)
+
+    def test_errors_are_wrapped(self):
+        client = BraveClient('token')
+        body = b'{"type": "ErrorResponse", "error": {"code": "SUBSCRIPTION_TOKEN_INVALID", "status": 422}}'
+        with patch.object(client.session, 'get', return_value=make_response(422, body)):
+            self.assertEqual(client.search('x')['error']['code'], 'SUBSCRIPTION_TOKEN_INVALID')
+        with patch.object(client.session, 'get', return_value=make_response(502, b'<html>Bad Gateway</html>')):
+            self.assertEqual(client.search('x')['error']['code'], 'HTTP_502')
+        self.assertEqual(client.throttle.stats()['errors'], 2)
+
+
+class TestBraveThrottle(unittest.TestCase):
+    def test_aimd_and_quota(self):
+        throttle = BraveThrottle(initial=4, minimum=1, maximum=6)
+        throttle.acquire()
+        self.assertIsNotNone(throttle.release(429, {}))
+        self.assertEqual(throttle.stats()['concurrency_limit'], 2)
+
+        for _ in range(10):
+            throttle.acquire()
+            throttle.release(200, {})
+        self.assertGreater(throttle.stats()['concurrency_limit'], 2)
+
+        # The per-second limit caps concurrency
+        throttle.acquire()
+        throttle.release(200, {'X-RateLimit-Limit': '1, 15000', 'X-RateLimit-Remaining': '0, 14990',
+                               'X-RateLimit-Reset': '1, 2000000'})
+        stats = throttle.stats()
+        self.assertEqual(stats['concurrency_limit'], 1)
+        self.assertEqual((stats['limit'], stats['remaining'], stats['reset']), ([1, 15000], [0, 14990], [1.0, 2000000.0]))
+
+    def test_pauses_when_window_is_spent(self):
+        throttle = BraveThrottle()
+        throttle.acquire()
+        throttle.release(200, {'X-RateLimit-Remaining': '0, 100', 'X-RateLimit-Reset': '1, 1000'})
+        with patch('foodie.util.brave_util.time.sleep') as mock_sleep:
+            self.assertGreater(throttle.acquire(), 0)
+        mock_sleep.assert_called_once()
+        throttle.release(200, {})
+
+    def test_every_caller_waits_in_a_spent_window(self):
+        throttle = BraveThrottle()
+        throttle.acquire()
+        throttle.release(200, {'X-RateLimit-Limit': '1, 15000', 'X-RateLimit-Remaining': '0, 100',
+                               'X-RateLimit-Reset': '1, 1000'})
+        with patch('foodie.util.brave_util.time.sleep'):
+            waits = []
+            for _ in range(3):
+                waits.append(throttle.acquire())
+                throttle.release(200, {})
+        # One request per one-second window
+        self.assertTrue(all(wait > 0 for wait in waits))
+        self.assertAlmostEqual(waits[1] - waits[0], 1.0, places=1)
+        self.assertAlmostEqual(waits[2] - waits[1], 1.0, places=1)
+
+    def test_acquire_times_out(self):
+        throttle = BraveThrottle(initial=1, maximum=1, acquire_timeout=0.1)
+        throttle.acquire()
+        with self.assertRaises(TimeoutError):
+            throttle.acquire()
+
+    def test_limits_concurrency(self):
+        throttle = BraveThrottle(initial=1, maximum=1)
+        throttle.acquire()
+        acquired = threading.Event()
+        worker = threading.Thread(target=lambda: (throttle.acquire(), acquired.set()))
+        worker.start()
+        self.assertFalse(acquired.wait(0.1))
+        throttle.release(200, {})
+        self.assertTrue(acquired.wait(2))
+        worker.join()
+
+
+class TestThrottleAcrossLoops(unittest.TestCase):
+    def test_timed_out_waiter_does_not_break_release(self):
+        throttle = BraveThrottle(initial=1, maximum=1, acquire_timeout=0.05)
+        throttle.acquire()
+        with self.assertRaises(TimeoutError):
+            asyncio.run(throttle.acquire_async())
+
+        # The loop of the timed out waiter is closed now
+        self.assertIsNone(throttle.release(200, {}))
+        self.assertEqual(throttle._async_waiters, [])
+        throttle.acquire()
+        throttle.release(200, {})
+
+
+class TestAsyncBraveThrottle(unittest.IsolatedAsyncioTestCase):
+    async def test_cancelled_pause_frees_its_slot(self):
+        throttle = BraveThrottle(initial=1, maximum=1, acquire_timeout=1)
+        await throttle.acquire_async()
+        throttle.release(200, {'X-RateLimit-Remaining': '0, 100', 'X-RateLimit-Reset': '5, 1000'})
+
+        task = asyncio.ensure_future(throttle.acquire_async())
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await task
+
+        self.assertEqual(throttle.stats()['in_flight'], 0)
+        with patch('foodie.util.brave_util.time.sleep'):
+            throttle.acquire()
+        throttle.release(200, {})
+
+
+class TestAsyncBraveClient(unittest.IsolatedAsyncioTestCase):
+    async def test_search(self):
+        client = get_async_brave_client('token')
+        self.assertIs(get_async_brave_client('token'), client)
+
+        with patch.object(client.client, 'get', AsyncMock(return_value=make_response())) as mock_get:
+            self.assertEqual(await client.search('korean restaurants', count=3), {'web': {'results': []}})
+
+        args, kwargs = mock_get.call_args
+        self.assertEqual(args[0], BRAVE_SEARCH_URL)
+        self.assertEqual(kwargs['params'], {'q': 'korean restaurants', 'count': 3, 'result_filter': 'web'})
+        self.assertEqual(client.client.headers['x-subscription-token'], 'token')
+        await client.aclose()
+
+
+if __name__ == '__main__':
+    unittest.main()
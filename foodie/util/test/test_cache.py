@@ -0,0 +1,86 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from foodie.util.cache import TTLCache
+
+
+class TestTTLCache(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, 'cache.sqlite')
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_memory_lru_eviction(self):
+        cache = TTLCache(max_entries=2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+
+        self.assertEqual(cache.get('a'), 1)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('c'), 3)
+
+    def test_disk_tier_survives_new_instance(self):
+        TTLCache(path=self.db_path, namespace='geo').set('key', [1.5, 2.5])
+
+        cache = TTLCache(path=self.db_path, namespace='geo')
+        self.assertEqual(cache.get('key'), [1.5, 2.5])
+        self.assertIsNone(TTLCache(path=self.db_path, namespace='other').get('key'))
+
+    def test_ttl_expiry(self):
+        cache = TTLCache(path=self.db_path, ttl=10)
+        with patch('foodie.util.cache.time.time', return_value=1000):
+            cache.set('key', 'value')
+        with patch('foodie.util.cache.time.time', return_value=1005):
+            self.assertEqual(cache.get('key'), 'value')
+        with patch('foodie.util.cache.time.time', return_value=1011):
+            self.assertIsNone(cache.get('key'))
+
+    def test_expired_rows_are_purged(self):
+        def rows(cache):
+            return cache._conn.execute('SELECT COUNT(*) FROM cache').fetchone()[0]
+
+        cache = TTLCache(path=self.db_path, ttl=10, purge_every=3)
+        with patch('foodie.util.cache.time.time', return_value=1000):
+            cache.set('old-1', 1)
+            cache.set('old-2', 2)
+        with patch('foodie.util.cache.time.time', return_value=2000):
+            cache.set('new-1', 1)
+            self.assertEqual(rows(cache), 1)
+            cache.set('new-2', 2, ttl=-1)
+
+        # Opening the file purges what expired since
+        with patch('foodie.util.cache.time.time', return_value=2005):
+            reopened = TTLCache(path=self.db_path)
+            self.assertEqual(rows(reopened), 1)
+            self.assertEqual(reopened.get('new-1'), 1)
+
+    def test_stats(self):
+        cache = TTLCache(path=self.db_path, max_entries=1)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.get('b')
+        cache.get('c')
+
+        stats = cache.stats()
+        self.assertEqual(stats['evictions'], 3)
+        self.assertEqual(stats['hits'], 2)
+        self.assertEqual(stats['disk_hits'], 2)
+        self.assertEqual(stats['misses'], 1)
+
+    def test_none_value_with_sentinel(self):
+        missing = object()
+        cache = TTLCache(path=self.db_path)
+        cache.set('failed', None, ttl=60)
+
+        self.assertIsNone(cache.get('failed', missing))
+        self.assertIs(cache.get('unknown', missing), missing)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,9 @@
+import base64
+import io
+import json
 import unittest
-from foodie.util.github_util import GitHubUploader
+from unittest.mock import patch
+from foodie.util.github_util import GitHubUploader, iter_base64
 import os
 from pathlib import Path
 from dotenv import load_dotenv
@@ -26,5 +30,38 @@ class TestGithubUtil(unittest.TestCase):
     def test_delete_file(self):
         self.uploader.delete_file('docs/temp_map.html')
 
+
+class TestInMemoryUpload(unittest.TestCase):
+    def test_iter_base64_matches_b64encode(self):
+        content = '<html>지도 map</html>'.encode('utf-8') * 50
+        for chunk_size in (1, 2, 3, 7, 64, 10000):
+            encoded = b''.join(iter_base64(io.BytesIO(content), chunk_size=chunk_size))
+            self.assertEqual(encoded, base64.b64encode(content))
+        text = b''.join(iter_base64(io.StringIO('<html>지도</html>'), chunk_size=4))
+        self.assertEqual(text, base64.b64encode('<html>지도</html>'.encode('utf-8')))
+
+    @patch('foodie.util.github_util.requests.put')
+    @patch('foodie.util.github_util.requests.get')
+    def test_upload_bytes(self, mock_get, mock_put):
+        mock_get.return_value.status_code = 200
+        mock_get.return_value.json.return_value = {'sha': 'abc'}
+        mock_put.return_value.status_code = 200
+        mock_put.return_value.json.return_value = {
+            'content': {'html_url': 'h', 'download_url': 'd', 'url': 'u'}, 'commit': {}
+        }
+
+        uploader = GitHubUploader('token', 'fizzmore', 'foodie')
+        result = uploader.upload_file(b'<html></html>', repo_file_path='docs/map.html')
+
+        self.assertTrue(result['success'])
+        self.assertEqual(result['urls']['pages_url'], 'https://fizzmore.github.io/foodie/docs/map.html')
+        body = json.loads(mock_put.call_args.kwargs['data'])
+        self.assertEqual(body, {
+            'message': 'Update HTML file: docs/map.html', 'sha': 'abc',
+            'content': base64.b64encode(b'<html></html>').decode('ascii')
+        })
+        self.assertFalse(uploader.upload_file(io.BytesIO(b'x'))['success'])
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,53 @@
+import os
+import tempfile
+import unittest
+from foodie.util.local_geocoder import LocalGeocoder
+
+
+EXTRACT = """LON,LAT,NUMBER,STREET,UNIT,CITY,DISTRICT,REGION,POSTCODE,ID,HASH
+-84.1870,34.0290,10305,MEDLOCK BRIDGE RD,,JOHNS CREEK,,GA,30097,,a1
+-84.1690,34.0250,10970,STATE BRIDGE RD,,JOHNS CREEK,,GA,30022,,a2
+-84.3880,33.7490,100,MAIN ST,,ATLANTA,,GA,30303,,a3
+-84.2000,34.1000,100,MAIN ST,,ALPHARETTA,,GA,30009,,a4
+-84.2000,bad,1,BROKEN ST,,ALPHARETTA,,GA,30009,,a5
+"""
+
+
+class TestLocalGeocoder(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.csv_path = os.path.join(self.temp_dir.name, 'extract.csv')
+        with open(self.csv_path, 'w') as f:
+            f.write(EXTRACT)
+        self.geocoder = LocalGeocoder(os.path.join(self.temp_dir.name, 'local.sqlite'))
+        self.geocoder.build(self.csv_path)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_build_skips_bad_rows(self):
+        self.assertEqual(len(self.geocoder), 4)
+        self.geocoder.build(self.csv_path, replace=True)
+        self.assertEqual(len(self.geocoder), 4)
+
+    def test_exact_lookup(self):
+        self.assertEqual(self.geocoder.lookup("10305 Medlock Bridge Rd., Johns Creek, GA 30097"), (34.029, -84.187))
+        self.assertEqual(self.geocoder.lookup("10305 Medlock Bridge Road, Suite 4, Johns Creek, Georgia"), (34.029, -84.187))
+
+    def test_partial_street_uses_full_text_search(self):
+        if not self.geocoder.has_fts:
+            self.skipTest("SQLite built without FTS5")
+        self.assertEqual(self.geocoder.lookup("10970 State Bridge, Johns Creek, GA"), (34.025, -84.169))
+
+    def test_city_disambiguation(self):
+        self.assertEqual(self.geocoder.lookup("100 Main St, Alpharetta, GA"), (34.1, -84.2))
+        self.assertEqual(self.geocoder.lookup("100 Main St, Atlanta, GA 30303"), (33.749, -84.388))
+        self.assertIsNone(self.geocoder.lookup("100 Main St, Boston, MA"))
+
+    def test_miss(self):
+        self.assertIsNone(self.geocoder.lookup("Times Square, New York, NY"))
+        self.assertIsNone(self.geocoder.lookup("1 Nowhere Ln, Johns Creek, GA"))
+
+
+if __name__ == '__main__':
+    unittest.main()
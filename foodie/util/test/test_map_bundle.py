@@ -0,0 +1,56 @@
+import gzip
+import json
+import re
+import unittest
+from foodie.util.map_bundle import (
+    MAP_CSS_PATH, MAP_JS_PATH, SHARED_ASSETS, build_bundle, minify_html, minify_js, render_page
+)
+
+
+POINTS = [(34.0234, -84.2023, 'Jang Su Jang & Co'), (34.0451, -84.1601, None)]
+
+
+class TestMapBundle(unittest.TestCase):
+    def test_shared_assets_are_versioned_by_content(self):
+        self.assertRegex(MAP_JS_PATH, r'^assets/foodie-map\.[0-9a-f]{10}\.js$')
+        self.assertRegex(MAP_CSS_PATH, r'^assets/foodie-map\.[0-9a-f]{10}\.css$')
+        self.assertNotIn(b'\n', SHARED_ASSETS[MAP_JS_PATH])
+
+    def test_page_references_assets_and_embeds_only_data(self):
+        page = render_page(POINTS, zoom=13)
+        self.assertIn(f'src="{MAP_JS_PATH}"', page)
+        self.assertIn(f'href="{MAP_CSS_PATH}"', page)
+        self.assertNotIn('\n', page)
+        self.assertNotIn('markercluster', page)
+
+        config = json.loads(re.search(r'window\.FOODIE_MAP=(.*?);</script>', page).group(1))
+        self.assertEqual(config['coords'], [34.0234, -84.2023, 34.0451, -84.1601])
+        self.assertEqual(config['labels'], ['Jang Su Jang &amp; Co', 0])
+        self.assertEqual((config['zoom'], config['cluster']), (13, False))
+        self.assertIn('markercluster', render_page(POINTS, cluster=True))
+
+    def test_build_bundle(self):
+        bundle = build_bundle(POINTS)
+        self.assertEqual(gzip.decompress(bundle['variants']['.gz']), bundle['page'])
+        self.assertEqual(gzip.decompress(bundle['assets'][MAP_JS_PATH + '.gz']), SHARED_ASSETS[MAP_JS_PATH])
+
+        plain = build_bundle(POINTS, precompress=False)
+        self.assertEqual((plain['variants'], plain['assets']), ({}, SHARED_ASSETS))
+
+    def test_data_url_keeps_markers_out_of_the_page(self):
+        bundle = build_bundle(POINTS, precompress=False, data_url='markers.json')
+        config = json.loads(re.search(r'window\.FOODIE_MAP=(.*?);</script>', bundle['page'].decode()).group(1))
+        self.assertEqual(config['dataUrl'], 'markers.json')
+        self.assertNotIn('coords', config)
+        data = json.loads(bundle['data'])
+        self.assertEqual(data['coords'], [34.0234, -84.2023, 34.0451, -84.1601])
+        self.assertEqual(data['center'], config['center'])
+        self.assertIsNone(build_bundle(POINTS)['data'])
+
+    def test_minify(self):
+        self.assertEqual(minify_html('<div>\n    <p>a b</p>\n</div>\n'), '<div><p>a b</p></div>')
+        self.assertEqual(minify_js('if (a) {\n  b(1, 2);\n}'), 'if(a){b(1,2);}')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,49 @@
+import json
+import re
+import unittest
+from foodie.util.map_render import coordinates_json, markers_json, render_cluster, render_map, render_template
+
+
+POINTS = [
+    (34.0234, -84.2023, '10305 Medlock Bridge Rd, Johns Creek, GA 30097'),
+    (34.0451, -84.1601, 'Tom & Jerry\'s </script><b>Grill</b>'),
+]
+
+
+class TestMapRender(unittest.TestCase):
+    def test_markers_json_is_safe_to_inline(self):
+        encoded = markers_json(POINTS)
+        self.assertNotIn('</script>', encoded)
+        markers = json.loads(encoded)
+        self.assertEqual(markers[0], [34.0234, -84.2023, '10305 Medlock Bridge Rd, Johns Creek, GA 30097'])
+        self.assertEqual(markers[1][2], 'Tom &amp; Jerry&#x27;s &lt;/script&gt;&lt;b&gt;Grill&lt;/b&gt;')
+
+    def test_template_matches_folium_map(self):
+        html = render_template(POINTS, zoom=13, width=640, height='100%')
+        self.assertIn('leaflet.js', html)
+        self.assertIn('setView([34.03425, -84.1812], 13)', html)
+        self.assertIn('#map {width: 640px; height: 100%;}', html)
+        self.assertEqual(len(json.loads(re.search(r'var markers = (.*);', html).group(1))), 2)
+
+        folium_html = render_map(POINTS, zoom=13, renderer='folium')
+        self.assertEqual(folium_html.count('L.marker('), 2)
+        self.assertIn('34.03425', folium_html)
+
+    def test_cluster_embeds_flat_coordinates(self):
+        points = POINTS + [(34.1000001, -84.3, None)]
+        self.assertEqual(json.loads(coordinates_json(points)), [34.0234, -84.2023, 34.0451, -84.1601, 34.1, -84.3])
+
+        html = render_cluster(points)
+        self.assertIn('leaflet.markercluster.js', html)
+        self.assertNotIn('</script><b>', html)
+        labels = json.loads(re.search(r'var labels = (.*);', html).group(1))
+        self.assertEqual(labels[0], '10305 Medlock Bridge Rd, Johns Creek, GA 30097')
+        self.assertEqual(labels[2], 0)
+
+    def test_unknown_renderer(self):
+        with self.assertRaises(ValueError):
+            render_map(POINTS, renderer='svg')
+
+
+if __name__ == '__main__':
+    unittest.main()
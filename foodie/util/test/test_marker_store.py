@@ -0,0 +1,28 @@
+import os
+import tempfile
+import unittest
+from foodie.util.marker_store import MarkerStore
+
+
+class TestMarkerStore(unittest.TestCase):
+    def test_maps_and_markers(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, 'maps.sqlite')
+            store = MarkerStore(path)
+            self.assertIsNone(store.get_map('abc'))
+
+            store.save_map('abc', {'by': 'surge', 'url': 'https://a.surge.sh'})
+            store.update_markers('abc', add=[('k1', 'First St', 1.0, 2.0), ('k2', 'Second St', 3.0, 4.0)])
+            self.assertEqual(store.update_markers('abc', add=[('k3', 'Third St', 5.0, 6.0)], remove=['k1', 'k9']), 1)
+
+            reopened = MarkerStore(path)
+            self.assertEqual(reopened.get_map('abc'), {'by': 'surge', 'url': 'https://a.surge.sh'})
+            self.assertEqual(reopened.markers('abc'), [('k2', 'Second St', 3.0, 4.0), ('k3', 'Third St', 5.0, 6.0)])
+            self.assertEqual(reopened.markers('other'), [])
+
+            reopened.save_map('abc', {'by': 'surge', 'url': 'https://b.surge.sh'})
+            self.assertEqual(reopened.get_map('abc')['url'], 'https://b.surge.sh')
+
+
+if __name__ == '__main__':
+    unittest.main()
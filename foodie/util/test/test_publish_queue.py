@@ -0,0 +1,52 @@
+import threading
+import unittest
+from foodie.util.publish_queue import PublishQueue
+
+
+class TestPublishQueue(unittest.TestCase):
+    def setUp(self):
+        self.queue = PublishQueue(max_workers=2, max_jobs=3)
+        self.addCleanup(self.queue.shutdown)
+
+    def test_pending_then_live(self):
+        release = threading.Event()
+
+        def publish():
+            release.wait(5)
+            return {'success': True, 'url': 'https://final.surge.sh'}
+
+        job = self.queue.submit('a', 'https://predicted.surge.sh', publish)
+        self.assertEqual((job['status'], job['url']), ('pending', 'https://predicted.surge.sh'))
+        self.assertEqual(self.queue.status('a')['status'], 'pending')
+
+        # A pending job is not queued again
+        self.assertEqual(self.queue.submit('a', 'https://other.surge.sh', publish)['url'], 'https://predicted.surge.sh')
+
+        release.set()
+        job = self.queue.wait('a', timeout=5)
+        self.assertEqual((job['status'], job['url']), ('live', 'https://final.surge.sh'))
+        self.assertIsNone(self.queue.status('unknown'))
+
+    def test_failures_can_be_retried(self):
+        self.queue.submit('b', 'https://b.surge.sh', lambda: {'success': False, 'error': '[error](quota)'})
+        self.assertEqual(self.queue.wait('b', timeout=5)['error'], '[error](quota)')
+
+        def broken():
+            raise RuntimeError('offline')
+
+        self.queue.submit('b', 'https://b.surge.sh', broken)
+        self.assertEqual(self.queue.wait('b', timeout=5)['error'], '[error](offline)')
+
+        self.queue.submit('b', 'https://b.surge.sh', lambda: {'success': True, 'url': 'https://b.surge.sh'})
+        self.assertEqual(self.queue.wait('b', timeout=5)['status'], 'live')
+
+    def test_finished_jobs_are_bounded(self):
+        for i in range(5):
+            self.queue.submit(str(i), f'https://{i}.surge.sh', lambda: {'success': True})
+            self.queue.wait(str(i), timeout=5)
+        self.assertIsNone(self.queue.status('0'))
+        self.assertEqual(self.queue.stats(), {'pending': 0, 'live': 3, 'failed': 0})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from foodie.util.rate_limiter import RateLimiter
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class TestRateLimiter(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, 'limits.sqlite')
+        self.clock = FakeClock()
+        time_patch = patch('foodie.util.rate_limiter.time', self.clock)
+        time_patch.start()
+        self.addCleanup(time_patch.stop)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_first_request_does_not_wait(self):
+        limiter = RateLimiter('nominatim', rate=1, capacity=1)
+        self.assertEqual(limiter.acquire(), 0)
+
+    def test_waits_only_when_needed(self):
+        limiter = RateLimiter('nominatim', rate=1, capacity=1)
+        limiter.acquire()
+        self.assertAlmostEqual(limiter.acquire(), 1.0)
+
+        self.clock.now += 5
+        self.assertEqual(limiter.acquire(), 0)
+
+    def test_burst_capacity(self):
+        limiter = RateLimiter('github', rate=1, capacity=3)
+        waits = [limiter.reserve() for _ in range(4)]
+        self.assertEqual(waits[:3], [0, 0, 0])
+        self.assertAlmostEqual(waits[3], 1.0)
+
+    def test_shared_state_across_instances(self):
+        # Two limiters on the same file behave like two processes sharing one budget
+        first = RateLimiter('nominatim', rate=1, capacity=1, path=self.db_path)
+        second = RateLimiter('nominatim', rate=1, capacity=1, path=self.db_path)
+
+        self.assertEqual(first.reserve(), 0)
+        self.assertAlmostEqual(second.reserve(), 1.0)
+        self.assertAlmostEqual(first.reserve(), 2.0)
+
+        other = RateLimiter('brave', rate=1, capacity=1, path=self.db_path)
+        self.assertEqual(other.reserve(), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+import asyncio
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from foodie.util.singleflight import SingleFlight
+
+
+class TestSingleFlight(unittest.TestCase):
+    def test_threads_share_one_call(self):
+        flights = SingleFlight()
+        calls = []
+        started = threading.Event()
+
+        def slow_lookup():
+            calls.append(1)
+            started.set()
+            time.sleep(0.05)
+            return 'result'
+
+        with ThreadPoolExecutor(max_workers=5) as executor:
+            first = executor.submit(flights.do, 'key', slow_lookup)
+            started.wait()
+            others = [executor.submit(flights.do, 'key', slow_lookup) for _ in range(4)]
+            results = [first.result()] + [future.result() for future in others]
+
+        self.assertEqual(results, ['result'] * 5)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(flights.in_flight(), 0)
+
+    def test_exception_is_shared_and_not_cached(self):
+        flights = SingleFlight()
+
+        def fail():
+            raise ValueError('boom')
+
+        with self.assertRaises(ValueError):
+            flights.do('key', fail)
+        self.assertEqual(flights.do('key', lambda: 'ok'), 'ok')
+
+
+class TestSingleFlightAsync(unittest.IsolatedAsyncioTestCase):
+    async def test_tasks_share_one_call(self):
+        flights = SingleFlight()
+        calls = []
+
+        async def slow_lookup(value):
+            calls.append(value)
+            await asyncio.sleep(0.01)
+            return value
+
+        results = await asyncio.gather(*(flights.do_async('key', slow_lookup, 'a') for _ in range(5)),
+                                       flights.do_async('other', slow_lookup, 'b'))
+
+        self.assertEqual(results, ['a'] * 5 + ['b'])
+        self.assertEqual(calls, ['a', 'b'])
+        self.assertEqual(await flights.do_async('key', slow_lookup, 'c'), 'c')
+
+    async def test_cancelled_caller_does_not_cancel_others(self):
+        flights = SingleFlight()
+
+        async def slow_lookup():
+            await asyncio.sleep(0.02)
+            return 'done'
+
+        first = asyncio.ensure_future(flights.do_async('key', slow_lookup))
+        second = asyncio.ensure_future(flights.do_async('key', slow_lookup))
+        await asyncio.sleep(0)
+        first.cancel()
+
+        self.assertEqual(await second, 'done')
+
+
+if __name__ == '__main__':
+    unittest.main()
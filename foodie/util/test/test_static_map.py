@@ -0,0 +1,102 @@
+import io
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from PIL import Image
+from foodie.util.static_map import fetch_tiles, fit_zoom, render_png, to_pixel
+from foodie.util.tile_cache import TileCache
+
+
+def tile_png(color):
+    buffer = io.BytesIO()
+    Image.new('RGB', (256, 256), color).save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+class TileHandler(BaseHTTPRequestHandler):
+    requests = []
+    tile = tile_png((0, 128, 0))
+
+    def do_GET(self):
+        TileHandler.requests.append(self.path)
+        if self.path.startswith('/missing'):
+            self.send_response(404)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'image/png')
+        self.send_header('Content-Length', str(len(self.tile)))
+        self.end_headers()
+        self.wfile.write(self.tile)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestStaticMap(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), TileHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.tile_url = f'http://127.0.0.1:{cls.server.server_port}/tiles/{{z}}/{{x}}/{{y}}.png'
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        TileHandler.requests.clear()
+
+    def test_to_pixel(self):
+        self.assertEqual(to_pixel(0, 0, 0), (128.0, 128.0))
+        x, y = to_pixel(34.03, -84.19, 12)
+        self.assertEqual((int(x // 256), int(y // 256)), (1090, 1635))
+
+    def test_fit_zoom(self):
+        points = [(34.03, -84.19, 'a'), (34.05, -84.16, 'b')]
+        zoom = fit_zoom(points, 800, 600)
+
+        def span(zoom):
+            xs, ys = zip(*(to_pixel(lat, lng, zoom) for lat, lng, _ in points))
+            return max(xs) - min(xs), max(ys) - min(ys)
+
+        self.assertTrue(span(zoom)[0] <= 720 and span(zoom)[1] <= 520)
+        self.assertTrue(span(zoom + 1)[0] > 720 or span(zoom + 1)[1] > 520)
+
+    def test_fetch_tiles(self):
+        tiles = [(3, x, 2) for x in range(4)]
+        data = fetch_tiles(tiles, tile_url=self.tile_url, max_workers=4)
+        self.assertEqual(set(data), set(tiles))
+        self.assertEqual(len(TileHandler.requests), 4)
+
+        missing = f'http://127.0.0.1:{self.server.server_port}/missing/{{z}}/{{x}}/{{y}}.png'
+        self.assertEqual(fetch_tiles([(3, 0, 0)], tile_url=missing), {(3, 0, 0): None})
+
+    def test_cached_tiles_are_not_downloaded_again(self):
+        cache = TileCache()
+        tiles = [(3, x, 2) for x in range(4)]
+        first = fetch_tiles(tiles, tile_url=self.tile_url, cache=cache)
+        second = fetch_tiles(tiles, tile_url=self.tile_url, cache=cache)
+        self.assertEqual(first, second)
+        self.assertEqual(len(TileHandler.requests), 4)
+        self.assertEqual(cache.stats()['hits'], 4)
+
+    def test_render_png(self):
+        points = [(34.03, -84.19, '10305 Medlock Bridge Rd'), (34.05, -84.16, '3505 Peachtree Pkwy')]
+        png = render_png(points, zoom=13, width=400, height=300, tile_url=self.tile_url)
+
+        image = Image.open(io.BytesIO(png))
+        self.assertEqual((image.format, image.size), ('PNG', (400, 300)))
+        self.assertEqual(image.convert('RGB').getpixel((2, 2)), (0, 128, 0))
+        self.assertEqual(len(TileHandler.requests), len(set(TileHandler.requests)))
+
+        # The first marker is drawn where its coordinates project
+        x0, y0 = to_pixel(34.03, -84.19, 13)
+        x1, y1 = to_pixel(34.05, -84.16, 13)
+        left, top = int((x0 + x1) / 2 - 200), int((y0 + y1) / 2 - 150)
+        self.assertEqual(image.convert('RGB').getpixel((int(x0 - left) - 5, int(y0 - top))), (214, 39, 40))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,9 @@
+import io
+import os
+import tempfile
+import threading
 import unittest
-from foodie.util.surge_util import upload_to_surge
+from foodie.util.surge_util import SurgeBatcher, upload_to_surge, write_source
 from pathlib import Path
 
 
@@ -12,5 +16,83 @@ class TestSurgeUtil(unittest.TestCase):
         upload_to_surge(self.file_path)
 
 
+
+class TestWriteSource(unittest.TestCase):
+    def test_sources(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            target = os.path.join(temp_dir, 'index.html')
+            source_file = os.path.join(temp_dir, 'map.html')
+            with open(source_file, 'wb') as f:
+                f.write(b'<html>file</html>')
+
+            for source, expected in ((b'<html>bytes</html>', b'<html>bytes</html>'),
+                                     (io.BytesIO(b'<html>stream</html>'), b'<html>stream</html>'),
+                                     (source_file, b'<html>file</html>')):
+                write_source(source, target)
+                with open(target, 'rb') as f:
+                    self.assertEqual(f.read(), expected)
+
+
+class TestSurgeBatcher(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.site_dir = os.path.join(self.temp_dir.name, 'site')
+        self.deployed = []
+
+    def deploy(self, site_dir, domain):
+        self.deployed.append(sorted(os.listdir(site_dir)))
+        return {'success': True, 'output': ''}
+
+    def test_burst_is_one_deploy(self):
+        batcher = SurgeBatcher('maps.surge.sh', site_dir=self.site_dir, window=0.2, deploy=self.deploy)
+        results = {}
+
+        def publish(name):
+            results[name] = batcher.publish(name, f'<html>{name}</html>'.encode(), files={'assets/a.js': b'js'})
+
+        threads = [threading.Thread(target=publish, args=(f'map-{i}',)) for i in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(self.deployed, [[f'map-{i}' for i in range(5)]])
+        self.assertEqual(results['map-3']['url'], 'https://maps.surge.sh/map-3/')
+        with open(os.path.join(self.site_dir, 'map-3', 'index.html'), 'rb') as f:
+            self.assertEqual(f.read(), b'<html>map-3</html>')
+        self.assertTrue(os.path.exists(os.path.join(self.site_dir, 'map-3', 'assets', 'a.js')))
+
+        # Later maps are deployed together with the ones already staged
+        batcher.publish('map-5', b'<html></html>')
+        self.assertEqual(len(self.deployed[-1]), 6)
+        self.assertEqual(batcher.stats()['deploys'], 2)
+
+    def test_shared_files_are_staged_once(self):
+        batcher = SurgeBatcher('maps.surge.sh', site_dir=self.site_dir, window=0, deploy=self.deploy)
+        for name in ('map-1', 'map-2'):
+            batcher.publish(name, b'<html></html>', files={'markers.json': b'{}'}, shared={'assets/a.1.js': b'js'})
+        self.assertEqual(self.deployed[-1], ['assets', 'map-1', 'map-2'])
+        self.assertEqual(sorted(os.listdir(os.path.join(self.site_dir, 'map-2'))), ['index.html', 'markers.json'])
+
+    def test_prunes_old_maps(self):
+        batcher = SurgeBatcher('maps.surge.sh', site_dir=self.site_dir, window=0, deploy=self.deploy, max_age=3600)
+        batcher.stage('old-map', b'<html></html>', files={'markers.json': b'{}'})
+        for name in ('index.html', 'markers.json'):
+            os.utime(os.path.join(self.site_dir, 'old-map', name), (0, 0))
+
+        self.assertTrue(batcher.publish('new-map', b'<html></html>')['success'])
+        self.assertEqual(self.deployed, [['new-map']])
+        self.assertEqual(batcher.stats()['pruned'], 1)
+        self.assertTrue(os.path.exists(batcher.lock_path))
+        self.assertNotIn('site.lock', os.listdir(self.site_dir))
+
+    def test_failures(self):
+        batcher = SurgeBatcher('maps.surge.sh', site_dir=self.site_dir, window=0,
+                               deploy=lambda site_dir, domain: {'success': False, 'error': 'Surge deployment failed'})
+        self.assertEqual(batcher.publish('map', b'<html></html>')['error'], 'Surge deployment failed')
+        self.assertFalse(batcher.publish('../map', b'<html></html>')['success'])
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,78 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from foodie.util.tile_cache import TileCache
+
+
+class TestTileCache(unittest.TestCase):
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.path = os.path.join(temp_dir.name, 'tiles.sqlite')
+
+    def test_get_set_and_persistence(self):
+        cache = TileCache(self.path)
+        self.assertIsNone(cache.get(12, 1090, 1635, 'osm'))
+        cache.set(12, 1090, 1635, 'osm', b'tile')
+        self.assertEqual(cache.get(12, 1090, 1635, 'osm'), b'tile')
+        self.assertIsNone(cache.get(12, 1090, 1635, 'satellite'))
+
+        reopened = TileCache(self.path)
+        self.assertEqual(reopened.get(12, 1090, 1635, 'osm'), b'tile')
+        self.assertEqual(reopened.stats()['bytes'], 4)
+
+    def test_lru_eviction_by_bytes(self):
+        cache = TileCache(self.path, max_bytes=30)
+        for x in range(3):
+            cache.set(12, x, 0, 'osm', bytes(10))
+            time.sleep(0.01)
+        cache.get(12, 0, 0, 'osm')  # 0 becomes the most recently read tile
+        cache.set(12, 3, 0, 'osm', bytes(10))
+
+        self.assertIsNone(cache.get(12, 1, 0, 'osm'))
+        self.assertIsNotNone(cache.get(12, 0, 0, 'osm'))
+        stats = cache.stats()
+        self.assertEqual((stats['tiles'], stats['bytes'], stats['evictions']), (3, 30, 1))
+
+    def test_budget_is_shared_by_caches_on_one_file(self):
+        first = TileCache(self.path, max_bytes=300)
+        second = TileCache(self.path, max_bytes=300)
+        for x in range(3):
+            first.set(1, x, 0, 'osm', b'a' * 100)
+        second.set(1, 3, 0, 'osm', b'b' * 100)
+
+        self.assertEqual(second.stats()['bytes'], 300)
+        self.assertEqual(first.stats()['tiles'], 3)
+        self.assertEqual(second.get(1, 3, 0, 'osm'), b'b' * 100)
+
+    def test_byte_sum_uses_the_size_index(self):
+        cache = TileCache(self.path)
+        plan = cache._conn.execute('EXPLAIN QUERY PLAN SELECT COALESCE(SUM(size), 0) FROM tiles').fetchall()
+        self.assertIn('COVERING INDEX tiles_size', plan[0][-1])
+
+    def test_concurrent_misses_download_once(self):
+        cache = TileCache()
+        calls = []
+        release = threading.Event()
+
+        def fetch():
+            calls.append(1)
+            release.wait(2)
+            return b'tile'
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            futures = [executor.submit(cache.get_or_fetch, 12, 1, 2, 'osm', fetch) for _ in range(4)]
+            time.sleep(0.1)
+            release.set()
+            self.assertEqual([future.result() for future in futures], [b'tile'] * 4)
+        self.assertEqual(len(calls), 1)
+
+        self.assertIsNone(cache.get_or_fetch(12, 9, 9, 'osm', lambda: None))
+        self.assertEqual(cache.stats()['tiles'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
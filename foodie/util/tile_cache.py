@@ -0,0 +1,138 @@
+import sqlite3
+import threading
+import time
+from foodie.util.singleflight import SingleFlight
+
+
+class TileCache:
+    """
+    Size-bounded tile store keyed by (z, x, y, style)
+
+    Tiles are kept as blobs in one SQLite file. When the stored bytes exceed
+    max_bytes, the least recently read tiles are evicted. Concurrent readers of
+    a missing tile share one download through SingleFlight. The stored bytes are
+    summed from the table on every write, so processes sharing the file keep to one budget.
+    """
+
+    def __init__(self, path=None, max_bytes=256 * 2 ** 20):
+        """
+        Initialize tile cache
+
+        Args:
+            path (str, optional): SQLite file. Memory only if None
+            max_bytes (int): Byte budget for stored tiles. Default is 256 MB
+        """
+        self.path = str(path) if path else ':memory:'
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._flights = SingleFlight()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        if path:
+            self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS tiles ('
+            'z INTEGER NOT NULL, x INTEGER NOT NULL, y INTEGER NOT NULL, style TEXT NOT NULL, '
+            'data BLOB NOT NULL, size INTEGER NOT NULL, accessed_at REAL NOT NULL, '
+            'PRIMARY KEY (z, x, y, style))'
+        )
+        self._conn.execute('CREATE INDEX IF NOT EXISTS tiles_accessed_at ON tiles (accessed_at)')
+        # Covers SUM(size), so summing the stored bytes never reads the tile blobs
+        self._conn.execute('CREATE INDEX IF NOT EXISTS tiles_size ON tiles (size)')
+        self._conn.commit()
+        self._total = self._stored_bytes()
+
+    def get(self, z, x, y, style):
+        """Return the tile bytes, or None if the tile is not cached"""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT data FROM tiles WHERE z = ? AND x = ? AND y = ? AND style = ?', (z, x, y, style)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute(
+                'UPDATE tiles SET accessed_at = ? WHERE z = ? AND x = ? AND y = ? AND style = ?',
+                (time.time(), z, x, y, style)
+            )
+            self._conn.commit()
+            self.hits += 1
+            return bytes(row[0])
+
+    def set(self, z, x, y, style, data):
+        """Store a tile, evicting least recently read tiles beyond max_bytes"""
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO tiles (z, x, y, style, data, size, accessed_at) VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (z, x, y, style, sqlite3.Binary(data), len(data), time.time())
+            )
+            # Other processes may have written since, count what the file holds now
+            self._total = self._stored_bytes()
+            self._evict()
+            self._conn.commit()
+
+    def get_or_fetch(self, z, x, y, style, fetch):
+        """
+        Return a cached tile, downloading it with fetch() on a miss
+
+        Concurrent misses for the same tile wait for one fetch() call.
+        Tiles that fetch() returns as None are not stored.
+
+        Args:
+            z, x, y (int): Tile coordinates
+            style (str): Tile style, e.g. the tile URL template
+            fetch (callable): Returns the tile bytes, or None on failure
+
+        Returns:
+            bytes: Tile, or None
+        """
+        data = self.get(z, x, y, style)
+        if data is not None:
+            return data
+
+        def load():
+            data = fetch()
+            if data:
+                self.set(z, x, y, style, data)
+            return data
+
+        return self._flights.do((z, x, y, style), load)
+
+    def stats(self):
+        """Hit, miss and eviction counters, stored tiles and bytes"""
+        with self._lock:
+            count = self._conn.execute('SELECT COUNT(*) FROM tiles').fetchone()[0]
+            self._total = self._stored_bytes()
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'tiles': count,
+                'bytes': self._total,
+                'max_bytes': self.max_bytes,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
+
+    def _stored_bytes(self):
+        return self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM tiles').fetchone()[0]
+
+    def _evict(self):
+        while self._total > self.max_bytes:
+            rows = self._conn.execute(
+                'SELECT z, x, y, style, size FROM tiles ORDER BY accessed_at LIMIT 64'
+            ).fetchall()
+            if not rows:
+                self._total = 0
+                return
+            for z, x, y, style, size in rows:
+                if self._total <= self.max_bytes:
+                    return
+                self._conn.execute(
+                    'DELETE FROM tiles WHERE z = ? AND x = ? AND y = ? AND style = ?', (z, x, y, style)
+                )
+                self._total -= size
+                self.evictions += 1
@@ -1,6 +1,9 @@
+import asyncio
 from fastmcp import FastMCP
-from foodie.tools.map_tool import create_static_map
-from foodie.tools.rec_tool import search_web, get_info
+from foodie.tools.map_tool import create_static_map, create_png_map, update_map as update_live_map, \
+    map_status as live_map_status
+from foodie.tools.rec_tool import search_web_async, get_info_async, research_restaurants_async, project_response, \
+    research_payload
 
 
 mcp = FastMCP(
@@ -11,15 +14,22 @@ mcp = FastMCP(
         Step 1: When user ask about restaurant recommendation, 
         check if location is provided. If it is not provided, ask user back.
         Use recommend_restaurant method to get recommendations.
-        It will be in json format for restaurant reviews / recommendations.
+        It will be in json format for restaurant reviews / recommendations (title, url, description, snippets).
         
         Step 2: Based on the web results from Step 1, 
-        do simple research on each restaurant using research_recommendation method.
-        The job of research_recommendation is to extract restaurant name and address.
+        research all recommended restaurants at once using research_restaurants method.
+        Pass every restaurant name in one call instead of calling research_restaurant per restaurant.
+        The job of research_restaurants is to extract restaurant name and address.
         It should also provide the reason why it should be recommended
          
-        Step 3. Combine addresses from Step 2 (concatenate addresses separated by | (pipe string)) 
-        Use build_map method to create one map including multiple locations.  
+        Step 3. research_restaurants already returns the extracted addresses separated by | (pipe string)
+        in its addresses field. Pass it to build_map as is to create one map including multiple locations.
+        Only add addresses yourself for restaurants whose address is null.  
+        
+        Step 4. build_map also returns a map_id. When user asks to add or remove places on that map,
+        call update_map with the map_id and only the added or removed addresses instead of building a new map.
+        build_map returns the link while the map is still being published. Use map_status with the map_id
+        to check whether it is live before update_map, or when the link does not load yet.
     """,
 )
 
@@ -30,8 +40,8 @@ mcp = FastMCP(
     Find and recommend restaurants in a specific location.
     """,
 )
-def recommend_restaurant(location, cuisine=None, top_n=5):
-    return search_web(location, cuisine=cuisine, top_n=top_n)
+async def recommend_restaurant(location, cuisine=None, top_n=5):
+    return project_response(await search_web_async(location, cuisine=cuisine, top_n=top_n))
 
 
 @mcp.tool(
@@ -41,8 +51,21 @@ def recommend_restaurant(location, cuisine=None, top_n=5):
     Other information on the famous dishes for the restaurant would help providing rationale for recommendation
     """,
 )
-def research_restaurant(restaurant_name, location):
-    return get_info(restaurant_name, location)
+async def research_restaurant(restaurant_name, location):
+    return research_payload(restaurant_name, await get_info_async(restaurant_name, location))
+
+
+@mcp.tool(
+    description="""
+    Research several restaurants in one call, in parallel.
+    restaurant_names is a list of restaurant names (or one string separated by | (pipe string)).
+    Returns the extracted street address (with state code and zip code) of each restaurant,
+    all addresses joined by | (pipe string) for build_map, and title, url, description and
+    extra snippets of web results to find the famous dishes of each restaurant.
+    """,
+)
+async def research_restaurants(restaurant_names, location):
+    return await research_restaurants_async(restaurant_names, location)
 
 
 @mcp.tool(
@@ -56,8 +79,44 @@ def research_restaurant(restaurant_name, location):
     The title would be korean-new-york, so that we understand what was requested.
     """
 )
-def build_map(addresses, file_name) -> dict:
-    return create_static_map(addresses, file_name=file_name)
+async def build_map(addresses, file_name) -> dict:
+    # Geocoding blocks, keep it off the event loop. The upload runs on the publishing queue
+    return await asyncio.to_thread(create_static_map, addresses, file_name=file_name, output='live',
+                                   background=True)
+
+
+@mcp.tool(
+    description="""
+    Check whether a map from build_map is live yet, or whether publishing it failed.
+    map_id is the map_id returned by build_map.
+    """
+)
+async def map_status(map_id) -> dict:
+    return live_map_status(map_id)
+
+
+@mcp.tool(
+    description="""
+    Add or remove places on a map created by build_map, keeping its link.
+    map_id is the map_id returned by build_map.
+    add_addresses and remove_addresses are strings for addresses separated by | (pipe string).
+    Only pass the addresses that change, not the ones already on the map.
+    """
+)
+async def update_map(map_id, add_addresses="", remove_addresses="") -> dict:
+    return await asyncio.to_thread(update_live_map, map_id, add_addresses, remove_addresses)
+
+
+@mcp.tool(
+    description="""
+    Generate a static PNG map image from restaurant addresses, shown inline instead of as a link.
+    Input should be string for addresses separated by | (pipe string).
+    Markers are numbered in the order of the returned legend.
+    """
+)
+async def build_map_image(addresses) -> dict:
+    # Tile downloads and drawing block, keep them off the event loop
+    return await asyncio.to_thread(create_png_map, addresses)
 
 
 if __name__ == "__main__":